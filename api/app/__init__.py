@@ -1,12 +1,45 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+import logging
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1.endpoints import kol
+from app.api.v1.endpoints import kol, search, stats
+from app.core import metrics
+from app.core import cache
+from app.core.cache import cache_stats
+from app.core.config import settings
+from app.core.consistency import ReadYourWritesMiddleware
+from app.crud.snapshots import maintain_snapshot_partitions
+from app.db.base import check_database, engine, read_engine, warmup_pool
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用启动/关闭"""
+    # 定期提前创建指标快照的月分区
+    partitions_task = asyncio.create_task(maintain_snapshot_partitions(
+        engine, settings.SNAPSHOT_PARTITION_MONTHS_AHEAD, settings.SNAPSHOT_PARTITION_CHECK_INTERVAL
+    ))
+    # 预先建立数据库连接
+    await warmup_pool(settings.DB_WARMUP_CONNECTIONS)
+    yield
+    partitions_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await partitions_task
+    # 进行中的请求已完成（uvicorn 在 SIGTERM 后先等待请求结束），关闭连接
+    await cache.backend.close()
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
 
 app = FastAPI(
     title="KOL Dashboard API",
     description="KOL Dashboard backend API service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 配置CORS
@@ -18,7 +51,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 注册路由
+if settings.READ_DATABASE_URL:
+    # 写入后的读请求使用主库
+    app.add_middleware(ReadYourWritesMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# 注册路由（固定路径需先于 /kols/{kol_id} 注册）
+app.include_router(search.router, prefix="/kols/search", tags=["Search"])
+app.include_router(stats.router, prefix="/kols", tags=["Stats"])
 app.include_router(kol.router, prefix="/kols", tags=["KOLs"])
 
 @app.get("/")
@@ -29,3 +71,37 @@ async def root():
 async def health_check():
     """健康检查端点"""
     return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    """就绪探针：数据库可用时返回 200，否则返回 503"""
+    try:
+        await check_database()
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "database": str(e) or type(e).__name__}
+        )
+    return {"status": "ready", "database": "ok"}
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """缓存命中统计"""
+    return cache_stats()
+
+cache_requests = metrics.registry.register(metrics.Gauge(
+    "cache_requests", "Response cache lookups by namespace and result", ("namespace", "result")
+))
+
+def _collect_cache_stats() -> None:
+    for namespace, counters in cache_stats()["namespaces"].items():
+        cache_requests.set(counters["hits"], namespace, "hit")
+        cache_requests.set(counters["misses"], namespace, "miss")
+
+metrics.registry.add_collector(_collect_cache_stats)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 格式的性能指标"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
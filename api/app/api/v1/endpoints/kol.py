@@ -1,15 +1,30 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Path, Request
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional, Union
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, File, Header, HTTPException, Query, status, Path, Request, UploadFile
+)
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import ValidationError
 import logging
 
-from app.core.dependencies import get_db, get_kol_by_id_or_404, get_kol_by_kol_id_or_404
+from app.core.dependencies import get_db, get_read_db, get_kol_by_id_or_404, get_kol_by_kol_id_or_404, get_kol_filter
 from app.schemas.kol import (
-    KOLCreate, KOLUpdate, KOLResponse, KOLBatchCreate,
-    KOLFilter, PaginatedKOLResponse, Platform, Level, Gender, Source, SendStatus
+    KOLCreate, KOLUpdate, KOLResponse, KOLBatchCreate, KOLBatchUpsert, KOLBatchUpsertResponse,
+    KOLBulkUpdate, KOLBulkDelete, KOLBulkResponse, KOLCacheInvalidate,
+    KOLFilter, KOLImportJob, PaginatedKOLResponse, CursorPaginatedKOLResponse, Platform, Level, Gender, Source, SendStatus,
+    partial_kol_models
 )
+from app.schemas.snapshots import KOLMetricSeriesResponse
 from app.crud import kol as kol_crud
+from app.crud import kol_import as import_crud
+from app.crud import snapshots as snapshots_crud
+from app.core import cache, request_logging, serialization
+from app.core.config import settings
+from app.core.export import encode_csv, encode_ndjson
+from app.db.base import get_read_session_maker
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -36,19 +51,12 @@ def format_validation_error(e: ValidationError) -> str:
 
 @router.post("/", response_model=KOLResponse, status_code=status.HTTP_201_CREATED)
 async def create_kol(
-    request: Request,
     kol: KOLCreate,
     db: AsyncSession = Depends(get_db)
 ) -> KOLResponse:
     """创建单个KOL"""
     try:
-        # 记录接收到的原始数据
-        body = await request.json()
-        logger.info(f"Received data: {body}")
-        
-        # 记录解析后的数据
-        logger.info(f"Parsed data: {kol.dict()}")
-        
+        request_logging.log_payload("kol.create", kol)
         return await kol_crud.create_kol(db, kol)
     except ValueError as e:
         raise HTTPException(
@@ -70,16 +78,12 @@ async def create_kol(
 
 @router.post("/batch", response_model=list[KOLResponse], status_code=status.HTTP_201_CREATED)
 async def create_kols_batch(
-    request: Request,
     kols: KOLBatchCreate,
     db: AsyncSession = Depends(get_db)
 ) -> list[KOLResponse]:
     """批量创建KOL，最多支持500条"""
     try:
-        # 记录接收到的原始数据
-        body = await request.json()
-        logger.info(f"Received batch data: {body}")
-        
+        request_logging.log_payload("kol.batch_create", kols.kols)
         return await kol_crud.create_kols_batch(db, kols.kols)
     except ValueError as e:
         raise HTTPException(
@@ -99,41 +103,295 @@ async def create_kols_batch(
             detail=f"批量创建KOL失败: {str(e)}"
         )
 
+@router.put("/batch", response_model=KOLBatchUpsertResponse)
+async def upsert_kols_batch(
+    kols: KOLBatchUpsert,
+    db: AsyncSession = Depends(get_db)
+) -> KOLBatchUpsertResponse:
+    """批量创建或更新KOL，返回逐行结果，单行失败不影响整批"""
+    try:
+        results = await kol_crud.upsert_kols(db, kols.kols)
+        counts = {status_: 0 for status_ in ("created", "updated", "conflict", "error")}
+        for result in results:
+            counts[result["status"]] += 1
+        return KOLBatchUpsertResponse(
+            created=counts["created"],
+            updated=counts["updated"],
+            conflicts=counts["conflict"],
+            errors=counts["error"],
+            results=results
+        )
+    except Exception as e:
+        logger.error(f"Error in batch upsert: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"批量更新KOL失败: {str(e)}"
+        )
+
+@router.patch("/bulk", response_model=KOLBulkResponse)
+async def bulk_update_kols(
+    bulk: KOLBulkUpdate,
+    db: AsyncSession = Depends(get_db)
+) -> KOLBulkResponse:
+    """批量更新：将同一组字段更新到 kol_ids 或过滤条件匹配的全部KOL"""
+    try:
+        count = await kol_crud.bulk_update_kols(db, bulk.patch, bulk.kol_ids, bulk.filter)
+        logger.info(f"Bulk updated {count} KOLs")
+        return KOLBulkResponse(count=count)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in bulk update: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"批量更新KOL失败: {str(e)}"
+        )
+
+@router.delete("/bulk", response_model=KOLBulkResponse)
+async def bulk_delete_kols(
+    bulk: KOLBulkDelete,
+    db: AsyncSession = Depends(get_db)
+) -> KOLBulkResponse:
+    """批量删除 kol_ids 或过滤条件匹配的全部KOL"""
+    try:
+        count = await kol_crud.bulk_delete_kols(db, bulk.kol_ids, bulk.filter)
+        logger.info(f"Bulk deleted {count} KOLs")
+        return KOLBulkResponse(count=count)
+    except Exception as e:
+        logger.error(f"Error in bulk delete: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"批量删除KOL失败: {str(e)}"
+        )
+
+@router.post("/cache/invalidate", status_code=status.HTTP_204_NO_CONTENT)
+async def invalidate_kol_cache(body: KOLCacheInvalidate) -> None:
+    """失效指定KOL的详情缓存与全部列表缓存，绕过 API 直接写库后调用"""
+    await cache.invalidate_kols(body.kol_ids)
+    logger.info(f"Invalidated cache for {len(body.kol_ids)} KOLs")
+
+@router.get("/export")
+async def export_kols(
+    filters: KOLFilter = Depends(get_kol_filter),
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="导出格式"),
+    fields: Optional[str] = Query(None, description="导出字段，逗号分隔，默认全部字段")
+) -> StreamingResponse:
+    """流式导出KOL数据，支持过滤条件与字段选择"""
+    try:
+        field_list = kol_crud.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # 在请求上下文中选择主库或副本，流式响应在依赖退出后才发送，需在生成器内管理会话
+    session_maker = await get_read_session_maker()
+    
+    async def batches():
+        async with session_maker() as db:
+            async for rows in kol_crud.stream_kols(db, filters, field_list):
+                yield rows
+    
+    if export_format == "csv":
+        content = encode_csv(batches(), field_list)
+        media_type = "text/csv; charset=utf-8"
+    else:
+        content = encode_ndjson(batches())
+        media_type = "application/x-ndjson"
+    
+    filename = f"kols_export_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# 文件扩展名与导入格式的对应关系
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".xlsx": "xlsx"}
+
+@router.post("/import", response_model=KOLImportJob, status_code=status.HTTP_202_ACCEPTED)
+async def import_kols(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV / NDJSON / Excel(xlsx) 文件"),
+    import_format: Optional[Literal["csv", "ndjson", "xlsx"]] = Query(
+        None, alias="format", description="文件格式，默认根据扩展名判断"
+    )
+) -> KOLImportJob:
+    """上传文件批量导入KOL（已存在的 kol_id 会被更新），返回任务ID用于查询进度"""
+    file_format = import_format or IMPORT_FORMATS.get(os.path.splitext(file.filename or "")[1].lower())
+    if not file_format:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法识别文件格式，支持: {', '.join(IMPORT_FORMATS)}"
+        )
+    
+    # 分块写入临时文件，内存占用与文件大小无关
+    fd, path = tempfile.mkstemp(prefix="kol_import_", suffix=f".{file_format}")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(1024 * 1024):
+                out.write(chunk)
+    except Exception as e:
+        os.remove(path)
+        logger.error(f"Error saving import file: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"上传文件失败: {str(e)}"
+        )
+    
+    job = await import_crud.create_job(file.filename, file_format)
+    background_tasks.add_task(import_crud.run_import, job["job_id"], path, file_format)
+    return job
+
+@router.get("/import/{job_id}", response_model=KOLImportJob)
+async def get_import_job(job_id: str) -> KOLImportJob:
+    """查询导入任务进度与失败行明细"""
+    job = await import_crud.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import job {job_id} not found"
+        )
+    return job
+
 @router.get("/{kol_id}", response_model=KOLResponse)
 async def get_kol(
-    kol: KOLResponse = Depends(get_kol_by_kol_id_or_404)
-) -> KOLResponse:
-    """获取单个KOL信息"""
-    return kol
+    request: Request,
+    kol_id: str = Path(..., description="KOL ID"),
+    fields: Optional[str] = Query(None, description="返回字段，逗号分隔，默认全部字段"),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """获取单个KOL信息，支持字段投影与 ETag / If-None-Match"""
+    try:
+        field_list = kol_crud.projection_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if field_list is None:
+        key = cache.detail_key(kol_id)
+    else:
+        # 投影结果随列表缓存代数一起失效
+        key = await cache.list_key({"kol_id": kol_id, "fields": field_list}, "detail")
+    entry = await cache.get_cached("detail", key)
+    if entry is None:
+        if settings.FAST_SERIALIZATION:
+            kol = await kol_crud.get_kol_fields(db, kol_id, list(field_list or kol_crud.RESPONSE_FIELDS))
+        elif field_list is None:
+            kol = await kol_crud.get_kol_by_kol_id(db, kol_id)
+        else:
+            kol = await kol_crud.get_kol_fields(db, kol_id, list(field_list))
+        if not kol:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"KOL with kol_id {kol_id} not found"
+            )
+        if settings.FAST_SERIALIZATION:
+            body = serialization.dumps(kol)
+        else:
+            model = KOLResponse if field_list is None else partial_kol_models(field_list)[0]
+            body = model.model_validate(kol).model_dump_json().encode()
+        # 完整详情以版本号作为 ETag，可直接用于更新时的 If-Match
+        etag = None
+        if field_list is None:
+            etag = cache.version_etag(kol["version"] if isinstance(kol, dict) else kol.version)
+        entry = await cache.set_cached(key, body, etag)
+    return cache.etag_response(request, *entry)
+
+@router.get("/{kol_id}/metrics", response_model=KOLMetricSeriesResponse)
+async def get_kol_metrics(
+    kol_id: str = Path(..., description="KOL ID"),
+    interval: Literal[snapshots_crud.SNAPSHOT_INTERVALS] = Query("day", description="降采样粒度"),
+    start: Optional[datetime] = Query(None, description="开始时间，默认为一年前"),
+    end: Optional[datetime] = Query(None, description="结束时间，默认为当前时间"),
+    metrics: Optional[str] = Query(None, description="逗号分隔的指标，默认全部"),
+    db: AsyncSession = Depends(get_read_db)
+) -> KOLMetricSeriesResponse:
+    """KOL指标历史（粉丝增长、互动率变化等），每个区间取最后一次快照的值"""
+    # 未带时区的时间按 UTC 处理
+    end = end or datetime.now(timezone.utc)
+    end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    start = start or end - timedelta(days=365)
+    start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start 必须早于 end"
+        )
+    try:
+        selected = snapshots_crud.parse_metrics(metrics)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    kol = await kol_crud.get_kol_by_kol_id(db, kol_id)
+    if not kol:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"KOL with kol_id {kol_id} not found"
+        )
+    try:
+        points = await snapshots_crud.get_metric_series(db, kol.id, selected, start, end, interval)
+        return KOLMetricSeriesResponse(
+            kol_id=kol_id,
+            interval=interval,
+            start=start,
+            end=end,
+            time=[point["time"] for point in points],
+            series={metric: [point[metric] for point in points] for metric in selected}
+        )
+    except Exception as e:
+        logger.error(f"Error getting metrics for {kol_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"获取KOL指标历史失败: {str(e)}"
+        )
 
 @router.put("/{kol_id}", response_model=KOLResponse)
 async def update_kol(
-    request: Request,
+    response: Response,
     kol_id: str = Path(..., description="KOL ID"),
     kol_update: KOLUpdate = None,
+    if_match: Optional[str] = Header(None, description="期望的版本 ETag，如 \"3\"，不一致时返回 409"),
     db: AsyncSession = Depends(get_db)
 ) -> KOLResponse:
-    """更新KOL信息"""
+    """更新KOL信息，支持 If-Match 乐观并发控制"""
     try:
-        # 记录接收到的原始数据
-        if request.method != "GET":
-            body = await request.json()
-            logger.info(f"Received update data for {kol_id}: {body}")
+        if kol_update is not None:
+            request_logging.log_payload("kol.update", kol_update, kol_id=kol_id)
+        expected_version = cache.parse_if_match(if_match)
         
-        # 先获取现有KOL
-        kol = await kol_crud.get_kol_by_kol_id(db, kol_id)
+        # 如果请求体为空，返回现有KOL
+        if not kol_update or not kol_update.model_dump(exclude_none=True):
+            kol = await kol_crud.get_kol_by_kol_id(db, kol_id)
+            if kol and expected_version is not None and kol.version != expected_version:
+                raise kol_crud.VersionConflictError(kol_id, expected_version, kol.version)
+        else:
+            # 更新KOL
+            kol = await kol_crud.update_kol(db, kol_id, kol_update, expected_version)
         if not kol:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"KOL with id {kol_id} not found"
             )
-        
-        # 如果请求体为空，返回现有KOL
-        if not kol_update:
-            return kol
-            
-        # 更新KOL
-        return await kol_crud.update_kol(db, kol, kol_update)
+        response.headers["ETag"] = cache.version_etag(kol.version)
+        return kol
+    except HTTPException:
+        raise
+    except kol_crud.VersionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"KOL已被修改，当前版本为 {e.current}，请刷新后重试",
+            headers={"ETag": cache.version_etag(e.current)}
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -167,41 +425,66 @@ async def delete_kol(
             detail=f"删除KOL失败: {str(e)}"
         )
 
-@router.get("/", response_model=PaginatedKOLResponse)
+@router.get("/", response_model=Union[PaginatedKOLResponse, CursorPaginatedKOLResponse])
 async def get_kols(
-    name: Optional[str] = None,
-    platform: Optional[Platform] = None,
-    level: Optional[Level] = None,
-    gender: Optional[Gender] = None,
-    location: Optional[str] = None,
-    source: Optional[Source] = None,
-    send_status: Optional[SendStatus] = None,
-    min_followers: Optional[float] = None,
-    max_followers: Optional[float] = None,
+    request: Request,
+    filters: KOLFilter = Depends(get_kol_filter),
     page: int = Query(1, ge=1, description="页码"),
     size: int = Query(10, ge=1, le=100, description="每页数量"),
-    db: AsyncSession = Depends(get_db)
-) -> PaginatedKOLResponse:
-    """获取KOL列表，支持分页和过滤"""
+    cursor: Optional[str] = Query(None, description="游标分页：传入后按游标分页并忽略 page，首页传空字符串"),
+    sort: Optional[str] = Query(None, description="排序字段，逗号分隔，前缀 - 表示降序，如 -followers_k,name；默认 -updated_at"),
+    fields: Optional[str] = Query(None, description="返回字段，逗号分隔，默认全部字段"),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """获取KOL列表，支持分页、过滤、排序和字段投影，支持 ETag / If-None-Match"""
     try:
-        filters = KOLFilter(
-            name=name,
-            platform=platform,
-            level=level,
-            gender=gender,
-            location=location,
-            source=source,
-            send_status=send_status,
-            min_followers=min_followers,
-            max_followers=max_followers
-        )
-        return await kol_crud.get_kols(db, filters, page, size)
+        sort_keys = kol_crud.parse_sort(sort)
+        if cursor is not None and sort_keys != kol_crud.DEFAULT_SORT:
+            raise ValueError("游标分页仅支持默认排序（-updated_at）")
+        field_list = kol_crud.projection_fields(fields)
+        key = await cache.list_key({
+            "filters": filters.model_dump(mode="json", exclude_none=True),
+            "page": page if cursor is None else None,
+            "size": size,
+            "cursor": cursor,
+            "sort": sort_keys,
+            "fields": field_list
+        })
+        entry = await cache.get_cached("list", key)
+        if entry is None:
+            if settings.FAST_SERIALIZATION:
+                # 快速路径：只查询响应字段的行元组，直接编码为 JSON，不构建ORM对象也不经过 pydantic
+                columns = list(field_list or kol_crud.RESPONSE_FIELDS)
+                if cursor is not None:
+                    result = await kol_crud.get_kols_by_cursor(db, filters, cursor, size, columns)
+                else:
+                    result = await kol_crud.get_kols(db, filters, page, size, sort_keys, columns)
+                body = serialization.dumps(result)
+            else:
+                if field_list is None:
+                    page_model, cursor_page_model = PaginatedKOLResponse, CursorPaginatedKOLResponse
+                else:
+                    _, page_model, cursor_page_model = partial_kol_models(field_list)
+                    field_list = list(field_list)
+                if cursor is not None:
+                    result = await kol_crud.get_kols_by_cursor(db, filters, cursor, size, field_list)
+                    body = cursor_page_model.model_validate(result).model_dump_json().encode()
+                else:
+                    result = await kol_crud.get_kols(db, filters, page, size, sort_keys, field_list)
+                    body = page_model.model_validate(result).model_dump_json().encode()
+            entry = await cache.set_cached(key, body)
+        return cache.etag_response(request, *entry)
     except ValidationError as e:
         logger.error(f"Validation error in filters: {e.errors()}")
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=format_validation_error(e)
         )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error getting KOLs: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,52 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from app.core.dependencies import get_read_db, get_kol_filter
+from app.schemas.kol import (
+    KOLFilter, KOLResponse, KOLSearchResult, KOLSearchResponse, KOLSuggestion
+)
+from app.crud import search as search_crud
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("", response_model=KOLSearchResponse)
+async def search_kols(
+    q: str = Query(..., min_length=1, max_length=200, description="检索关键词"),
+    filters: KOLFilter = Depends(get_kol_filter),
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    offset: int = Query(0, ge=0, le=10000, description="偏移量"),
+    db: AsyncSession = Depends(get_read_db)
+) -> KOLSearchResponse:
+    """全文检索KOL（名称、简介、地区、标签、关键词、话题），按相关度排序"""
+    try:
+        rows = await search_crud.search_kols(db, q, filters, limit, offset)
+        items = [
+            KOLSearchResult(**KOLResponse.model_validate(kol).model_dump(), score=score)
+            for kol, score in rows
+        ]
+        return KOLSearchResponse(items=items, query=q, limit=limit, offset=offset)
+    except Exception as e:
+        logger.error(f"Error searching KOLs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"检索KOL失败: {str(e)}"
+        )
+
+@router.get("/autocomplete", response_model=List[KOLSuggestion])
+async def autocomplete_kols(
+    q: str = Query(..., min_length=1, max_length=100, description="名称前缀"),
+    limit: int = Query(10, ge=1, le=50, description="返回数量"),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[KOLSuggestion]:
+    """KOL名称前缀自动补全"""
+    try:
+        return await search_crud.autocomplete_kols(db, q, limit)
+    except Exception as e:
+        logger.error(f"Error autocompleting KOLs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"自动补全失败: {str(e)}"
+        )
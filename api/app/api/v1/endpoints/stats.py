@@ -0,0 +1,149 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from app.core import cache
+from app.core.dependencies import get_db, get_read_db, get_kol_filter
+from app.schemas.kol import KOLFilter
+from app.schemas.stats import KOLStatsResponse, KOLHistogramResponse, KOLFacetsResponse, RollupCheckResponse, RollupRebuildResponse
+from app.crud import stats as stats_crud
+from app.crud import rollups as rollups_crud
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/stats", response_model=KOLStatsResponse)
+async def get_stats(
+    request: Request,
+    filters: KOLFilter = Depends(get_kol_filter),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """KOL统计：各维度分布、粉丝数与互动率的汇总、分位数和直方图，按过滤条件缓存"""
+    try:
+        key = await cache.list_key({"filters": filters.model_dump(mode="json", exclude_none=True)}, "stats")
+        entry = await cache.get_cached("stats", key)
+        if entry is None:
+            result = await stats_crud.get_stats(db, filters)
+            body = KOLStatsResponse.model_validate(result).model_dump_json().encode()
+            entry = await cache.set_cached(key, body)
+        return cache.etag_response(request, *entry)
+    except Exception as e:
+        logger.error(f"Error getting KOL stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"获取KOL统计失败: {str(e)}"
+        )
+
+@router.get("/stats/histogram", response_model=KOLHistogramResponse)
+async def get_histogram(
+    request: Request,
+    metric: Literal[stats_crud.METRIC_FIELDS] = Query(..., description="数值指标"),
+    bounds: Optional[str] = Query(None, description="区间边界，逗号分隔且递增，如 1,10,100"),
+    filters: KOLFilter = Depends(get_kol_filter),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """任意数值指标的直方图"""
+    try:
+        bound_list = [float(b) for b in bounds.split(",")] if bounds else list(
+            stats_crud.DEFAULT_BUCKETS.get(metric, (1, 10, 100, 1000))
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid bounds: {bounds}"
+        )
+    if not bound_list or len(bound_list) > 50 or bound_list != sorted(set(bound_list)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bounds 必须为 1~50 个严格递增的数值"
+        )
+    
+    try:
+        key = await cache.list_key({
+            "filters": filters.model_dump(mode="json", exclude_none=True),
+            "metric": metric,
+            "bounds": bound_list
+        }, "histogram")
+        entry = await cache.get_cached("stats", key)
+        if entry is None:
+            buckets = await stats_crud.get_histogram(db, filters, metric, bound_list)
+            body = KOLHistogramResponse(metric=metric, buckets=buckets).model_dump_json().encode()
+            entry = await cache.set_cached(key, body)
+        return cache.etag_response(request, *entry)
+    except Exception as e:
+        logger.error(f"Error getting KOL histogram: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"获取直方图失败: {str(e)}"
+        )
+
+@router.get("/facets", response_model=KOLFacetsResponse)
+async def get_facets(
+    request: Request,
+    facets: Optional[str] = Query(None, description="逗号分隔的分面：hashtags,keywords,tags，默认全部"),
+    limit: int = Query(20, ge=1, le=200, description="每个分面返回的数量"),
+    filters: KOLFilter = Depends(get_kol_filter),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """当前过滤条件下出现最多的话题、关键词和标签"""
+    selected = [facet.strip() for facet in facets.split(",") if facet.strip()] if facets else list(stats_crud.FACET_FIELDS)
+    unknown = [facet for facet in selected if facet not in stats_crud.FACET_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown facets: {', '.join(unknown)}"
+        )
+    
+    try:
+        key = await cache.list_key({
+            "filters": filters.model_dump(mode="json", exclude_none=True),
+            "facets": sorted(set(selected)),
+            "limit": limit
+        }, "facets")
+        entry = await cache.get_cached("stats", key)
+        if entry is None:
+            result = await stats_crud.get_facets(db, filters, list(dict.fromkeys(selected)), limit)
+            body = KOLFacetsResponse(facets=result).model_dump_json().encode()
+            entry = await cache.set_cached(key, body)
+        return cache.etag_response(request, *entry)
+    except Exception as e:
+        logger.error(f"Error getting KOL facets: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"获取KOL分面失败: {str(e)}"
+        )
+
+@router.get("/stats/rollups/check", response_model=RollupCheckResponse)
+async def check_rollups(
+    db: AsyncSession = Depends(get_db)
+) -> RollupCheckResponse:
+    """对比 kol_rollups 汇总表与 kols 的实时聚合（全表扫描，用于巡检）"""
+    try:
+        result = await rollups_crud.check_rollups(db)
+        if not result["consistent"]:
+            logger.warning(f"KOL rollups drifted: {result['mismatches']} mismatched groups")
+        return RollupCheckResponse.model_validate(result)
+    except Exception as e:
+        logger.error(f"Error checking KOL rollups: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"检查汇总表失败: {str(e)}"
+        )
+
+@router.post("/stats/rollups/rebuild", response_model=RollupRebuildResponse)
+async def rebuild_rollups(
+    db: AsyncSession = Depends(get_db)
+) -> RollupRebuildResponse:
+    """从 kols 全量重建 kol_rollups 汇总表，重建期间阻塞 KOL 写入"""
+    try:
+        groups = await rollups_crud.rebuild_rollups(db)
+        logger.info(f"Rebuilt KOL rollups: {groups} groups")
+        return RollupRebuildResponse(groups=groups)
+    except Exception as e:
+        logger.error(f"Error rebuilding KOL rollups: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"重建汇总表失败: {str(e)}"
+        )
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+from app.core.consistency import pinned_to_primary
+
+logger = logging.getLogger(__name__)
+
+# 缓存键
+DETAIL_KEY_PREFIX = "kol:detail:"
+# 列表/统计等查询缓存的代数，任何写操作都会递增，使旧的查询缓存失效
+LIST_GENERATION_KEY = "kol:list:generation"
+
+class CacheBackend:
+    """缓存后端接口，值为字节串"""
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def get_counter(self, key: str) -> int:
+        """读取 incr 维护的计数器，不存在时为 0"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+class NullCache(CacheBackend):
+    """不缓存"""
+
+    name = "none"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def incr(self, key: str) -> int:
+        return 0
+
+    async def get_counter(self, key: str) -> int:
+        return 0
+
+class MemoryCache(CacheBackend):
+    """进程内 LRU + TTL 缓存，也用作测试中的缓存替身"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        # 计数器与缓存条目分开存放，不参与 LRU 淘汰
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+class RedisCache(CacheBackend):
+    """Redis 缓存，多个进程/实例共享，飞书同步脚本也可据此失效缓存"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        keys = list(keys)
+        for start in range(0, len(keys), 1000):
+            await self._client.delete(*keys[start:start + 1000])
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+def create_backend() -> CacheBackend:
+    """根据配置创建缓存后端"""
+    if settings.CACHE_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("CACHE_BACKEND=redis requires REDIS_URL")
+        return RedisCache(settings.REDIS_URL)
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(settings.CACHE_MAX_ENTRIES)
+    return NullCache()
+
+backend: CacheBackend = create_backend()
+# 命中统计：命名空间 -> [命中数, 未命中数]
+_stats: Dict[str, list] = {}
+
+def set_backend(new_backend: CacheBackend) -> None:
+    """替换缓存后端（测试中可替换为 MemoryCache）"""
+    global backend
+    backend = new_backend
+    _stats.clear()
+
+def cache_stats() -> dict:
+    """缓存命中统计"""
+    namespaces = {}
+    for namespace, (hits, misses) in _stats.items():
+        total = hits + misses
+        namespaces[namespace] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0
+        }
+    return {"backend": backend.name, "namespaces": namespaces}
+
+def _record(namespace: str, hit: bool) -> None:
+    counters = _stats.setdefault(namespace, [0, 0])
+    counters[0 if hit else 1] += 1
+
+def detail_key(kol_id: str) -> str:
+    return f"{DETAIL_KEY_PREFIX}{kol_id}"
+
+async def list_key(params: dict, namespace: str = "list") -> str:
+    """查询缓存键：命名空间 + 当前代数 + 规范化参数的摘要"""
+    generation = await backend.get_counter(LIST_GENERATION_KEY)
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"kol:{namespace}:{generation}:{digest}"
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.md5(body).hexdigest() + '"'
+
+async def get_cached(namespace: str, key: str) -> Optional[Tuple[str, bytes]]:
+    """读取缓存，返回 (ETag, 响应体)；刚写入过的客户端跳过缓存，避免读到副本延迟期间缓存的旧数据"""
+    if pinned_to_primary():
+        return None
+    try:
+        value = await backend.get(key)
+    except Exception as e:
+        # 缓存不可用时直接回源
+        logger.warning(f"Cache get failed: {str(e)}")
+        value = None
+    _record(namespace, value is not None)
+    if value is None:
+        return None
+    etag, _, body = value.partition(b"\n")
+    return etag.decode(), body
+
+async def set_cached(key: str, body: bytes, etag: Optional[str] = None) -> Tuple[str, bytes]:
+    """写入缓存，返回 (ETag, 响应体)"""
+    etag = etag or make_etag(body)
+    try:
+        await backend.set(key, etag.encode() + b"\n" + body, settings.CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Cache set failed: {str(e)}")
+    return etag, body
+
+async def invalidate_kols(kol_ids: Iterable[str] = ()) -> None:
+    """KOL 写入后失效对应的详情缓存，并使所有列表缓存失效"""
+    # 避免循环导入
+    from app.crud.count import clear_count_cache
+    
+    clear_count_cache()
+    try:
+        keys = [detail_key(kol_id) for kol_id in kol_ids]
+        if keys:
+            await backend.delete(*keys)
+        await backend.incr(LIST_GENERATION_KEY)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed: {str(e)}")
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def version_etag(version: int) -> str:
+    """KOL 详情的 ETag，即版本号"""
+    return f'"{version}"'
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """
+    解析 If-Match 请求头中的版本号，未提供或为 * 时返回 None
+    
+    Raises:
+        ValueError: 不是 version_etag 生成的 ETag，或包含多个 ETag
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    tag = if_match.strip().removeprefix("W/")
+    if "," in tag or not (len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit()):
+        raise ValueError(f"Invalid If-Match: {if_match}")
+    return int(tag[1:-1])
+
+def etag_response(request: Request, etag: str, body: bytes) -> Response:
+    """返回带 ETag 的 JSON 响应，If-None-Match 命中时返回 304"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
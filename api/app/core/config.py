@@ -19,11 +19,58 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
 
+    # 只读副本配置
+    READ_DATABASE_URL: Optional[str] = None  # 只读副本的异步连接地址，未配置时读写都使用主库
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0  # 复制延迟超过该值时读请求改用主库
+    READ_REPLICA_CHECK_INTERVAL: float = 2.0  # 副本延迟检测的间隔(秒)
+    READ_YOUR_WRITES_SECONDS: float = 10.0  # 客户端写入后该时间内的读请求使用主库
+
+    # 连接池配置
+    DB_POOL_SIZE: int = 10  # 常驻连接数
+    DB_MAX_OVERFLOW: int = 10  # 连接池满时允许额外创建的连接数
+    DB_POOL_TIMEOUT: float = 10.0  # 等待空闲连接的最长时间(秒)，超时返回错误而非无限排队
+    DB_POOL_RECYCLE: int = 1800  # 连接最长使用时间(秒)，-1 表示不回收
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg 预编译语句缓存大小，0 表示不缓存
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 服务端 statement_timeout(毫秒)，0 表示不限制
+    DB_PGBOUNCER: bool = False  # 经 PgBouncer 事务模式连接时不使用命名预编译语句
+
     # 环境配置
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     BUILD_TARGET: str = "development"
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    # 工作进程数，0 表示 CPU 核数；每个进程有独立的连接池。
+    # 多进程时响应缓存、列表代数与导入任务状态需要跨进程共享，必须使用 CACHE_BACKEND=redis，否则拒绝启动
     API_WORKERS: int = 1
+    API_GRACEFUL_TIMEOUT: int = 30  # 收到 SIGTERM 后等待进行中请求完成的最长时间(秒)
+    DB_WARMUP_CONNECTIONS: int = 2  # 启动时每个进程预先建立的数据库连接数
+
+    # 列表计数配置
+    COUNT_EXACT_THRESHOLD: int = 10000  # 预估行数低于该值时执行精确计数
+    COUNT_CACHE_TTL: float = 30.0  # 计数缓存有效期(秒)，0 表示不缓存
+
+    # 统计配置
+    STATS_USE_ROLLUPS: bool = True  # 过滤条件只涉及维度时，分布与总数读取 kol_rollups 汇总表
+    SNAPSHOT_PARTITION_MONTHS_AHEAD: int = 3  # 提前创建的指标快照月分区数
+    SNAPSHOT_PARTITION_CHECK_INTERVAL: float = 21600.0  # 检查并创建快照分区的间隔(秒)
+
+    # 响应缓存配置
+    CACHE_BACKEND: str = "memory"  # memory / redis / none
+    CACHE_TTL: float = 60.0  # 缓存有效期(秒)
+    CACHE_MAX_ENTRIES: int = 2048  # 进程内缓存的最大条目数
+    REDIS_URL: Optional[str] = None
+
+    # 序列化配置
+    FAST_SERIALIZATION: bool = True  # 列表/详情读取行元组并用 orjson 直接编码，跳过ORM与 pydantic
+
+    # 性能指标配置
+    METRICS_ENABLED: bool = True  # 记录请求/SQL/连接池指标，提供 /metrics 与 Server-Timing 响应头
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0  # 超过该耗时(毫秒)的 SQL 记录日志并计入慢查询
+
+    # 请求载荷日志配置
+    REQUEST_LOG_SAMPLE_RATE: float = 0.0  # 写请求载荷日志的采样比例，0 表示关闭
+    REQUEST_LOG_MAX_BYTES: int = 2048  # 单条载荷日志的最大长度(字节)
 
     # PgAdmin配置
     PGADMIN_EMAIL: str = "admin@admin.com"
@@ -33,10 +80,19 @@ class Settings(BaseSettings):
         env_file = str(ENV_FILE)
         env_file_encoding = "utf-8"
         case_sensitive = False
+        # 项目根目录的 .env 同时包含前端变量（如 VITE_API_URL）
+        extra = "ignore"
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.DATABASE_URL = expand_env_vars(self.DATABASE_URL)
         self.ASYNC_DATABASE_URL = expand_env_vars(self.ASYNC_DATABASE_URL)
+        if self.READ_DATABASE_URL:
+            self.READ_DATABASE_URL = expand_env_vars(self.READ_DATABASE_URL)
+        if self.API_WORKERS != 1 and self.CACHE_BACKEND != "redis":
+            raise ValueError(
+                f"API_WORKERS={self.API_WORKERS} requires CACHE_BACKEND=redis: "
+                "the memory cache, list generation and import job state are per process"
+            )
 
 settings = Settings()
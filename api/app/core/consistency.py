@@ -0,0 +1,62 @@
+"""
+读己之写：客户端写入成功后设置 Cookie，有效期内该客户端的读请求使用主库并跳过响应缓存
+
+只读副本存在复制延迟，写入后立即读取副本可能读到旧数据，也可能把旧数据写入缓存。
+"""
+import time
+from contextvars import ContextVar
+
+from app.core.config import settings
+
+PRIMARY_COOKIE = "kol_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_pinned: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+def pinned_to_primary() -> bool:
+    """当前请求是否应读取主库"""
+    return _pinned.get()
+
+def _cookie_value(headers) -> str:
+    for name, value in headers:
+        if name == b"cookie":
+            for part in value.decode("latin-1").split(";"):
+                key, _, cookie = part.strip().partition("=")
+                if key == PRIMARY_COOKIE:
+                    return cookie
+    return ""
+
+def _is_pinned(headers) -> bool:
+    try:
+        return float(_cookie_value(headers) or 0) > time.time()
+    except ValueError:
+        return False
+
+class ReadYourWritesMiddleware:
+    """写请求成功后设置读主库的 Cookie，并根据 Cookie 标记当前请求"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        is_write = scope["method"] not in SAFE_METHODS
+        token = _pinned.set(is_write or _is_pinned(scope["headers"]))
+
+        async def send_wrapper(message):
+            if is_write and message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{PRIMARY_COOKIE}={time.time() + window:.3f}; Max-Age={int(window) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _pinned.reset(token)
@@ -1,15 +1,21 @@
-from typing import AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from typing import Annotated, AsyncGenerator
+from fastapi import Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.base import async_session_maker
+from app.db.base import async_session_maker, get_read_session_maker
 from app.crud import kol as kol_crud
-from app.schemas.kol import KOLResponse
+from app.schemas.kol import KOLResponse, KOLFilter
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """只读会话：配置了 READ_DATABASE_URL 时读取副本，写入后的读、副本延迟过大或不可用时读取主库"""
+    session_maker = await get_read_session_maker()
+    async with session_maker() as session:
+        yield session
+
 async def get_kol_by_id_or_404(
     kol_id: int,
     db: AsyncSession = Depends(get_db)
@@ -35,3 +41,11 @@ async def get_kol_by_kol_id_or_404(
             detail=f"KOL with kol_id {kol_id} not found"
         )
     return kol
+
+def get_kol_filter(filters: Annotated[KOLFilter, Query()]) -> KOLFilter:
+    """
+    从查询参数构建 KOL 过滤条件
+    
+    多选字段可重复传参或逗号分隔，如 platform=TikTok&platform=YouTube 或 platform=TikTok,YouTube
+    """
+    return filters
@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, List
+
+def _default(value: Any) -> Any:
+    """JSON 序列化无法直接处理的类型"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _csv_value(value: Any) -> Any:
+    """转换为 CSV 单元格的值"""
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    return value
+
+async def encode_ndjson(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """逐批编码为 NDJSON，每行一条记录"""
+    async for rows in batches:
+        yield "".join(
+            json.dumps(dict(row), ensure_ascii=False, default=_default) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+async def encode_csv(batches: AsyncIterator[List[dict]], fields: List[str]) -> AsyncIterator[bytes]:
+    """逐批编码为 CSV，首行为表头；带 BOM 以便 Excel 正确识别 UTF-8"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+    
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([[_csv_value(row[field]) for field in fields] for row in rows])
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,340 @@
+"""
+请求级性能指标：按路由的延迟与响应大小、SQL 耗时（规范化语句）、连接池等待时间
+
+- MetricsMiddleware：纯 ASGI 中间件，记录请求指标并添加 Server-Timing 响应头
+- instrument_engine：在 AsyncEngine 上注册游标事件，记录 SQL 耗时与慢查询
+- InstrumentedAsyncPool：记录连接池取连接的等待时间与超时次数，并按需采集连接池饱和度
+- render：输出 Prometheus 文本格式
+"""
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """指标基类，按标签值组合分别计数"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {value:g}" if isinstance(value, float) else f"{name}{labels} {value}")
+        return lines
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = float(value)
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签值 -> [各区间计数..., 总和, 总数]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, f'le="{bound:g}"'), cumulative
+            yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, 'le="+Inf"'), state[-1]
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), float(state[-2])
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), state[-1]
+
+class Registry:
+    """进程内指标注册表"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """输出前调用的回调，用于刷新 Gauge 等按需采集的指标"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {str(e)}")
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size by route", ("method", "route"), SIZE_BUCKETS
+))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL execution time by normalized statement", ("statement",)
+))
+db_query_rows = registry.register(Histogram(
+    "db_query_rows", "Rows affected or returned by normalized statement", ("statement",), ROW_BUCKETS
+))
+db_slow_queries = registry.register(Counter(
+    "db_slow_queries_total", "Queries slower than SLOW_QUERY_THRESHOLD_MS", ("statement",)
+))
+db_query_errors = registry.register(Counter(
+    "db_query_errors_total", "Failed SQL statements by normalized statement", ("statement",)
+))
+db_pool_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("pool",)
+))
+db_pool_timeouts = registry.register(Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ("pool",)
+))
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections", "Pooled connections by state", ("pool", "state")
+))
+db_pool_saturation = registry.register(Gauge(
+    "db_pool_saturation", "Checked-out connections / (pool_size + max_overflow)", ("pool",)
+))
+db_replica_lag = registry.register(Gauge(
+    "db_replica_lag_seconds", "Replication lag of the read replica at the last check, -1 when unreachable"
+))
+
+def render() -> str:
+    """Prometheus 文本格式"""
+    return registry.render()
+
+# 规范化 SQL：参数、字面量与 IN 列表替换为占位符，语句种类有上限以控制标签基数
+_MAX_STATEMENTS = 500
+_statements: Dict[str, str] = {}
+_PATTERNS = (
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+|%\(\w+\)s|:\w+\b"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\?(?:\s*,\s*\?)+"), "?, ..."),
+)
+
+def normalize_sql(statement: str) -> str:
+    """规范化 SQL 语句，用作指标标签"""
+    normalized = _statements.get(statement)
+    if normalized is not None:
+        return normalized
+    normalized = statement.strip()
+    for pattern, replacement in _PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = normalized[:300]
+    if len(_statements) >= _MAX_STATEMENTS:
+        # 不再缓存新的语句原文，已知的规范化结果之外归为 other
+        return normalized if normalized in _statements.values() else "other"
+    _statements[statement] = normalized
+    return normalized
+
+class RequestTimings:
+    """单个请求内的数据库耗时统计，用于 Server-Timing"""
+
+    __slots__ = ("db", "queries", "pool")
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.pool = 0.0
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """记录取连接等待时间与超时次数的连接池"""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts.inc(self.metrics_name)
+            logger.warning(f"Connection pool '{self.metrics_name}' exhausted: {self.status()}")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            db_pool_wait.observe(elapsed, self.metrics_name)
+            timings = _request_timings.get()
+            if timings is not None:
+                timings.pool += elapsed
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary") -> None:
+    """注册 SQL 耗时、慢查询与连接池饱和度记录"""
+    sync_engine = engine.sync_engine
+    if isinstance(sync_engine.pool, InstrumentedAsyncPool):
+        sync_engine.pool.metrics_name = name
+
+    def collect_pool() -> None:
+        pool = sync_engine.pool
+        checked_out = pool.checkedout()
+        db_pool_connections.set(checked_out, name, "checked_out")
+        db_pool_connections.set(pool.checkedin(), name, "idle")
+        db_pool_connections.set(max(pool.overflow(), 0), name, "overflow")
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        db_pool_saturation.set(checked_out / capacity if capacity else 0.0, name)
+
+    registry.add_collector(collect_pool)
+
+    # 开始时间记录在本次执行的上下文上，失败的语句不会调用 after_cursor_execute，也不会残留在连接上
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "metrics_query_start", None)
+        if start is None:
+            return
+        context.metrics_query_start = None
+        elapsed = time.perf_counter() - start
+        label = normalize_sql(statement)
+        db_query_duration.observe(elapsed, label)
+        rowcount = getattr(cursor, "rowcount", -1)
+        if rowcount is not None and rowcount >= 0:
+            db_query_rows.observe(rowcount, label)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.db += elapsed
+            timings.queries += 1
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            db_slow_queries.inc(label)
+            logger.warning(f"Slow query ({elapsed * 1000:.1f}ms): {label}")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        if getattr(context, "metrics_query_start", None) is None:
+            return
+        context.metrics_query_start = None
+        db_query_errors.inc(normalize_sql(exception_context.statement or ""))
+
+class MetricsMiddleware:
+    """记录每个请求的延迟与响应大小，并添加 Server-Timing 响应头"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = (time.perf_counter() - start) * 1000
+                server_timing = (
+                    f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+                    f"pool;dur={timings.pool * 1000:.2f}, app;dur={elapsed:.2f}"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", server_timing.encode())]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+            # 使用路由模板而非实际路径，避免标签基数随 kol_id 增长
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_request_duration.observe(time.perf_counter() - start, method, route_label, str(status_code))
+            http_response_size.observe(size, method, route_label)
@@ -0,0 +1,65 @@
+"""
+写请求的载荷日志：按比例采样、限制长度，记录已解析的 pydantic 模型而不重新读取请求体
+
+默认关闭（REQUEST_LOG_SAMPLE_RATE=0），关闭时只有一次比较，不做任何序列化。
+"""
+import logging
+import random
+from typing import Any, Sequence
+
+from pydantic import BaseModel
+
+from app.core import serialization
+from app.core.config import settings
+
+logger = logging.getLogger("app.request_payload")
+
+def _dump(item: Any) -> Any:
+    if isinstance(item, BaseModel):
+        return item.model_dump(mode="json", exclude_unset=True)
+    return item
+
+def _preview(payload: Any, max_bytes: int) -> tuple:
+    """序列化载荷并截断到 max_bytes，列表逐条序列化，达到上限即停止"""
+    if isinstance(payload, (list, tuple)):
+        parts, size = [], 2
+        for item in payload:
+            part = serialization.dumps(_dump(item))
+            if size + len(part) + 1 > max_bytes:
+                return b"[" + b",".join(parts) + b"]", True
+            parts.append(part)
+            size += len(part) + 1
+        return b"[" + b",".join(parts) + b"]", False
+    body = serialization.dumps(_dump(payload))
+    if len(body) > max_bytes:
+        return body[:max_bytes], True
+    return body, False
+
+def should_log() -> bool:
+    """本次请求是否采样"""
+    rate = settings.REQUEST_LOG_SAMPLE_RATE
+    if rate <= 0 or not logger.isEnabledFor(logging.INFO):
+        return False
+    return rate >= 1 or random.random() < rate
+
+def log_payload(event: str, payload: Any, **fields: Any) -> None:
+    """
+    记录一条结构化的载荷日志（JSON），fields 为附加字段，如 kol_id
+
+    Args:
+        event: 事件名，如 kol.create
+        payload: 已解析的请求模型或模型列表
+    """
+    if not should_log():
+        return
+    try:
+        preview, truncated = _preview(payload, settings.REQUEST_LOG_MAX_BYTES)
+        record = {"event": event, **fields, "truncated": truncated}
+        if isinstance(payload, Sequence) and not isinstance(payload, (str, bytes)):
+            record["items"] = len(payload)
+        # 截断后的载荷可能不是合法 JSON，按字符串记录
+        record["payload"] = preview.decode("utf-8", errors="replace")
+        logger.info(serialization.dumps(record).decode(), extra={"event": event})
+    except Exception as e:
+        # 日志失败不影响请求
+        logger.warning(f"Payload logging failed for {event}: {str(e)}")
@@ -0,0 +1,36 @@
+"""
+JSON 快速序列化：直接编码数据库行（dict），跳过 pydantic 校验
+
+输出与 pydantic model_dump_json 一致：枚举输出值，带时区的时间输出 ISO 8601（UTC 为 Z 结尾）。
+未安装 orjson 时退回标准库 json。
+"""
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+def _default(value: Any) -> Any:
+    """标准库 json 的兜底编码"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        if value.utcoffset() is not None and value.utcoffset().total_seconds() == 0:
+            text = text[:-6] + "Z"
+        return text
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value: Any) -> bytes:
+    """编码为 JSON 字节串"""
+    if orjson is not None:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
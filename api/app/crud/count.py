@@ -0,0 +1,122 @@
+import json
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core import cache
+from app.core.config import settings
+from app.core.consistency import pinned_to_primary
+from app.db.models import KOL
+from app.schemas.kol import KOLFilter
+from app.crud.rollups import rollup_supports, count_from_rollups
+
+# 计数缓存：列表代数 + 规范化过滤条件 -> (过期时间, 总数, 是否精确)
+# 每个进程各自缓存，键中的列表代数来自共享的缓存后端，任一进程写入后其他进程的旧计数随之失效
+_count_cache: Dict[str, Tuple[float, int, bool]] = {}
+_COUNT_CACHE_MAX_ENTRIES = 1024
+
+def _cache_key(filters: KOLFilter) -> str:
+    """规范化过滤条件，作为计数缓存的键"""
+    data = filters.model_dump(mode="json", exclude_none=True)
+    # name/location 为不区分大小写的模糊匹配
+    for field in ("name", "location"):
+        if field in data:
+            data[field] = data[field].strip().lower()
+    # 多选条件与顺序无关
+    for field, value in data.items():
+        if isinstance(value, list):
+            data[field] = sorted(set(value))
+    return json.dumps(data, sort_keys=True)
+
+def clear_count_cache() -> None:
+    """清空计数缓存"""
+    _count_cache.clear()
+
+async def _estimate_table_rows(db: AsyncSession) -> Optional[int]:
+    """从 pg_class.reltuples 读取全表行数预估，表未分析过时返回 None"""
+    estimate = await db.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": KOL.__tablename__}
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) 包裹的查询，参数与原查询一样绑定传入（数组参数保留类型）"""
+    inherit_cache = False
+
+    def __init__(self, query: Select):
+        self.query = query
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.query, **kw)}"
+
+async def explain_plan(db: AsyncSession, query: Select) -> dict:
+    """执行 EXPLAIN，返回查询计划的根节点"""
+    plan = (await db.execute(Explain(query))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+async def _estimate_query_rows(db: AsyncSession, query: Select) -> Optional[int]:
+    """通过 EXPLAIN 读取查询计划中的预估行数"""
+    plan = await explain_plan(db, query)
+    try:
+        return int(plan["Plan Rows"])
+    except (KeyError, TypeError):
+        return None
+
+async def _count_from_table(db: AsyncSession, filters: KOLFilter, query: Select) -> Tuple[int, bool]:
+    """预估行数较小时精确计数，否则返回预估值"""
+    if filters.model_dump(exclude_none=True):
+        estimate = await _estimate_query_rows(db, query)
+    else:
+        estimate = await _estimate_table_rows(db)
+    
+    if estimate is None or estimate < settings.COUNT_EXACT_THRESHOLD:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        return total, True
+    return estimate, False
+
+async def count_kols(db: AsyncSession, filters: KOLFilter, query: Select) -> Tuple[int, bool]:
+    """
+    统计过滤后的KOL总数
+    
+    - 过滤条件只涉及汇总表维度时从汇总表精确计数
+    - 预估行数较小或过滤条件选择性高时执行精确计数
+    - 大范围扫描时使用 pg_class.reltuples / EXPLAIN 的预估值
+    - 结果按规范化过滤条件短时缓存
+    
+    Returns:
+        tuple[int, bool]: (总数, 是否为精确值)
+    """
+    generation = await cache.backend.get_counter(cache.LIST_GENERATION_KEY)
+    key = f"{generation}:{_cache_key(filters)}"
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    # 刚写入过的客户端读主库，不使用可能来自副本的缓存计数
+    if cached and cached[0] > now and not pinned_to_primary():
+        return cached[1], cached[2]
+    
+    if settings.STATS_USE_ROLLUPS and rollup_supports(filters):
+        # 过滤条件只涉及汇总表维度时，从汇总表直接得到精确总数
+        total, exact = await count_from_rollups(db, filters), True
+    else:
+        total, exact = await _count_from_table(db, filters, query)
+    
+    if settings.COUNT_CACHE_TTL > 0:
+        if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+            # 先清理过期项，仍然过多时整体清空
+            for expired in [k for k, v in _count_cache.items() if v[0] <= now]:
+                del _count_cache[expired]
+            if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+                _count_cache.clear()
+        _count_cache[key] = (now + settings.COUNT_CACHE_TTL, total, exact)
+    
+    return total, exact
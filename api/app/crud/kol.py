@@ -1,10 +1,43 @@
+import base64
+import json
 from datetime import datetime
-from typing import List, Optional, Tuple
-from sqlalchemy import select, func, desc
+from typing import AsyncIterator, List, Optional, Tuple
+from sqlalchemy import select, insert, update, delete, func, desc, tuple_, any_, or_, bindparam, literal_column, type_coerce, String, Text
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 
-from app.db.models import KOL
+from app.db.models import KOL, NULLABLE_SORT_FIELDS, TAGS_EXPRESSION
 from app.schemas.kol import KOLCreate, KOLUpdate, KOLFilter, KOLResponse
+from app.crud.count import count_kols
+from app.core.cache import invalidate_kols
+
+# 可导出/投影的字段，与 KOLResponse 一致
+KOL_FIELDS = ["id", "kol_id"] + [field for field in KOLResponse.model_fields if field not in ("id", "kol_id")]
+# 完整响应的字段，顺序与 KOLResponse 序列化结果一致
+RESPONSE_FIELDS = tuple(KOLResponse.model_fields)
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """解析逗号分隔的字段列表，为空时返回全部字段，包含未知字段时抛出 ValueError"""
+    if not fields:
+        return list(KOL_FIELDS)
+    selected = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in selected if field not in KOL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+def projection_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """解析 fields= 投影参数，按 KOL_FIELDS 顺序规范化，为空时返回 None 表示完整字段"""
+    if not fields:
+        return None
+    selected = set(parse_fields(fields))
+    return tuple(field for field in KOL_FIELDS if field in selected)
+
+def select_fields(fields: List[str], *extra: str) -> Select:
+    """只查询指定字段（及 extra 中的字段）的查询"""
+    return select(*[getattr(KOL, field) for field in dict.fromkeys([*fields, *extra])])
 
 async def create_kol(db: AsyncSession, kol: KOLCreate) -> KOL:
     """创建单个KOL"""
@@ -24,29 +57,156 @@ async def create_kol(db: AsyncSession, kol: KOLCreate) -> KOL:
     db.add(db_kol)
     await db.commit()
     await db.refresh(db_kol)
+    await invalidate_kols([db_kol.kol_id])
     return db_kol
 
 async def create_kols_batch(db: AsyncSession, kols: List[KOLCreate]) -> List[KOL]:
-    """批量创建KOL"""
+    """批量创建KOL，固定次数的数据库往返：一次存在性检查 + 一次多行 INSERT ... RETURNING"""
     # 检查 kol_id 是否有重复
     kol_ids = [kol.kol_id for kol in kols]
     if len(kol_ids) != len(set(kol_ids)):
         raise ValueError("Duplicate kol_id found in batch create request")
     
-    # 检查数据库中是否已存在相同的 kol_id
+    # 一次查询检查数据库中是否已存在相同的 kol_id
+    result = await db.execute(
+        select(KOL.kol_id).filter(KOL.kol_id == any_(bindparam("kol_ids", kol_ids, type_=ARRAY(String))))
+    )
+    existing_ids = set(result.scalars().all())
     for kol_id in kol_ids:
-        existing_kol = await get_kol_by_kol_id(db, kol_id)
-        if existing_kol:
+        if kol_id in existing_ids:
             raise ValueError(f"KOL with kol_id {kol_id} already exists")
     
-    # 创建新的 KOL
-    db_kols = [KOL(**kol.model_dump(exclude_none=True)) for kol in kols]  # 排除所有 None 值
-    db.add_all(db_kols)
+    # 多行插入并直接返回完整记录，无需逐条 refresh
+    # 所有行使用相同的列集合，保证合并为一条 INSERT 语句；None 与缺省值等价
+    rows = [kol.model_dump() for kol in kols]
+    result = await db.scalars(
+        insert(KOL).returning(KOL, sort_by_parameter_order=True),
+        rows
+    )
+    db_kols = list(result.all())
     await db.commit()
-    for db_kol in db_kols:
-        await db.refresh(db_kol)
+    await invalidate_kols(kol_ids)
     return db_kols
 
+# 批量 upsert 每条语句的最大行数（asyncpg 单语句参数上限为 32767）
+UPSERT_CHUNK_SIZE = 500
+# 需要在 upsert 前检查归属的唯一字段
+UNIQUE_FIELDS = ("email", "slug", "creator_id")
+
+def _upsert_statement(rows: List[dict]):
+    """构建 INSERT ... ON CONFLICT (kol_id) DO UPDATE，仅更新请求中提供的字段"""
+    stmt = pg_insert(KOL).values(rows)
+    update_cols = {key: stmt.excluded[key] for key in rows[0] if key != "kol_id"}
+    update_cols["updated_at"] = func.now()
+    return (
+        stmt.on_conflict_do_update(index_elements=[KOL.kol_id], set_=update_cols)
+        .returning(KOL.kol_id, literal_column("xmax = 0").label("created"))
+    )
+
+async def _find_unique_owners(db: AsyncSession, rows: List[dict]) -> dict:
+    """一次查询获取 email/slug/creator_id 当前归属的 kol_id"""
+    values = {
+        field: list({row[field] for row in rows if row.get(field) is not None})
+        for field in UNIQUE_FIELDS
+    }
+    conditions = [
+        getattr(KOL, field) == any_(bindparam(f"{field}_values", field_values, type_=ARRAY(String)))
+        for field, field_values in values.items() if field_values
+    ]
+    owners = {field: {} for field in UNIQUE_FIELDS}
+    if not conditions:
+        return owners
+    
+    result = await db.execute(
+        select(KOL.kol_id, KOL.email, KOL.slug, KOL.creator_id).filter(or_(*conditions))
+    )
+    for row in result:
+        for field in UNIQUE_FIELDS:
+            value = getattr(row, field)
+            if value is not None:
+                owners[field][value] = row.kol_id
+    return owners
+
+async def upsert_kols(db: AsyncSession, kols: List[KOLCreate]) -> List[dict]:
+    """
+    批量 upsert KOL，基于 INSERT ... ON CONFLICT (kol_id) DO UPDATE
+    
+    - 已存在的记录只更新请求中提供的字段
+    - email/slug/creator_id 已被其他 KOL 占用的行标记为 conflict
+    - 单个分块写入失败时逐行重试，失败行标记为 error，不影响其他行
+    
+    Returns:
+        与输入顺序一致的结果列表，每项包含 kol_id、status(created/updated/conflict/error)、detail
+    """
+    rows = [kol.model_dump(exclude_unset=True) for kol in kols]
+    results: List[Optional[dict]] = [None] * len(rows)
+    
+    # 预检查：批内重复 kol_id 与唯一字段冲突
+    owners = await _find_unique_owners(db, rows)
+    seen_ids = set()
+    pending = []
+    for index, row in enumerate(rows):
+        kol_id = row["kol_id"]
+        if kol_id in seen_ids:
+            results[index] = {"kol_id": kol_id, "status": "error", "detail": "Duplicate kol_id in batch"}
+            continue
+        seen_ids.add(kol_id)
+        
+        conflict = None
+        for field in UNIQUE_FIELDS:
+            value = row.get(field)
+            if value is None:
+                continue
+            owner = owners[field].setdefault(value, kol_id)
+            if owner != kol_id:
+                conflict = f"{field} {value} already used by KOL {owner}"
+                break
+        if conflict:
+            results[index] = {"kol_id": kol_id, "status": "conflict", "detail": conflict}
+            continue
+        pending.append(index)
+    
+    # 按字段集合分组，保证每条语句的列一致
+    groups = {}
+    for index in pending:
+        groups.setdefault(tuple(sorted(rows[index])), []).append(index)
+    
+    for indexes in groups.values():
+        for start in range(0, len(indexes), UPSERT_CHUNK_SIZE):
+            chunk = indexes[start:start + UPSERT_CHUNK_SIZE]
+            try:
+                async with db.begin_nested():
+                    result = await db.execute(_upsert_statement([rows[i] for i in chunk]))
+                    created = {row.kol_id: row.created for row in result}
+                for i in chunk:
+                    kol_id = rows[i]["kol_id"]
+                    results[i] = {
+                        "kol_id": kol_id,
+                        "status": "created" if created.get(kol_id) else "updated",
+                        "detail": None
+                    }
+            except SQLAlchemyError:
+                # 分块失败时逐行重试，定位失败行
+                for i in chunk:
+                    kol_id = rows[i]["kol_id"]
+                    try:
+                        async with db.begin_nested():
+                            result = await db.execute(_upsert_statement([rows[i]]))
+                            row = result.one()
+                        results[i] = {
+                            "kol_id": kol_id,
+                            "status": "created" if row.created else "updated",
+                            "detail": None
+                        }
+                    except SQLAlchemyError as e:
+                        results[i] = {"kol_id": kol_id, "status": "error", "detail": str(getattr(e, "orig", None) or e)}
+    
+    await db.commit()
+    await invalidate_kols(
+        result["kol_id"] for result in results if result["status"] in ("created", "updated")
+    )
+    return results
+
 async def get_kol_by_id(db: AsyncSession, kol_id: int) -> Optional[KOL]:
     """通过 ID 获取单个 KOL"""
     result = await db.execute(select(KOL).filter(KOL.id == kol_id))
@@ -57,68 +217,275 @@ async def get_kol_by_kol_id(db: AsyncSession, kol_id: str) -> Optional[KOL]:
     result = await db.execute(select(KOL).filter(KOL.kol_id == kol_id))
     return result.scalar_one_or_none()
 
-async def update_kol(db: AsyncSession, db_kol: KOL, kol_update: KOLUpdate) -> KOL:
-    """更新KOL信息"""
+async def get_kol_fields(db: AsyncSession, kol_id: str, fields: List[str]) -> Optional[dict]:
+    """通过 kol_id 获取单个 KOL 的指定字段"""
+    result = await db.execute(select_fields(fields).filter(KOL.kol_id == kol_id))
+    row = result.one_or_none()
+    return dict(zip(fields, row)) if row is not None else None
+
+class VersionConflictError(Exception):
+    """KOL 已被其他请求修改，版本号与期望不一致"""
+    def __init__(self, kol_id: str, expected: int, current: int):
+        self.kol_id = kol_id
+        self.expected = expected
+        self.current = current
+        super().__init__(f"KOL {kol_id} has been modified: expected version {expected}, current version {current}")
+
+async def update_kol(
+    db: AsyncSession,
+    kol_id: str,
+    kol_update: KOLUpdate,
+    expected_version: Optional[int] = None
+) -> Optional[KOL]:
+    """
+    更新KOL信息，单条 UPDATE ... RETURNING 完成
+    
+    Args:
+        expected_version: 期望的当前版本号，为空时不做并发检查
+    
+    Returns:
+        KOL | None: 更新后的KOL，不存在时返回 None
+    
+    Raises:
+        VersionConflictError: 版本号与 expected_version 不一致
+    """
     update_data = kol_update.model_dump(exclude_none=True)  # 排除所有 None 值
     
-    # 更新时间戳
-    update_data['updated_at'] = datetime.now()
+    # 更新时间戳，version 由触发器递增
+    update_data['updated_at'] = func.now()
     
-    for field, value in update_data.items():
-        setattr(db_kol, field, value)
+    statement = update(KOL).where(KOL.kol_id == kol_id).values(**update_data)
+    if expected_version is not None:
+        statement = statement.where(KOL.version == expected_version)
+    statement = statement.returning(KOL).execution_options(populate_existing=True)
+    
+    db_kol = (await db.scalars(statement)).one_or_none()
+    if db_kol is None:
+        await db.rollback()
+        if expected_version is not None:
+            # 区分记录不存在与版本冲突
+            current = await db.scalar(select(KOL.version).where(KOL.kol_id == kol_id))
+            if current is not None:
+                raise VersionConflictError(kol_id, expected_version, current)
+        return None
     
     await db.commit()
-    await db.refresh(db_kol)
+    await invalidate_kols([kol_id])
     return db_kol
 
 async def delete_kol(db: AsyncSession, db_kol: KOL):
     """删除KOL"""
+    kol_id = db_kol.kol_id
     await db.delete(db_kol)
     await db.commit()
+    await invalidate_kols([kol_id])
+
+def _bulk_target(statement, kol_ids: Optional[List[str]], filters: Optional[KOLFilter]):
+    """批量操作的 WHERE：kol_id 列表（单个数组参数）或过滤条件"""
+    if kol_ids is not None:
+        return statement.where(KOL.kol_id == any_(bindparam("kol_ids", kol_ids, type_=ARRAY(String))))
+    return apply_filters(statement, filters)
+
+async def bulk_update_kols(
+    db: AsyncSession,
+    patch: KOLUpdate,
+    kol_ids: Optional[List[str]] = None,
+    filters: Optional[KOLFilter] = None
+) -> int:
+    """
+    将同一组字段更新到所有目标KOL，单条 UPDATE ... RETURNING 完成
+    
+    Returns:
+        int: 更新的KOL数量
+    
+    Raises:
+        ValueError: 更新内容为空或包含唯一字段
+    """
+    values = patch.model_dump(exclude_none=True)
+    if not values:
+        raise ValueError("patch 不能为空")
+    unique = [field for field in UNIQUE_FIELDS if field in values]
+    if unique:
+        raise ValueError(f"唯一字段不能批量更新: {', '.join(unique)}")
+    values["updated_at"] = func.now()
+    
+    statement = _bulk_target(update(KOL).values(**values), kol_ids, filters)
+    statement = statement.returning(KOL.kol_id).execution_options(synchronize_session=False)
+    updated = (await db.scalars(statement)).all()
+    await db.commit()
+    await invalidate_kols(updated)
+    return len(updated)
+
+async def bulk_delete_kols(
+    db: AsyncSession,
+    kol_ids: Optional[List[str]] = None,
+    filters: Optional[KOLFilter] = None
+) -> int:
+    """
+    删除所有目标KOL，单条 DELETE ... RETURNING 完成
+    
+    Returns:
+        int: 删除的KOL数量
+    """
+    statement = _bulk_target(delete(KOL), kol_ids, filters)
+    statement = statement.returning(KOL.kol_id).execution_options(synchronize_session=False)
+    deleted = (await db.scalars(statement)).all()
+    await db.commit()
+    await invalidate_kols(deleted)
+    return len(deleted)
+
+def encode_cursor(updated_at: datetime, id: int) -> str:
+    """将 (updated_at, id) 编码为不透明游标"""
+    raw = json.dumps([updated_at.isoformat(), id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(updated_at), int(id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+# 数值区间过滤：列名 -> (下界参数, 上界参数)
+RANGE_FILTERS = {
+    "followers_k": ("min_followers", "max_followers"),
+    **{
+        metric: (f"min_{metric}", f"max_{metric}")
+        for metric in (
+            "likes_k", "mean_views_k", "median_views_k", "engagement_rate",
+            "average_views_k", "average_likes_k", "average_comments_k",
+        )
+    },
+    "send_date": ("send_date_from", "send_date_to"),
+    "export_date": ("export_date_from", "export_date_to"),
+}
+# 多选过滤的枚举字段
+IN_FILTERS = ("platform", "level", "gender", "source", "send_status")
+# 数组包含过滤：过滤参数 -> (字段, 是否要求包含全部)
+ARRAY_FILTERS = {
+    "hashtags_any": ("most_used_hashtags", False),
+    "hashtags_all": ("most_used_hashtags", True),
+    "keywords_any": ("keywords_ai", False),
+    "keywords_all": ("keywords_ai", True),
+    "tags_any": ("tags", False),
+    "tags_all": ("tags", True),
+}
+# tag 拆分后的小写标签数组，与 ix_kols_tags_gin 索引表达式一致
+KOL_TAGS = literal_column(TAGS_EXPRESSION, type_=ARRAY(Text))
+
+def array_column(field: str):
+    """数组过滤/统计使用的列，tags 为 tag 拆分后的表达式"""
+    if field == "tags":
+        return KOL_TAGS
+    return type_coerce(getattr(KOL, field), ARRAY(String))
+
+# 允许排序的字段，每个字段都有 (字段, id) 索引
+SORT_FIELDS = (
+    "name", "followers_k", "likes_k", "mean_views_k", "median_views_k", "engagement_rate",
+    "average_views_k", "average_likes_k", "average_comments_k",
+    "send_date", "export_date", "created_at", "updated_at",
+)
+DEFAULT_SORT = [("updated_at", True)]
+
+def apply_filters(query: Select, filters: KOLFilter) -> Select:
+    """添加过滤条件"""
+    if filters.name:
+        query = query.filter(KOL.name.ilike(f"%{filters.name}%"))
+    if filters.location:
+        query = query.filter(KOL.location.ilike(f"%{filters.location}%"))
+    for field in IN_FILTERS:
+        values = getattr(filters, field)
+        if values:
+            column = getattr(KOL, field)
+            query = query.filter(column == values[0] if len(values) == 1 else column.in_(values))
+    for field, (lower, upper) in RANGE_FILTERS.items():
+        column = getattr(KOL, field)
+        if getattr(filters, lower) is not None:
+            query = query.filter(column >= getattr(filters, lower))
+        if getattr(filters, upper) is not None:
+            query = query.filter(column <= getattr(filters, upper))
+    # 数组过滤使用 && / @>，命中 GIN 索引
+    for param, (field, match_all) in ARRAY_FILTERS.items():
+        values = getattr(filters, param)
+        if values:
+            if field == "tags":
+                values = [value.lower() for value in values]
+            column = array_column(field)
+            query = query.filter(column.contains(values) if match_all else column.overlap(values))
+    return query
+
+def parse_sort(sort: Optional[str]) -> List[Tuple[str, bool]]:
+    """
+    解析排序参数，如 "-followers_k,name"，前缀 - 表示降序
+    
+    Returns:
+        List[tuple[str, bool]]: [(字段, 是否降序)]，为空时返回默认排序（updated_at 降序）
+    
+    Raises:
+        ValueError: 包含不支持排序的字段
+    """
+    if not sort:
+        return list(DEFAULT_SORT)
+    keys = []
+    for part in sort.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        descending = part.startswith("-")
+        field = part.lstrip("+-")
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {field}, allowed: {', '.join(SORT_FIELDS)}")
+        if field not in [key for key, _ in keys]:
+            keys.append((field, descending))
+    return keys or list(DEFAULT_SORT)
+
+def sort_clause(field: str, descending: bool):
+    """
+    单个排序键，可能为空的字段无论升降序空值都排在最后，避免缺少指标的KOL占满首页
+
+    升序使用 (字段, id) 索引，降序使用 (字段 DESC NULLS LAST, id DESC) 索引；
+    created_at / updated_at 写入时总会设置，降序沿用 (字段, id) 索引的反向扫描
+    """
+    column = getattr(KOL, field)
+    if field not in NULLABLE_SORT_FIELDS:
+        return column.desc() if descending else column.asc()
+    return column.desc().nulls_last() if descending else column.asc().nulls_last()
+
+def apply_sort(query: Select, sort: List[Tuple[str, bool]]) -> Select:
+    """添加排序，末尾追加与首个排序键同方向的 id 保证顺序稳定，可直接使用对应的复合索引"""
+    clauses = [sort_clause(field, descending) for field, descending in sort]
+    clauses.append(desc(KOL.id) if sort[0][1] else KOL.id)
+    return query.order_by(*clauses)
 
 async def get_kols(
     db: AsyncSession,
     filters: KOLFilter,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    sort: Optional[List[Tuple[str, bool]]] = None,
+    fields: Optional[List[str]] = None
 ) -> dict:
-    """获取KOL列表，支持分页和过滤"""
+    """获取KOL列表，支持分页、过滤和排序，指定 fields 时只查询这些字段并返回字典（不构建ORM对象）"""
     # 构建基础查询
-    query = select(KOL)
+    query = apply_filters(select(KOL) if fields is None else select_fields(fields), filters)
     
-    # 添加过滤条件
-    if filters.name:
-        query = query.filter(KOL.name.ilike(f"%{filters.name}%"))
-    if filters.platform:
-        query = query.filter(KOL.platform == filters.platform)
-    if filters.level:
-        query = query.filter(KOL.level == filters.level)
-    if filters.gender:
-        query = query.filter(KOL.gender == filters.gender)
-    if filters.location:
-        query = query.filter(KOL.location.ilike(f"%{filters.location}%"))
-    if filters.source:
-        query = query.filter(KOL.source == filters.source)
-    if filters.send_status:
-        query = query.filter(KOL.send_status == filters.send_status)
-    if filters.min_followers is not None:
-        query = query.filter(KOL.followers_k >= filters.min_followers)
-    if filters.max_followers is not None:
-        query = query.filter(KOL.followers_k <= filters.max_followers)
-    
-    # 添加排序：按更新时间倒序
-    query = query.order_by(desc(KOL.updated_at))
-    
-    # 获取总记录数
-    total_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(total_query)
+    # 获取总记录数（精确值或预估值）
+    total, total_exact = await count_kols(db, filters, query)
+    
+    # 添加排序：默认按更新时间倒序
+    query = apply_sort(query, sort or DEFAULT_SORT)
     
     # 添加分页
     query = query.offset((page - 1) * size).limit(size)
     
     # 执行查询
     result = await db.execute(query)
-    items = result.scalars().all()
+    if fields is None:
+        items = result.scalars().all()
+    else:
+        items = [dict(zip(fields, row)) for row in result]
     
     # 计算总页数
     pages = (total + size - 1) // size
@@ -126,7 +493,60 @@ async def get_kols(
     return {
         "items": items,
         "total": total,
+        "total_exact": total_exact,
         "page": page,
         "size": size,
         "pages": pages
     }
+
+async def get_kols_by_cursor(
+    db: AsyncSession,
+    filters: KOLFilter,
+    cursor: Optional[str] = None,
+    size: int = 10,
+    fields: Optional[List[str]] = None
+) -> dict:
+    """获取KOL列表，使用 (updated_at, id) 游标分页，深度翻页延迟恒定"""
+    # 指定 fields 时额外查询游标所需的 updated_at 与 id
+    query = select(KOL) if fields is None else select_fields(fields, "updated_at", "id")
+    query = apply_filters(query, filters)
+    
+    # 从游标位置继续读取，命中 ix_kols_updated_at_id 索引
+    if cursor:
+        updated_at, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(KOL.updated_at, KOL.id) < tuple_(updated_at, last_id))
+    
+    # 多取一条用于判断是否还有下一页
+    query = query.order_by(desc(KOL.updated_at), desc(KOL.id)).limit(size + 1)
+    
+    result = await db.execute(query)
+    rows = list(result.scalars().all()) if fields is None else result.all()
+    
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+    
+    # 行中可能包含额外查询的游标字段，只保留 fields
+    items = rows if fields is None else [dict(zip(fields, row)) for row in rows]
+    
+    return {
+        "items": items,
+        "size": size,
+        "next_cursor": next_cursor
+    }
+
+async def stream_kols(
+    db: AsyncSession,
+    filters: KOLFilter,
+    fields: List[str],
+    batch_size: int = 1000
+) -> AsyncIterator[List[dict]]:
+    """通过服务端游标分批读取KOL，只查询指定字段，内存占用与总行数无关"""
+    query = apply_filters(select(*[getattr(KOL, field) for field in fields]), filters)
+    query = query.order_by(KOL.id).execution_options(yield_per=batch_size)
+    
+    result = await db.stream(query)
+    async for partition in result.mappings().partitions(batch_size):
+        yield partition
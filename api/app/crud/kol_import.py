@@ -0,0 +1,241 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+
+from app.core import cache, serialization
+from app.db.base import async_session_maker
+from app.schemas.kol import KOLCreate
+from app.crud.kol import upsert_kols
+
+logger = logging.getLogger(__name__)
+
+# 每批校验与写入的行数
+IMPORT_CHUNK_SIZE = 1000
+# 每个任务保留的失败行明细上限
+MAX_ERROR_DETAILS = 1000
+# 内存中保留的任务数上限
+MAX_JOBS = 100
+
+# 常见表头别名（飞书多维表格 / 第三方平台导出），统一小写匹配
+HEADER_ALIASES = {
+    "kol id": "kol_id",
+    "kol name": "name",
+    "account link": "account_link",
+    "creator id": "creator_id",
+    "followers(k)": "followers_k",
+    "likes(k)": "likes_k",
+    "mean views(k)": "mean_views_k",
+    "median views(k)": "median_views_k",
+    "engagement rate(%)": "engagement_rate",
+    "average views(k)": "average_views_k",
+    "average likes(k)": "average_likes_k",
+    "average comments(k)": "average_comments_k",
+    "send status": "send_status",
+    "send date": "send_date",
+    "export date": "export_date",
+    "keywords-ai": "keywords_ai",
+    "most used hashtags": "most_used_hashtags",
+}
+ARRAY_FIELDS = ("keywords_ai", "most_used_hashtags")
+# Excel 中可能被识别为数字的文本字段
+TEXT_FIELDS = ("kol_id", "creator_id", "slug", "name", "tag", "language", "location", "filter")
+
+# 导入任务：job_id -> 任务状态，由执行任务的进程维护
+_jobs: Dict[str, dict] = {}
+# 任务状态同时写入缓存后端，多进程部署（CACHE_BACKEND=redis）时任意进程都能查询进度
+JOB_KEY_PREFIX = "kol:import:"
+JOB_TTL = 86400.0
+
+async def _save_job(job: dict) -> None:
+    """将任务状态写入缓存后端，失败时只记录日志"""
+    try:
+        await cache.backend.set(JOB_KEY_PREFIX + job["job_id"], serialization.dumps(job), JOB_TTL)
+    except Exception as e:
+        logger.warning(f"Failed to save import job {job['job_id']}: {str(e)}")
+
+async def create_job(filename: Optional[str], file_format: str) -> dict:
+    """登记导入任务"""
+    if len(_jobs) >= MAX_JOBS:
+        # 优先清理已结束的最早任务
+        finished = [job_id for job_id, job in _jobs.items() if job["status"] in ("completed", "failed")]
+        for job_id in finished[:len(_jobs) - MAX_JOBS + 1]:
+            del _jobs[job_id]
+    
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "filename": filename,
+        "format": file_format,
+        "status": "pending",
+        "processed": 0,
+        "created": 0,
+        "updated": 0,
+        "conflicts": 0,
+        "errors": 0,
+        "error_details": [],
+        "detail": None,
+        "created_at": datetime.utcnow(),
+        "finished_at": None,
+    }
+    _jobs[job["job_id"]] = job
+    await _save_job(job)
+    return job
+
+async def get_job(job_id: str) -> Optional[dict]:
+    """获取导入任务状态，任务由其他进程执行时从缓存后端读取"""
+    job = _jobs.get(job_id)
+    if job is not None:
+        return job
+    try:
+        value = await cache.backend.get(JOB_KEY_PREFIX + job_id)
+    except Exception as e:
+        logger.warning(f"Failed to load import job {job_id}: {str(e)}")
+        return None
+    return json.loads(value) if value else None
+
+def _read_csv(path: str) -> Iterator[Tuple[int, Any]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        # 第 1 行为表头
+        for row_number, row in enumerate(csv.DictReader(f), start=2):
+            yield row_number, row
+
+def _read_ndjson(path: str) -> Iterator[Tuple[int, Any]]:
+    with open(path, encoding="utf-8-sig") as f:
+        for row_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as e:
+                yield row_number, e
+
+def _read_xlsx(path: str) -> Iterator[Tuple[int, Any]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("Excel import requires openpyxl")
+    
+    # 只读模式按行流式读取
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(cell) if cell is not None else "" for cell in header]
+        for row_number, values in enumerate(rows, start=2):
+            if all(value is None for value in values):
+                continue
+            yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+ROW_READERS: Dict[str, Callable[[str], Iterator[Tuple[int, Any]]]] = {
+    "csv": _read_csv,
+    "ndjson": _read_ndjson,
+    "xlsx": _read_xlsx,
+}
+
+def _normalize_row(data: Any) -> Any:
+    """统一表头并清理单元格：空值视为未提供，数组字段支持逗号分隔"""
+    if not isinstance(data, dict):
+        return data
+    row = {}
+    for key, value in data.items():
+        if key is None:
+            continue
+        name = str(key).strip()
+        name = HEADER_ALIASES.get(name.lower(), name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        if name in ARRAY_FIELDS and isinstance(value, str):
+            value = [item.strip() for item in value.split(",") if item.strip()]
+        elif name in TEXT_FIELDS and isinstance(value, (int, float)):
+            value = str(int(value) if isinstance(value, float) and value.is_integer() else value)
+        row[name] = value
+    return row
+
+def _format_error(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+    return str(e)
+
+def _record_error(job: dict, row_number: int, kol_id: Optional[str], detail: str) -> None:
+    job["errors"] += 1
+    if len(job["error_details"]) < MAX_ERROR_DETAILS:
+        job["error_details"].append({"row": row_number, "kol_id": kol_id, "detail": detail})
+
+async def run_import(job_id: str, path: str, file_format: str) -> None:
+    """
+    执行导入任务
+    
+    - 按块读取文件（在线程中执行，避免阻塞事件循环）
+    - 每块逐行通过 KOLCreate 校验
+    - 校验通过的行以批量 upsert 写入，逐行结果计入任务
+    """
+    job = _jobs[job_id]
+    job["status"] = "running"
+    await _save_job(job)
+    try:
+        rows = ROW_READERS[file_format](path)
+        async with async_session_maker() as db:
+            while True:
+                chunk = await asyncio.to_thread(lambda: list(islice(rows, IMPORT_CHUNK_SIZE)))
+                if not chunk:
+                    break
+                
+                kols: List[KOLCreate] = []
+                row_numbers: List[int] = []
+                for row_number, data in chunk:
+                    if isinstance(data, Exception):
+                        _record_error(job, row_number, None, f"Invalid JSON: {data}")
+                        continue
+                    row = _normalize_row(data)
+                    try:
+                        kols.append(KOLCreate.model_validate(row))
+                        row_numbers.append(row_number)
+                    except ValidationError as e:
+                        # 表头可能为别名（如 KOL ID），从规范化后的行读取
+                        kol_id = row.get("kol_id") if isinstance(row, dict) else None
+                        _record_error(job, row_number, kol_id, _format_error(e))
+                
+                if kols:
+                    results = await upsert_kols(db, kols)
+                    for row_number, result in zip(row_numbers, results):
+                        if result["status"] == "created":
+                            job["created"] += 1
+                        elif result["status"] == "updated":
+                            job["updated"] += 1
+                        elif result["status"] == "conflict":
+                            job["conflicts"] += 1
+                            if len(job["error_details"]) < MAX_ERROR_DETAILS:
+                                job["error_details"].append(
+                                    {"row": row_number, "kol_id": result["kol_id"], "detail": result["detail"]}
+                                )
+                        else:
+                            _record_error(job, row_number, result["kol_id"], result["detail"])
+                
+                job["processed"] += len(chunk)
+                await _save_job(job)
+        job["status"] = "completed"
+    except Exception as e:
+        logger.error(f"Import job {job_id} failed: {str(e)}")
+        job["status"] = "failed"
+        job["detail"] = str(e)
+    finally:
+        job["finished_at"] = datetime.utcnow()
+        await _save_job(job)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,132 @@
+from enum import Enum
+from typing import Dict, List, Optional, Type
+from sqlalchemy import select, func, cast, delete, insert, text, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.cache import invalidate_kols
+from app.db.ddl import ROLLUP_DIMENSIONS
+from app.db.models import KOL, KOLRollup, Platform, Level, Gender, Source, SendStatus
+from app.schemas.kol import KOLFilter
+
+# 汇总表维度对应的枚举类型，汇总表中存储的是枚举名称
+ROLLUP_ENUMS: Dict[str, Type[Enum]] = {
+    "platform": Platform,
+    "level": Level,
+    "gender": Gender,
+    "source": Source,
+    "send_status": SendStatus,
+}
+# 汇总表中的聚合列：只维护数量，指标的分位数、均值与直方图仍实时计算（结果经响应缓存）
+ROLLUP_MEASURES = ("kol_count",)
+
+def rollup_supports(filters: KOLFilter) -> bool:
+    """过滤条件是否只涉及汇总表的维度，可直接由汇总表回答"""
+    return set(filters.model_dump(exclude_none=True)) <= set(ROLLUP_DIMENSIONS)
+
+def _apply_rollup_filters(query: Select, filters: KOLFilter) -> Select:
+    """在汇总表上应用过滤条件，语义与 apply_filters 一致"""
+    for field in ROLLUP_ENUMS:
+        values = getattr(filters, field)
+        if values:
+            query = query.filter(getattr(KOLRollup, field).in_([value.name for value in values]))
+    if filters.location:
+        query = query.filter(KOLRollup.location.ilike(f"%{filters.location}%"))
+    return query
+
+def _to_value(field: str, stored: str) -> Optional[str]:
+    """汇总表中的维度值（枚举名称，空字符串表示空值）转换为接口返回的值"""
+    if stored == "":
+        return None
+    enum_type = ROLLUP_ENUMS.get(field)
+    if enum_type is None:
+        return stored
+    try:
+        return enum_type[stored].value
+    except KeyError:
+        return stored
+
+async def count_from_rollups(db: AsyncSession, filters: KOLFilter) -> int:
+    """从汇总表读取精确总数"""
+    query = _apply_rollup_filters(select(func.coalesce(func.sum(KOLRollup.kol_count), 0)), filters)
+    return int(await db.scalar(query))
+
+async def get_rollup_distributions(
+    db: AsyncSession,
+    filters: KOLFilter,
+    fields: List[str]
+) -> Dict[str, List[dict]]:
+    """从汇总表读取各维度的分布，结果与 stats.get_distributions 一致"""
+    distributions = {}
+    for field in fields:
+        column = getattr(KOLRollup, field)
+        query = select(column, func.sum(KOLRollup.kol_count).label("count")).group_by(column)
+        query = _apply_rollup_filters(query, filters)
+        rows = await db.execute(query)
+        items = [{"value": _to_value(field, row[0]), "count": int(row.count)} for row in rows]
+        items.sort(key=lambda item: item["count"], reverse=True)
+        distributions[field] = items
+    return distributions
+
+def _live_rollup_query() -> Select:
+    """直接从 kols 聚合出与汇总表结构相同的结果"""
+    dimensions = [
+        func.coalesce(cast(getattr(KOL, dim), String), "").label(dim)
+        for dim in ROLLUP_DIMENSIONS
+    ]
+    return select(*dimensions, func.count().label("kol_count")).group_by(*dimensions)
+
+async def check_rollups(db: AsyncSession, sample_size: int = 20) -> dict:
+    """
+    对比汇总表与 kols 的实时聚合结果
+    
+    Returns:
+        dict: 维度组合数、不一致的组合数与部分不一致样例
+    """
+    live = {
+        tuple(row[:len(ROLLUP_DIMENSIONS)]): tuple(row[len(ROLLUP_DIMENSIONS):])
+        for row in await db.execute(_live_rollup_query())
+    }
+    stored_query = select(*[getattr(KOLRollup, column) for column in ROLLUP_DIMENSIONS + ROLLUP_MEASURES])
+    stored = {
+        tuple(row[:len(ROLLUP_DIMENSIONS)]): tuple(row[len(ROLLUP_DIMENSIONS):])
+        for row in await db.execute(stored_query)
+    }
+    
+    mismatches = []
+    for key in live.keys() | stored.keys():
+        expected, actual = live.get(key), stored.get(key)
+        if expected != actual:
+            mismatches.append({
+                "dimensions": dict(zip(ROLLUP_DIMENSIONS, key)),
+                "expected": dict(zip(ROLLUP_MEASURES, map(str, expected))) if expected else None,
+                "actual": dict(zip(ROLLUP_MEASURES, map(str, actual))) if actual else None,
+            })
+    return {
+        "groups": len(live),
+        "mismatches": len(mismatches),
+        "consistent": not mismatches,
+        "samples": mismatches[:sample_size],
+    }
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """
+    从 kols 全量重建汇总表
+    
+    重建期间以 SHARE 模式锁定 kols，阻塞写入以免触发器增量与重建结果交错
+    
+    Returns:
+        int: 重建后的维度组合数
+    """
+    await db.execute(text("LOCK TABLE kols IN SHARE MODE"))
+    await db.execute(delete(KOLRollup))
+    live = _live_rollup_query().subquery()
+    await db.execute(
+        insert(KOLRollup).from_select(
+            list(ROLLUP_DIMENSIONS + ROLLUP_MEASURES),
+            select(*[live.c[column] for column in ROLLUP_DIMENSIONS + ROLLUP_MEASURES])
+        )
+    )
+    await db.commit()
+    await invalidate_kols()
+    return await db.scalar(select(func.count()).select_from(KOLRollup))
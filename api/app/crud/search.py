@@ -0,0 +1,64 @@
+import re
+from typing import List, Tuple
+from sqlalchemy import select, func, desc, or_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import KOL
+from app.schemas.kol import KOLFilter
+from app.crud.kol import apply_filters
+
+# 全文检索使用 simple 配置，不做词干处理，适配多语言名称与标签
+TS_CONFIG = "simple"
+
+def _prefix_tsquery(prefix: str, weights: str = "") -> str:
+    """将输入转换为前缀匹配的 tsquery，如 "jo sm" -> "jo:*A & sm:*A" """
+    words = re.findall(r"\w+", prefix)
+    return " & ".join(f"{word}:*{weights}" for word in words)
+
+async def search_kols(
+    db: AsyncSession,
+    q: str,
+    filters: KOLFilter,
+    limit: int = 20,
+    offset: int = 0
+) -> List[Tuple[KOL, float]]:
+    """
+    全文检索KOL，按相关度排序
+    
+    - search_vector 命中 websearch_to_tsquery 的记录
+    - 或名称与关键词三元组相似（pg_trgm 的 % 运算符）
+    """
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, q)
+    # similarity 为 STRICT 函数，名称为空时返回 NULL，需转为 0 以免整体得分为空
+    score = (
+        func.coalesce(func.ts_rank_cd(KOL.search_vector, tsquery), 0)
+        + func.coalesce(func.similarity(KOL.name, q), 0)
+    ).label("score")
+    
+    query = select(KOL, score).filter(
+        or_(
+            KOL.search_vector.op("@@")(tsquery),
+            KOL.name.op("%")(q)
+        )
+    )
+    query = apply_filters(query, filters)
+    query = query.order_by(desc("score"), desc(KOL.id)).offset(offset).limit(limit)
+    
+    result = await db.execute(query)
+    return [(row.KOL, float(row.score)) for row in result]
+
+async def autocomplete_kols(db: AsyncSession, prefix: str, limit: int = 10) -> List[Row]:
+    """按名称前缀自动补全，仅匹配 search_vector 中权重为 A 的名称词条"""
+    tsquery = _prefix_tsquery(prefix, "A")
+    if not tsquery:
+        return []
+    
+    query = (
+        select(KOL.kol_id, KOL.name, KOL.platform, KOL.followers_k)
+        .filter(KOL.search_vector.op("@@")(func.to_tsquery(TS_CONFIG, tsquery)))
+        .order_by(desc(func.similarity(KOL.name, prefix)), KOL.followers_k.desc().nulls_last())
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return result.all()
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import select, func, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.db.ddl import SNAPSHOT_METRICS, snapshot_partitions_sql
+from app.db.models import KOLMetricSnapshot
+
+logger = logging.getLogger(__name__)
+
+# 时间序列支持的降采样粒度，raw 表示不降采样
+SNAPSHOT_INTERVALS = ("raw", "day", "week", "month")
+
+async def ensure_snapshot_partitions(engine: AsyncEngine, months_ahead: int = 3) -> List[str]:
+    """
+    创建当月及之后 months_ahead 个月的快照分区（已存在则跳过）
+
+    在同一事务中持有事务级 advisory lock，多个进程同时执行时只有一个进程创建分区，其余直接跳过；
+    每个分区使用单独的 savepoint，默认分区中已有该月数据导致创建失败时只记录日志
+
+    Returns:
+        List[str]: 本次检查的分区名，未取得锁时为空
+    """
+    partitions = []
+    try:
+        async with engine.begin() as conn:
+            lock = func.pg_try_advisory_xact_lock(func.hashtext(KOLMetricSnapshot.__tablename__))
+            if not await conn.scalar(select(lock)):
+                logger.info("Snapshot partitions are being maintained by another process, skipping")
+                return partitions
+            for name, statement in snapshot_partitions_sql(months_ahead):
+                try:
+                    async with conn.begin_nested():
+                        await conn.execute(text(statement))
+                    partitions.append(name)
+                except SQLAlchemyError as e:
+                    logger.warning(f"Failed to create snapshot partition {name}: {str(e)}")
+    except (SQLAlchemyError, OSError) as e:
+        logger.warning(f"Failed to maintain snapshot partitions: {str(e)}")
+    return partitions
+
+async def maintain_snapshot_partitions(engine: AsyncEngine, months_ahead: int, interval: float) -> None:
+    """后台任务：启动时及之后每隔 interval 秒检查一次快照分区，进程长期运行也能跨月"""
+    while True:
+        await ensure_snapshot_partitions(engine, months_ahead)
+        await asyncio.sleep(interval)
+
+async def get_metric_series(
+    db: AsyncSession,
+    kol_pk: int,
+    metrics: Sequence[str],
+    start: datetime,
+    end: datetime,
+    interval: str = "day"
+) -> List[Dict]:
+    """
+    读取KOL指标时间序列
+
+    快照只在指标变化时写入，每个区间取最后一次快照的值；
+    start 之前的最后一次快照作为起点，保证序列从 start 开始就有值
+
+    Returns:
+        List[dict]: [{"time": 区间起点或快照时间, 指标: 值, ...}]，按时间升序
+    """
+    columns = [getattr(KOLMetricSnapshot, metric) for metric in metrics]
+    captured_at = KOLMetricSnapshot.captured_at
+
+    if interval == "raw":
+        time = captured_at.label("time")
+        query = select(time, *columns).order_by(captured_at)
+    else:
+        time = func.date_trunc(interval, captured_at).label("time")
+        # DISTINCT ON 配合降序的 captured_at，取每个区间最后一次快照
+        query = select(time, *columns).distinct(time).order_by(time, captured_at.desc())
+    query = query.filter(
+        KOLMetricSnapshot.kol_id == kol_pk,
+        captured_at >= start,
+        captured_at < end
+    )
+    points = [dict(row._mapping) for row in await db.execute(query)]
+
+    previous = (await db.execute(
+        select(captured_at.label("time"), *columns)
+        .filter(KOLMetricSnapshot.kol_id == kol_pk, captured_at < start)
+        .order_by(captured_at.desc())
+        .limit(1)
+    )).first()
+    if previous is not None and (not points or points[0]["time"] > start):
+        points.insert(0, {**previous._mapping, "time": start})
+    return points
+
+def parse_metrics(metrics: Optional[str]) -> List[str]:
+    """解析逗号分隔的指标列表，为空时返回全部指标，包含未知指标时抛出 ValueError"""
+    if not metrics:
+        return list(SNAPSHOT_METRICS)
+    selected = list(dict.fromkeys(metric.strip() for metric in metrics.split(",") if metric.strip()))
+    unknown = [metric for metric in selected if metric not in SNAPSHOT_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    return selected
@@ -0,0 +1,158 @@
+from enum import Enum
+from typing import Dict, List, Sequence
+from sqlalchemy import select, func, cast, tuple_, Float
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import KOL
+from app.schemas.kol import KOLFilter
+from app.core.config import settings
+from app.crud.kol import apply_filters, array_column
+from app.crud.rollups import rollup_supports, get_rollup_distributions
+
+# 分布统计的维度
+DISTRIBUTION_FIELDS = ("platform", "level", "source", "gender", "send_status")
+# 支持汇总与直方图的数值指标
+METRIC_FIELDS = (
+    "followers_k", "likes_k", "mean_views_k", "median_views_k", "engagement_rate",
+    "average_views_k", "average_likes_k", "average_comments_k",
+)
+# 汇总统计的分位数
+PERCENTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+# 默认直方图区间边界
+DEFAULT_BUCKETS = {
+    "followers_k": (1, 10, 50, 100, 500, 1000),
+    "engagement_rate": (1, 2, 3, 5, 8, 12, 20),
+}
+
+# 标签类分面：分面名称 -> 数组字段
+FACET_FIELDS = {
+    "hashtags": "most_used_hashtags",
+    "keywords": "keywords_ai",
+    "tags": "tags",
+}
+
+def _label(value) -> str:
+    return value.value if isinstance(value, Enum) else value
+
+async def get_distributions(db: AsyncSession, filters: KOLFilter) -> Dict[str, List[dict]]:
+    """一次扫描（GROUPING SETS）统计各维度的分布"""
+    columns = [getattr(KOL, field) for field in DISTRIBUTION_FIELDS]
+    query = select(
+        *columns,
+        *[func.grouping(column).label(f"grouping_{field}") for field, column in zip(DISTRIBUTION_FIELDS, columns)],
+        func.count().label("count")
+    )
+    query = apply_filters(query, filters)
+    query = query.group_by(func.grouping_sets(*[tuple_(column) for column in columns]))
+    
+    distributions = {field: [] for field in DISTRIBUTION_FIELDS}
+    result = await db.execute(query)
+    for row in result:
+        for field in DISTRIBUTION_FIELDS:
+            # grouping() 为 0 表示该行属于这个维度的分组
+            if getattr(row, f"grouping_{field}") == 0:
+                distributions[field].append({"value": _label(getattr(row, field)), "count": row.count})
+                break
+    for items in distributions.values():
+        items.sort(key=lambda item: item["count"], reverse=True)
+    return distributions
+
+async def get_metric_summaries(
+    db: AsyncSession,
+    filters: KOLFilter,
+    metrics: Sequence[str] = ("followers_k", "engagement_rate")
+) -> Dict[str, dict]:
+    """统计数值指标的数量、最值、均值与分位数"""
+    fractions = cast(array(PERCENTILES), ARRAY(Float))
+    columns = []
+    for metric in metrics:
+        column = getattr(KOL, metric)
+        columns += [
+            func.count(column).label(f"{metric}_count"),
+            func.min(column).label(f"{metric}_min"),
+            func.max(column).label(f"{metric}_max"),
+            func.avg(column).label(f"{metric}_avg"),
+            func.percentile_cont(fractions).within_group(column).label(f"{metric}_percentiles"),
+        ]
+    query = apply_filters(select(*columns), filters)
+    row = (await db.execute(query)).one()
+    
+    summaries = {}
+    for metric in metrics:
+        values = getattr(row, f"{metric}_percentiles") or [None] * len(PERCENTILES)
+        avg = getattr(row, f"{metric}_avg")
+        summaries[metric] = {
+            "count": getattr(row, f"{metric}_count"),
+            "min": getattr(row, f"{metric}_min"),
+            "max": getattr(row, f"{metric}_max"),
+            "avg": float(avg) if avg is not None else None,
+            "percentiles": {f"p{round(p * 100)}": value for p, value in zip(PERCENTILES, values)},
+        }
+    return summaries
+
+async def get_histogram(
+    db: AsyncSession,
+    filters: KOLFilter,
+    metric: str,
+    bounds: Sequence[float]
+) -> List[dict]:
+    """按给定边界统计直方图（width_bucket），空值不计入"""
+    column = getattr(KOL, metric)
+    bucket = func.width_bucket(column, cast(array([float(b) for b in bounds]), ARRAY(Float))).label("bucket")
+    query = select(bucket, func.count().label("count")).filter(column.isnot(None))
+    query = apply_filters(query, filters).group_by(bucket)
+    
+    counts = {row.bucket: row.count for row in await db.execute(query)}
+    # width_bucket 返回 0..len(bounds)，0 表示小于第一个边界
+    return [
+        {
+            "lower": bounds[index - 1] if index > 0 else None,
+            "upper": bounds[index] if index < len(bounds) else None,
+            "count": counts.get(index, 0),
+        }
+        for index in range(len(bounds) + 1)
+    ]
+
+async def get_facets(
+    db: AsyncSession,
+    filters: KOLFilter,
+    facets: Sequence[str],
+    limit: int = 20
+) -> Dict[str, List[dict]]:
+    """统计过滤结果中出现最多的话题/关键词/标签及其KOL数量"""
+    result = {}
+    for facet in facets:
+        # tags 为文本表达式，不会自动带出 FROM，需显式指定
+        values = apply_filters(
+            select(func.unnest(array_column(FACET_FIELDS[facet])).label("value")).select_from(KOL),
+            filters
+        ).subquery()
+        count = func.count().label("count")
+        query = (
+            select(values.c.value, count)
+            .filter(values.c.value.isnot(None), values.c.value != "")
+            .group_by(values.c.value)
+            .order_by(count.desc(), values.c.value)
+            .limit(limit)
+        )
+        result[facet] = [{"value": row.value, "count": row.count} for row in await db.execute(query)]
+    return result
+
+async def get_stats(db: AsyncSession, filters: KOLFilter) -> dict:
+    """Dashboard / Analytics 所需的全部统计，过滤条件只涉及维度时分布直接读取汇总表"""
+    if settings.STATS_USE_ROLLUPS and rollup_supports(filters):
+        distributions = await get_rollup_distributions(db, filters, list(DISTRIBUTION_FIELDS))
+    else:
+        distributions = await get_distributions(db, filters)
+    metrics = await get_metric_summaries(db, filters, tuple(DEFAULT_BUCKETS))
+    histograms = {
+        metric: await get_histogram(db, filters, metric, bounds)
+        for metric, bounds in DEFAULT_BUCKETS.items()
+    }
+    return {
+        "total": sum(item["count"] for item in distributions["platform"]),
+        "distributions": distributions,
+        "metrics": metrics,
+        "histograms": histograms,
+    }
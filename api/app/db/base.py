@@ -1,14 +1,57 @@
+import asyncio
+import logging
+import time
+from uuid import uuid4
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
+from app.core.consistency import pinned_to_primary
+from app.core.metrics import InstrumentedAsyncPool, db_replica_lag, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+def engine_options() -> dict:
+    """连接池与 asyncpg 连接参数"""
+    connect_args = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_PGBOUNCER:
+        # PgBouncer 事务模式下同一会话可能落到不同的服务端连接，命名预编译语句会冲突
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            # PgBouncer 默认拒绝未知的启动参数，应在数据库角色上设置
+            logger.warning("DB_STATEMENT_TIMEOUT_MS is ignored with DB_PGBOUNCER, use ALTER ROLE ... SET statement_timeout")
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
 
 engine = create_async_engine(
     settings.ASYNC_DATABASE_URL,
     echo=False,  # 关闭 SQL 查询日志
     pool_pre_ping=True,  # 自动检查连接是否有效
+    poolclass=InstrumentedAsyncPool,  # 记录取连接等待时间与连接池饱和度
+    **engine_options()
 )
 
+if settings.METRICS_ENABLED:
+    # 记录 SQL 耗时、慢查询与连接池使用情况
+    instrument_engine(engine)
+
 async_session_maker = sessionmaker(
     engine,
     class_=AsyncSession,
@@ -16,4 +59,102 @@ async_session_maker = sessionmaker(
     autoflush=False  # 关闭自动刷新以提高性能
 )
 
+# 只读副本，未配置 READ_DATABASE_URL 时为 None
+read_engine = None
+read_session_maker = None
+if settings.READ_DATABASE_URL:
+    read_engine = create_async_engine(
+        settings.READ_DATABASE_URL,
+        echo=False,
+        pool_pre_ping=True,
+        poolclass=InstrumentedAsyncPool,
+        **engine_options()
+    )
+    if settings.METRICS_ENABLED:
+        instrument_engine(read_engine, "replica")
+    read_session_maker = sessionmaker(
+        read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False
+    )
+
 Base = declarative_base()
+
+async def warmup_pool(count: int) -> None:
+    """预先建立 count 个连接并放回连接池，避免首批请求承担建连耗时"""
+    count = min(count, settings.DB_POOL_SIZE)
+    if count <= 0:
+        return
+
+    async def connect() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(connect() for _ in range(count)), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        # 数据库暂不可用时仍然启动，由 /ready 反映状态
+        logger.warning(f"Connection warmup failed ({len(failed)}/{count}): {str(failed[0])}")
+
+async def check_database(timeout: float = 2.0) -> None:
+    """
+    检查数据库是否可用，用于就绪探针
+
+    Raises:
+        Exception: 连接失败或超时
+    """
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.wait_for(ping(), timeout)
+
+# 副本延迟：WAL 已全部回放时为 0，否则为距最后一次回放事务的时间；非备库（如测试用的独立实例）为 0
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+_replica_checked_at = 0.0
+_replica_usable = False
+_replica_lock = asyncio.Lock()
+
+async def _probe_replica() -> bool:
+    try:
+        async def lag() -> float:
+            async with read_engine.connect() as conn:
+                return float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0)
+
+        seconds = await asyncio.wait_for(lag(), 1.0)
+    except Exception as e:
+        db_replica_lag.set(-1)
+        logger.warning(f"Read replica unavailable, using primary: {str(e) or type(e).__name__}")
+        return False
+    db_replica_lag.set(seconds)
+    if seconds > settings.READ_REPLICA_MAX_LAG_SECONDS:
+        logger.warning(f"Read replica lag {seconds:.1f}s exceeds threshold, using primary")
+        return False
+    return True
+
+async def replica_usable() -> bool:
+    """副本是否可用且延迟在阈值内，检测结果缓存 READ_REPLICA_CHECK_INTERVAL 秒"""
+    global _replica_checked_at, _replica_usable
+    if read_engine is None:
+        return False
+    if time.monotonic() - _replica_checked_at < settings.READ_REPLICA_CHECK_INTERVAL:
+        return _replica_usable
+    async with _replica_lock:
+        # 等待锁期间其他请求可能已完成检测
+        if time.monotonic() - _replica_checked_at >= settings.READ_REPLICA_CHECK_INTERVAL:
+            _replica_usable = await _probe_replica()
+            _replica_checked_at = time.monotonic()
+    return _replica_usable
+
+async def get_read_session_maker() -> sessionmaker:
+    """只读请求使用的会话工厂：当前客户端刚写入过、副本不可用或延迟过大时返回主库"""
+    if read_session_maker is None or pinned_to_primary() or not await replica_usable():
+        return async_session_maker
+    return read_session_maker
@@ -0,0 +1,243 @@
+"""
+kols 表上的函数、触发器与分区 DDL
+
+app/db/models.py 与 scripts/models.py 建表时通过 register_kol_ddl 注册，migrations 中的迁移脚本复用同一份 SQL。
+本模块只依赖 sqlalchemy，scripts/models.py 按文件路径加载，不导入 app 包。
+触发器使用 CREATE OR REPLACE TRIGGER（PostgreSQL 14+），所有语句均可重复执行。
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, Table, event
+
+# tag 字段拆分为小写标签数组的表达式，过滤条件需与索引表达式完全一致
+TAGS_EXPRESSION = r"regexp_split_to_array(lower(tag), '\s*,\s*')"
+
+# 排序与区间过滤使用 (字段, id) 复合索引，正反向扫描分别对应 ASC NULLS LAST / DESC NULLS FIRST
+SORT_INDEX_FIELDS = (
+    "name", "followers_k", "likes_k", "mean_views_k", "median_views_k", "engagement_rate",
+    "average_views_k", "average_likes_k", "average_comments_k",
+    "send_date", "export_date", "created_at",
+)
+# 可能为空的排序字段：降序按 NULLS LAST 排序，另建 (字段 DESC NULLS LAST, id DESC) 索引
+NULLABLE_SORT_FIELDS = tuple(field for field in SORT_INDEX_FIELDS if field != "created_at")
+
+def sort_indexes_sql() -> List[str]:
+    """游标分页与排序使用的全部复合索引，CONCURRENTLY 创建，需在事务外执行"""
+    statements = ["CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_updated_at_id ON kols (updated_at, id)"]
+    statements += [
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_{field}_id ON kols ({field}, id)"
+        for field in SORT_INDEX_FIELDS
+    ]
+    statements += [
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_{field}_desc_id ON kols ({field} DESC NULLS LAST, id DESC)"
+        for field in NULLABLE_SORT_FIELDS
+    ]
+    return statements
+
+def trigger_sql(
+    name: str,
+    timing: str,
+    function: str,
+    referencing: Optional[str] = None,
+    level: str = "ROW"
+) -> str:
+    """kols 上的触发器，timing 如 "BEFORE UPDATE"，referencing 为转换表声明"""
+    referencing_sql = f" REFERENCING {referencing}" if referencing else ""
+    return f"""
+CREATE OR REPLACE TRIGGER {name}
+{timing} ON kols{referencing_sql}
+FOR EACH {level} EXECUTE FUNCTION {function}()
+"""
+
+# 全文检索：通过触发器维护 search_vector
+# 权重：A 名称，B 标签/关键词/话题，C 地区，D 简介
+def search_vector_sql(row: str = "") -> str:
+    """search_vector 的计算表达式，row 为列名前缀，触发器中为 "NEW." """
+    return f"""
+        setweight(to_tsvector('simple', coalesce({row}name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce({row}tag, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(array_to_string({row}keywords_ai, ' '), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(array_to_string({row}most_used_hashtags, ' '), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce({row}location, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce({row}bio, '')), 'D')"""
+
+SEARCH_VECTOR_DDL = [
+    f"""
+CREATE OR REPLACE FUNCTION kols_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {search_vector_sql("NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""",
+    trigger_sql(
+        "kols_search_vector_trigger",
+        "BEFORE INSERT OR UPDATE OF name, bio, location, tag, keywords_ai, most_used_hashtags",
+        "kols_search_vector_update",
+    ),
+]
+
+# 乐观并发：每次更新由触发器递增 version，覆盖所有写入路径（批量、upsert、飞书同步）
+VERSION_DDL = [
+    """
+CREATE OR REPLACE FUNCTION kols_version_bump() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""",
+    trigger_sql("kols_version_trigger", "BEFORE UPDATE", "kols_version_bump"),
+]
+
+# 汇总表维度在 kols 上对应的表达式
+ROLLUP_DIMENSIONS = ("platform", "level", "source", "gender", "location", "send_status")
+ROLLUP_DIMENSION_SQL = ", ".join(
+    f"coalesce({dim}::text, '') AS {dim}" for dim in ROLLUP_DIMENSIONS
+)
+
+def _rollup_merge_sql(source: str) -> str:
+    """
+    将 source（带 sign 列的增量行）按维度聚合后合并进 kol_rollups
+
+    按维度排序后写入，并发语句以相同顺序锁定汇总行，不会互相死锁
+    """
+    dims = ", ".join(ROLLUP_DIMENSIONS)
+    return f"""
+        INSERT INTO kol_rollups AS r ({dims}, kol_count)
+        SELECT {dims}, sum(sign)
+        FROM ({source}) AS delta
+        GROUP BY {dims}
+        HAVING sum(sign) <> 0
+        ORDER BY {dims}
+        ON CONFLICT ({dims}) DO UPDATE SET kol_count = r.kol_count + excluded.kol_count;"""
+
+def _rollup_rows_sql(table: str, sign: int) -> str:
+    return f"SELECT {ROLLUP_DIMENSION_SQL}, {sign} AS sign FROM {table}"
+
+def _rollup_prune_sql() -> str:
+    """删除本语句删除/更新的行涉及且计数归零的维度组合，只有 old_rows 中的组合计数会减少"""
+    matches = " AND ".join(f"r.{dim} = touched.{dim}" for dim in ROLLUP_DIMENSIONS)
+    return f"""
+        DELETE FROM kol_rollups AS r
+        USING (SELECT DISTINCT {ROLLUP_DIMENSION_SQL} FROM old_rows) AS touched
+        WHERE {matches} AND r.kol_count <= 0;"""
+
+# 汇总表增量维护：语句级触发器读取转换表（new_rows / old_rows），每条语句只合并一次增量
+# 汇总表只维护数量（总数与维度分布），指标的分位数、均值与直方图仍实时计算
+# 代价：写入会锁定涉及的汇总行直到事务结束，维度组合相同的并发写入（如同平台同等级的批量导入）在这些行上串行提交；
+# 汇总行数量少、写入热点集中，长事务中的写入会阻塞同组合的其他写入，批量写入应分块提交
+ROLLUP_DDL = [
+    f"""
+CREATE OR REPLACE FUNCTION kol_rollups_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {_rollup_merge_sql(_rollup_rows_sql("new_rows", 1))}
+    ELSIF TG_OP = 'DELETE' THEN
+        {_rollup_merge_sql(_rollup_rows_sql("old_rows", -1))}
+        {_rollup_prune_sql()}
+    ELSE
+        {_rollup_merge_sql(_rollup_rows_sql("new_rows", 1) + " UNION ALL " + _rollup_rows_sql("old_rows", -1))}
+        {_rollup_prune_sql()}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""",
+    *[
+        trigger_sql(f"kol_rollups_{event_name.lower()}", f"AFTER {event_name}", "kol_rollups_apply", referencing, "STATEMENT")
+        for event_name, referencing in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    ],
+]
+
+# 历史指标快照中记录的数值指标
+SNAPSHOT_METRICS = (
+    "followers_k", "likes_k", "mean_views_k", "median_views_k", "engagement_rate",
+    "average_views_k", "average_likes_k", "average_comments_k",
+)
+
+# 默认分区兜底，按月分区由 ensure_snapshot_partitions 提前创建
+SNAPSHOT_DEFAULT_PARTITION_DDL = (
+    "CREATE TABLE IF NOT EXISTS kol_metric_snapshots_default PARTITION OF kol_metric_snapshots DEFAULT"
+)
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def snapshot_partitions_sql(months_ahead: int, today: Optional[date] = None) -> List[Tuple[str, str]]:
+    """当月及之后 months_ahead 个月的快照分区名与建表语句（已存在则跳过）"""
+    current = (today or date.today()).replace(day=1)
+    partitions = []
+    for offset in range(months_ahead + 1):
+        start = _add_months(current, offset)
+        end = _add_months(start, 1)
+        name = f"kol_metric_snapshots_y{start.year}m{start.month:02d}"
+        partitions.append((name, (
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF kol_metric_snapshots "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )))
+    return partitions
+
+def _snapshot_insert_sql(source: str, where: str) -> str:
+    """将 source 中的指标写入快照表，同一事务内重复写入同一KOL时保留最后的值"""
+    metrics = ", ".join(SNAPSHOT_METRICS)
+    values = ", ".join(f"n.{metric}::real" for metric in SNAPSHOT_METRICS)
+    updates = ", ".join(f"{metric} = excluded.{metric}" for metric in SNAPSHOT_METRICS)
+    return f"""
+        INSERT INTO kol_metric_snapshots (kol_id, captured_at, {metrics})
+        SELECT n.id, now(), {values}
+        FROM {source}
+        WHERE {where}
+        ON CONFLICT (kol_id, captured_at) DO UPDATE SET {updates};"""
+
+# 指标快照：语句级触发器，新增时记录初始值，更新时只记录指标发生变化的行
+SNAPSHOT_DDL = [
+    f"""
+CREATE OR REPLACE FUNCTION kol_metric_snapshots_capture() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {_snapshot_insert_sql(
+            "new_rows AS n",
+            " OR ".join(f"n.{metric} IS NOT NULL" for metric in SNAPSHOT_METRICS)
+        )}
+    ELSE
+        {_snapshot_insert_sql(
+            "new_rows AS n JOIN old_rows AS o ON o.id = n.id",
+            "({0}) IS DISTINCT FROM ({1})".format(
+                ", ".join(f"n.{metric}" for metric in SNAPSHOT_METRICS),
+                ", ".join(f"o.{metric}" for metric in SNAPSHOT_METRICS),
+            )
+        )}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""",
+    *[
+        trigger_sql(
+            f"kol_metric_snapshots_{event_name.lower()}", f"AFTER {event_name}",
+            "kol_metric_snapshots_capture", referencing, "STATEMENT"
+        )
+        for event_name, referencing in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+        )
+    ],
+]
+
+def kol_ddl() -> List[str]:
+    """kols 表创建后需要执行的全部函数与触发器"""
+    return SEARCH_VECTOR_DDL + VERSION_DDL + ROLLUP_DDL + SNAPSHOT_DDL
+
+def register_kol_ddl(kols: Table, snapshots: Table) -> None:
+    """create_all 时为 kols 与 kol_metric_snapshots 注册扩展、函数、触发器与默认分区"""
+    event.listen(kols, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for statement in kol_ddl():
+        event.listen(kols, "after_create", DDL(statement))
+    event.listen(snapshots, "after_create", DDL(SNAPSHOT_DEFAULT_PARTITION_DDL))
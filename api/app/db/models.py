@@ -1,9 +1,14 @@
 from datetime import datetime
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, ARRAY
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Float, REAL, DateTime, Enum, ARRAY,
+    ForeignKey, PrimaryKeyConstraint, Index, text
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 
 from app.db.base import Base
+from app.db.ddl import NULLABLE_SORT_FIELDS, SORT_INDEX_FIELDS, TAGS_EXPRESSION, register_kol_ddl
 
 import enum
 
@@ -89,6 +94,71 @@ class KOL(Base):
     keywords_ai = Column(ARRAY(String))
     most_used_hashtags = Column(ARRAY(String))
 
+    # 全文检索向量，由触发器根据 name/bio/location/tag/keywords_ai/most_used_hashtags 维护
+    search_vector = Column(TSVECTOR)
+    # 飞书同步写入内容的哈希，内容未变化时跳过写入
+    sync_hash = Column(String)
+    # 版本号，每次更新由触发器递增，用于 ETag / If-Match
+    version = Column(Integer, nullable=False, server_default="1")
+
     # 时间戳
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # 游标分页使用 (updated_at, id) 复合索引
+        Index("ix_kols_updated_at_id", "updated_at", "id"),
+        # 排序与区间过滤使用 (字段, id) 复合索引，正反向扫描分别对应升序/降序
+        *[Index(f"ix_kols_{field}_id", field, "id") for field in SORT_INDEX_FIELDS],
+        # 降序排序为 NULLS LAST，与正向索引的反向扫描（NULLS FIRST）不一致，单独建降序索引
+        *[
+            Index(f"ix_kols_{field}_desc_id", text(f"{field} DESC NULLS LAST"), text("id DESC"))
+            for field in NULLABLE_SORT_FIELDS
+        ],
+        # 全文检索与模糊匹配
+        Index("ix_kols_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_kols_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_kols_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+        # 标签/关键词/话题过滤（&& 与 @>），tag 为逗号分隔文本，按拆分后的小写数组建表达式索引
+        Index("ix_kols_keywords_ai_gin", "keywords_ai", postgresql_using="gin"),
+        Index("ix_kols_most_used_hashtags_gin", "most_used_hashtags", postgresql_using="gin"),
+        Index("ix_kols_tags_gin", text(TAGS_EXPRESSION), postgresql_using="gin"),
+    )
+
+class KOLRollup(Base):
+    """KOL汇总表，按维度组合预聚合，由 kols 上的语句级触发器增量维护"""
+    __tablename__ = "kol_rollups"
+
+    # 维度：未设置时为空字符串，枚举维度存储枚举名称
+    platform = Column(String, primary_key=True)
+    level = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
+    gender = Column(String, primary_key=True)
+    location = Column(String, primary_key=True)
+    send_status = Column(String, primary_key=True)
+
+    # 聚合值：只维护数量，指标的分位数、均值与直方图实时计算
+    kol_count = Column(BigInteger, nullable=False, default=0)
+
+class KOLMetricSnapshot(Base):
+    """KOL指标历史快照，只追加，按月分区，仅在指标变化时由 kols 上的触发器写入"""
+    __tablename__ = "kol_metric_snapshots"
+    __table_args__ = (
+        PrimaryKeyConstraint("kol_id", "captured_at"),
+        {"postgresql_partition_by": "RANGE (captured_at)"},
+    )
+
+    kol_id = Column(Integer, ForeignKey("kols.id", ondelete="CASCADE"), nullable=False)  # 对应 kols.id
+    captured_at = Column(DateTime(timezone=True), nullable=False)
+    # 指标使用 REAL 存储以压缩体积
+    followers_k = Column(REAL)
+    likes_k = Column(REAL)
+    mean_views_k = Column(REAL)
+    median_views_k = Column(REAL)
+    engagement_rate = Column(REAL)
+    average_views_k = Column(REAL)
+    average_likes_k = Column(REAL)
+    average_comments_k = Column(REAL)
+
+# 触发器与分区 DDL 与 scripts/models.py、migrations 共用，见 app/db/ddl.py
+register_kol_ddl(KOL.__table__, KOLMetricSnapshot.__table__)
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List, Optional, Union
-from pydantic import BaseModel, EmailStr, Field, validator
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple, Type, Union
+from pydantic import BaseModel, EmailStr, Field, create_model, validator
 
 from app.db.models import Gender, Level, Platform, Source, SendStatus
 
@@ -142,6 +143,7 @@ class KOLResponse(KOLBase):
     """KOL响应模型"""
     kol_id: str
     id: int
+    version: int = Field(1, description="版本号，每次更新递增，详情接口以其作为 ETag")
     created_at: datetime
     updated_at: datetime
 
@@ -155,17 +157,80 @@ class KOLBatchCreate(BaseModel):
     class Config:
         from_attributes = True
 
+class KOLBatchUpsert(BaseModel):
+    """批量 upsert KOL请求模型，已存在的记录只更新提供的字段"""
+    kols: List[KOLCreate] = Field(..., max_items=5000)
+
+    class Config:
+        from_attributes = True
+
+class KOLUpsertResult(BaseModel):
+    """单条 upsert 结果"""
+    kol_id: str
+    status: Literal["created", "updated", "conflict", "error"]
+    detail: Optional[str] = None
+
+class KOLBatchUpsertResponse(BaseModel):
+    """批量 upsert 响应模型"""
+    created: int
+    updated: int
+    conflicts: int
+    errors: int
+    results: List[KOLUpsertResult]
+
 class KOLFilter(BaseModel):
-    """KOL过滤条件模型"""
+    """KOL过滤条件模型，枚举字段为多选（IN），数值与日期字段为闭区间，标签类字段为包含任一/全部"""
     name: Optional[str] = None
-    platform: Optional[Platform] = None
-    level: Optional[Level] = None
-    gender: Optional[Gender] = None
+    platform: Optional[List[Platform]] = None
+    level: Optional[List[Level]] = None
+    gender: Optional[List[Gender]] = None
     location: Optional[str] = None
-    source: Optional[Source] = None
-    send_status: Optional[SendStatus] = None
+    source: Optional[List[Source]] = None
+    send_status: Optional[List[SendStatus]] = None
     min_followers: Optional[float] = None
     max_followers: Optional[float] = None
+    min_likes_k: Optional[float] = None
+    max_likes_k: Optional[float] = None
+    min_mean_views_k: Optional[float] = None
+    max_mean_views_k: Optional[float] = None
+    min_median_views_k: Optional[float] = None
+    max_median_views_k: Optional[float] = None
+    min_engagement_rate: Optional[float] = None
+    max_engagement_rate: Optional[float] = None
+    min_average_views_k: Optional[float] = None
+    max_average_views_k: Optional[float] = None
+    min_average_likes_k: Optional[float] = None
+    max_average_likes_k: Optional[float] = None
+    min_average_comments_k: Optional[float] = None
+    max_average_comments_k: Optional[float] = None
+    send_date_from: Optional[datetime] = None
+    send_date_to: Optional[datetime] = None
+    export_date_from: Optional[datetime] = None
+    export_date_to: Optional[datetime] = None
+    hashtags_any: Optional[List[str]] = Field(None, description="包含任一话题")
+    hashtags_all: Optional[List[str]] = Field(None, description="包含全部话题")
+    keywords_any: Optional[List[str]] = Field(None, description="包含任一AI关键词")
+    keywords_all: Optional[List[str]] = Field(None, description="包含全部AI关键词")
+    tags_any: Optional[List[str]] = Field(None, description="包含任一标签（不区分大小写）")
+    tags_all: Optional[List[str]] = Field(None, description="包含全部标签（不区分大小写）")
+
+    @validator(
+        'platform', 'level', 'gender', 'source', 'send_status',
+        'hashtags_any', 'hashtags_all', 'keywords_any', 'keywords_all', 'tags_any', 'tags_all',
+        pre=True
+    )
+    def split_values(cls, v):
+        """多选值支持重复参数或逗号分隔，空值忽略"""
+        if v is None:
+            return None
+        values = v if isinstance(v, list) else [v]
+        values = [
+            part.strip() if isinstance(part, str) else part
+            for value in values
+            for part in (value.split(",") if isinstance(value, str) else [value])
+        ]
+        values = [value for value in values if value != '']
+        return values or None
 
     class Config:
         from_attributes = True
@@ -174,9 +239,109 @@ class PaginatedKOLResponse(BaseModel):
     """分页KOL响应模型"""
     items: List[KOLResponse]
     total: int
+    total_exact: bool = Field(True, description="total 是否为精确值，否则为数据库预估值")
     page: int
     size: int
     pages: int
 
     class Config:
         from_attributes = True
+
+class CursorPaginatedKOLResponse(BaseModel):
+    """游标分页KOL响应模型"""
+    items: List[KOLResponse]
+    size: int
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空表示没有更多数据")
+
+    class Config:
+        from_attributes = True
+
+@lru_cache(maxsize=256)
+def partial_kol_models(fields: Tuple[str, ...]) -> Tuple[Type[BaseModel], Type[BaseModel], Type[BaseModel]]:
+    """
+    只包含指定字段的响应模型，用于 fields= 投影
+    
+    Returns:
+        tuple: (单个KOL模型, 分页响应模型, 游标分页响应模型)
+    """
+    item = create_model(
+        "KOLPartialResponse",
+        **{field: (KOLResponse.model_fields[field].annotation, None) for field in fields}
+    )
+    page = create_model("PaginatedKOLPartialResponse", __base__=PaginatedKOLResponse, items=(List[item], ...))
+    cursor_page = create_model(
+        "CursorPaginatedKOLPartialResponse", __base__=CursorPaginatedKOLResponse, items=(List[item], ...)
+    )
+    return item, page, cursor_page
+
+class KOLSearchResult(KOLResponse):
+    """KOL检索结果模型"""
+    score: float = Field(..., description="相关度得分")
+
+class KOLSearchResponse(BaseModel):
+    """KOL检索响应模型"""
+    items: List[KOLSearchResult]
+    query: str
+    limit: int
+    offset: int
+
+class KOLSuggestion(BaseModel):
+    """KOL名称自动补全模型"""
+    kol_id: str
+    name: Optional[str] = None
+    platform: Optional[Platform] = None
+    followers_k: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class KOLBulkSelection(BaseModel):
+    """批量操作的目标：kol_id 列表或过滤条件，二选一"""
+    kol_ids: Optional[List[str]] = Field(None, max_items=10000, description="目标 kol_id 列表")
+    filter: Optional[KOLFilter] = Field(None, description="目标过滤条件，不能为空")
+
+    @validator('filter', always=True)
+    def validate_target(cls, v, values):
+        kol_ids = values.get('kol_ids')
+        if (kol_ids is None) == (v is None):
+            raise ValueError("kol_ids 与 filter 必须且只能提供一个")
+        if v is not None and all(value in ("", []) for value in v.model_dump(exclude_none=True).values()):
+            raise ValueError("filter 不能为空，批量操作全部KOL请显式指定条件")
+        return v
+
+class KOLBulkUpdate(KOLBulkSelection):
+    """批量更新KOL请求模型，将同一组字段更新到所有目标KOL"""
+    patch: KOLUpdate = Field(..., description="要更新的字段")
+
+class KOLBulkDelete(KOLBulkSelection):
+    """批量删除KOL请求模型"""
+
+class KOLBulkResponse(BaseModel):
+    """批量操作响应模型"""
+    count: int = Field(..., description="受影响的KOL数量")
+
+class KOLCacheInvalidate(BaseModel):
+    """缓存失效请求模型，供绕过 API 直接写库的脚本（如飞书同步）调用"""
+    kol_ids: List[str] = Field(default_factory=list, max_items=10000, description="需失效详情缓存的 kol_id 列表")
+
+class KOLImportError(BaseModel):
+    """导入失败的行"""
+    row: int = Field(..., description="文件中的行号（CSV/Excel 含表头）")
+    kol_id: Optional[str] = None
+    detail: str
+
+class KOLImportJob(BaseModel):
+    """KOL导入任务状态"""
+    job_id: str
+    filename: Optional[str] = None
+    format: Literal["csv", "ndjson", "xlsx"]
+    status: Literal["pending", "running", "completed", "failed"]
+    processed: int = Field(0, description="已处理行数")
+    created: int = 0
+    updated: int = 0
+    conflicts: int = 0
+    errors: int = 0
+    error_details: List[KOLImportError] = Field(default_factory=list, description="失败行明细（最多保留前1000条）")
+    detail: Optional[str] = Field(None, description="任务失败原因")
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class KOLMetricSeriesResponse(BaseModel):
+    """KOL指标时间序列响应模型（列式）"""
+    kol_id: str
+    interval: str = Field(..., description="降采样粒度：raw/day/week/month")
+    start: datetime
+    end: datetime
+    time: List[datetime] = Field(default_factory=list, description="各点的时间（区间起点）")
+    series: Dict[str, List[Optional[float]]] = Field(
+        default_factory=dict, description="各指标与 time 一一对应的取值"
+    )
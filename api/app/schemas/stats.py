@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class DistributionItem(BaseModel):
+    """分布中的一项"""
+    value: Optional[str] = Field(None, description="取值，空表示未设置")
+    count: int
+
+class HistogramBucket(BaseModel):
+    """直方图的一个区间 [lower, upper)"""
+    lower: Optional[float] = Field(None, description="下界，空表示无下界")
+    upper: Optional[float] = Field(None, description="上界，空表示无上界")
+    count: int
+
+class MetricSummary(BaseModel):
+    """数值指标的汇总统计"""
+    count: int = Field(..., description="非空值数量")
+    min: Optional[float] = None
+    max: Optional[float] = None
+    avg: Optional[float] = None
+    percentiles: Dict[str, Optional[float]] = Field(default_factory=dict, description="分位数，如 p50")
+
+class KOLStatsResponse(BaseModel):
+    """KOL统计响应模型"""
+    total: int
+    distributions: Dict[str, List[DistributionItem]] = Field(
+        ..., description="platform/level/source/gender/send_status 的分布"
+    )
+    metrics: Dict[str, MetricSummary] = Field(..., description="followers_k/engagement_rate 的汇总统计")
+    histograms: Dict[str, List[HistogramBucket]] = Field(..., description="followers_k/engagement_rate 的直方图")
+
+class KOLHistogramResponse(BaseModel):
+    """单个指标的直方图响应模型"""
+    metric: str
+    buckets: List[HistogramBucket]
+
+class FacetItem(BaseModel):
+    """分面中的一项"""
+    value: str
+    count: int = Field(..., description="包含该值的KOL数量")
+
+class KOLFacetsResponse(BaseModel):
+    """话题/关键词/标签分面响应模型"""
+    facets: Dict[str, List[FacetItem]] = Field(..., description="hashtags/keywords/tags 的 Top-N")
+
+class RollupMismatch(BaseModel):
+    """汇总表中与实时聚合不一致的维度组合"""
+    dimensions: Dict[str, str] = Field(..., description="维度取值，枚举为名称，空字符串表示未设置")
+    expected: Optional[Dict[str, str]] = Field(None, description="实时聚合结果，空表示该组合已不存在")
+    actual: Optional[Dict[str, str]] = Field(None, description="汇总表中的值，空表示汇总表缺少该组合")
+
+class RollupCheckResponse(BaseModel):
+    """汇总表一致性检查结果"""
+    groups: int = Field(..., description="实时聚合的维度组合数")
+    mismatches: int = Field(..., description="不一致的维度组合数")
+    consistent: bool
+    samples: List[RollupMismatch] = Field(default_factory=list, description="部分不一致样例")
+
+class RollupRebuildResponse(BaseModel):
+    """汇总表重建结果"""
+    groups: int = Field(..., description="重建后的维度组合数")
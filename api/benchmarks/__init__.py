@@ -0,0 +1,9 @@
+"""
+API 与数据库查询基准测试
+
+在 api 目录下以模块方式运行，例如：
+    python -m benchmarks.data --size 100k         # 写入合成数据（1k/100k/1m）
+    python -m benchmarks.load run --rows 100000   # API 负载测试，结果写入 benchmarks/results
+    python -m benchmarks.search --seed-rows 100000
+    python -m benchmarks.payload_logging          # 写请求载荷日志的 CPU 耗时
+"""
@@ -0,0 +1,162 @@
+"""
+基准测试用合成KOL数据
+
+用法（在 api 目录下）：
+    python -m benchmarks.data --size 100k
+    python -m benchmarks.data --clear
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, Iterator
+
+from sqlalchemy import insert, delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import async_session_maker, engine
+from app.db.models import KOL, Gender, Level, Platform, SendStatus, Source
+
+# 数据规模预设
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# 合成数据的 kol_id 前缀，便于清理
+BENCH_PREFIX = "bench_"
+
+FIRST_NAMES = [
+    "Anna", "Maria", "Sofia", "Emma", "Olivia", "Mia", "Lucas", "Liam", "Noah", "Ethan",
+    "Chloe", "Zoe", "Lily", "Grace", "Jack", "Leo", "Mason", "Ava", "Isla", "Ella",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Garcia", "Martinez", "Brown", "Lee", "Walker", "Young", "King", "Scott",
+    "Lopez", "Hill", "Green", "Adams", "Baker", "Nelson", "Carter", "Turner", "Parker", "Evans",
+]
+LOCATIONS = [
+    "London, UK", "Los Angeles, US", "New York, US", "Paris, France", "Berlin, Germany",
+    "Madrid, Spain", "Toronto, Canada", "Sydney, Australia", "Milan, Italy", "Tokyo, Japan",
+]
+LANGUAGES = ["English", "Spanish", "French", "German", "Italian", "Japanese"]
+TOPICS = [
+    "beauty", "fitness", "travel", "food", "fashion", "gaming", "tech", "lifestyle",
+    "parenting", "pets", "music", "skincare", "makeup", "yoga", "photography", "diy",
+]
+
+# 各枚举的分布权重，大致贴合线上数据
+PLATFORM_WEIGHTS = {Platform.INSTAGRAM: 0.6, Platform.TIKTOK: 0.3, Platform.YOUTUBE: 0.1}
+SOURCE_WEIGHTS = {Source.COLLABSTR: 0.4, Source.HEEPSY: 0.3, Source.CREABLE: 0.2, Source.MANUAL: 0.1}
+GENDER_WEIGHTS = {Gender.FEMALE: 0.65, Gender.MALE: 0.32, Gender.LGBT: 0.03}
+
+def _choice(rng: random.Random, weights: Dict[Any, float]) -> Any:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _level(followers_k: float) -> Level:
+    if followers_k >= 50:
+        return Level.MID
+    if followers_k >= 10:
+        return Level.MICRO
+    return Level.NANO
+
+def generate_kols(count: int, seed: int = 42, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """生成 count 条合成KOL数据，同一 seed 生成结果一致"""
+    rng = random.Random(seed + start)
+    now = datetime.now(timezone.utc)
+    for i in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        topics = rng.sample(TOPICS, rng.randint(1, 4))
+        # 粉丝数近似对数正态分布，中位数约 15K
+        followers_k = round(min(math.exp(rng.gauss(2.7, 1.2)), 5000.0), 2)
+        views_k = round(followers_k * rng.uniform(0.05, 0.6), 2)
+        sent = rng.random() < 0.4
+        yield {
+            "kol_id": f"{BENCH_PREFIX}{i}",
+            "email": f"{first.lower()}.{last.lower()}.{i}@example.com",
+            "name": f"{first} {last}",
+            "bio": f"{' & '.join(t.title() for t in topics)} creator based in {rng.choice(LOCATIONS)}",
+            "account_link": f"https://www.instagram.com/{first.lower()}{last.lower()}{i}",
+            "platform": _choice(rng, PLATFORM_WEIGHTS),
+            "source": _choice(rng, SOURCE_WEIGHTS),
+            "gender": _choice(rng, GENDER_WEIGHTS),
+            "tag": ",".join(topics[:2]),
+            "language": rng.choice(LANGUAGES),
+            "location": rng.choice(LOCATIONS),
+            "slug": f"{first.lower()}-{last.lower()}-{i}",
+            "creator_id": f"creator_{i}",
+            "followers_k": followers_k,
+            "likes_k": round(followers_k * rng.uniform(1, 30), 2),
+            "mean_views_k": views_k,
+            "median_views_k": round(views_k * rng.uniform(0.5, 1.0), 2),
+            "engagement_rate": round(rng.betavariate(2, 40) * 100, 2),
+            "average_views_k": views_k,
+            "average_likes_k": round(views_k * rng.uniform(0.03, 0.15), 2),
+            "average_comments_k": round(views_k * rng.uniform(0.001, 0.01), 3),
+            "send_status": rng.choice(list(SendStatus)[:6]) if sent else None,
+            "send_date": now - timedelta(days=rng.randint(0, 365)) if sent else None,
+            "export_date": now - timedelta(days=rng.randint(0, 730)),
+            "level": _level(followers_k),
+            "keywords_ai": topics,
+            "most_used_hashtags": [f"#{t}" for t in topics],
+        }
+
+async def seed_kols(db: AsyncSession, count: int, seed: int = 42, chunk_size: int = 1000) -> int:
+    """批量写入合成数据，返回写入条数"""
+    written = 0
+    while written < count:
+        rows = list(generate_kols(min(chunk_size, count - written), seed, written))
+        await db.execute(insert(KOL), rows)
+        await db.commit()
+        written += len(rows)
+    return written
+
+async def clear_kols(db: AsyncSession) -> None:
+    """删除所有合成数据"""
+    await db.execute(delete(KOL).where(KOL.kol_id.startswith(BENCH_PREFIX)))
+    await db.commit()
+
+async def copy_kols(db: AsyncSession, count: int, seed: int = 42, chunk_size: int = 50_000) -> int:
+    """
+    通过 COPY 批量写入合成数据，适合 100k/1M 规模，每个分块单独提交
+    
+    COPY 绕过 SQLAlchemy 的枚举转换，枚举列直接写入枚举名称（与数据库中的存储一致）
+    """
+    columns = list(next(generate_kols(1, seed)).keys())
+    written = 0
+    while written < count:
+        records = [
+            tuple(value.name if isinstance(value, Enum) else value for value in row.values())
+            for row in generate_kols(min(chunk_size, count - written), seed, written)
+        ]
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            KOL.__tablename__, records=records, columns=columns
+        )
+        await db.commit()
+        written += len(records)
+    return written
+
+async def run(args: argparse.Namespace) -> None:
+    async with async_session_maker() as db:
+        if args.clear:
+            await clear_kols(db)
+            print("已删除合成数据")
+        if args.size:
+            count = SIZES[args.size]
+            start = time.perf_counter()
+            written = await copy_kols(db, count, args.seed)
+            await db.execute(text("ANALYZE kols"))
+            await db.commit()
+            print(f"写入合成数据 {written} 条，耗时 {time.perf_counter() - start:.1f}s")
+    await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="生成基准测试用合成KOL数据")
+    parser.add_argument("--size", choices=list(SIZES), help="写入的数据规模")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子，同一种子生成的数据一致")
+    parser.add_argument("--clear", action="store_true", help="写入前删除已有合成数据")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
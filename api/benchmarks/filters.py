@@ -0,0 +1,98 @@
+"""
+列表过滤与排序基准：对每种支持的过滤/排序组合执行 EXPLAIN，确认走索引而非顺序扫描，并记录耗时
+
+用法（在 api 目录下）：
+    python -m benchmarks.filters --seed-rows 100000 --runs 20
+存在顺序扫描时以非零状态码退出
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.db.base import async_session_maker, engine
+from app.db.models import KOL, Level, Platform, SendStatus
+from app.schemas.kol import KOLFilter
+from app.crud import kol as kol_crud
+from app.crud.count import explain_plan
+from benchmarks.data import seed_kols, clear_kols
+from benchmarks.search import measure, summarize
+
+NOW = datetime.now(timezone.utc)
+
+# (名称, 过滤条件, 排序参数)
+SHAPES: List[Tuple[str, KOLFilter, Optional[str]]] = [
+    ("default", KOLFilter(), None),
+    ("platform_in", KOLFilter(platform=[Platform.TIKTOK, Platform.INSTAGRAM]), None),
+    ("level_status_in", KOLFilter(level=[Level.MID], send_status=[SendStatus.ROUND_1, SendStatus.ROUND_2]), None),
+    ("followers_range", KOLFilter(min_followers=100, max_followers=500), None),
+    ("engagement_range", KOLFilter(min_engagement_rate=8, max_engagement_rate=12), None),
+    ("median_views_range_sorted", KOLFilter(min_median_views_k=50), "-median_views_k"),
+    ("send_date_range", KOLFilter(send_date_from=NOW - timedelta(days=30), send_date_to=NOW), "-send_date"),
+    ("export_date_range", KOLFilter(export_date_from=NOW - timedelta(days=7)), "export_date"),
+    ("sort_followers_desc", KOLFilter(), "-followers_k"),
+    ("sort_followers_name", KOLFilter(), "-followers_k,name"),
+    ("sort_name", KOLFilter(), "name"),
+    ("sort_engagement_platform", KOLFilter(platform=[Platform.YOUTUBE]), "-engagement_rate"),
+    ("sort_created_at", KOLFilter(), "created_at"),
+    ("hashtags_any", KOLFilter(hashtags_any=["#yoga", "#diy"]), None),
+    ("keywords_all", KOLFilter(keywords_all=["travel", "photography"]), None),
+    ("tags_any", KOLFilter(tags_any=["Pets"]), None),
+]
+
+def page_query(filters: KOLFilter, sort: Optional[str], size: int = 20) -> Select:
+    """与 kol_crud.get_kols 相同的分页查询"""
+    query = kol_crud.apply_filters(select(KOL), filters)
+    return kol_crud.apply_sort(query, kol_crud.parse_sort(sort)).limit(size)
+
+def plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+async def run(args: argparse.Namespace) -> int:
+    failures = 0
+    async with async_session_maker() as db:
+        if args.seed_rows:
+            print(f"写入合成数据 {args.seed_rows} 条...")
+            await seed_kols(db, args.seed_rows)
+        await db.execute(text("ANALYZE kols"))
+
+        print(f"{'shape':<28}{'plan':<36}{'p50(ms)':>10}{'p95(ms)':>10}")
+        for label, filters, sort in SHAPES:
+            query = page_query(filters, sort)
+            nodes = list(plan_nodes(await explain_plan(db, query)))
+            scans = [node["Node Type"] for node in nodes if node.get("Relation Name") == KOL.__tablename__]
+            seq_scan = "Seq Scan" in scans
+            failures += seq_scan
+
+            async def fn():
+                await db.execute(query)
+
+            await fn()  # 预热
+            stats = summarize(await measure(fn, args.runs))
+            marker = "  <-- Seq Scan" if seq_scan else ""
+            print(f"{label:<28}{'/'.join(scans):<36}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{marker}")
+
+        if args.cleanup:
+            await clear_kols(db)
+    await engine.dispose()
+    return failures
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="列表过滤/排序的执行计划与耗时检查")
+    parser.add_argument("--seed-rows", type=int, default=0, help="运行前写入的合成数据条数")
+    parser.add_argument("--runs", type=int, default=20, help="每个查询的执行次数")
+    parser.add_argument("--cleanup", action="store_true", help="结束后删除合成数据")
+    failures = asyncio.run(run(parser.parse_args()))
+    if failures:
+        print(f"{failures} 个查询使用了顺序扫描")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
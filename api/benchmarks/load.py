@@ -0,0 +1,240 @@
+"""
+API 负载测试：对运行中的服务按场景并发请求，统计 p50/p95/p99 延迟与 RPS，结果保存为 JSON 便于对比
+
+用法（在 api 目录下，先用 benchmarks.data 写入合成数据）：
+    python -m benchmarks.data --size 100k
+    python -m benchmarks.load run --rows 100000 --concurrency 16 --requests 2000
+    python -m benchmarks.load compare benchmarks/results/before.json benchmarks/results/after.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.db.models import Level, Platform, SendStatus
+from benchmarks.data import BENCH_PREFIX, generate_kols
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SEARCH_TERMS = ["anna", "garcia", "fitness", "london", "beauty travel", "yoga"]
+
+Scenario = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+def _kol_id(rng: random.Random, rows: int) -> str:
+    return f"{BENCH_PREFIX}{rng.randrange(rows)}"
+
+def build_scenarios(rows: int, batch_size: int) -> Dict[str, Scenario]:
+    """各场景的单次请求，rows 为已写入的合成数据条数"""
+    run_id = uuid.uuid4().hex[:8]
+    counter = iter(range(sys.maxsize))
+
+    async def list_page(client, rng):
+        return await client.get("/kols/", params={"page": rng.randint(1, 50), "size": 20})
+
+    async def list_filtered(client, rng):
+        return await client.get("/kols/", params={
+            "platform": rng.choice(list(Platform)).value,
+            "level": rng.choice(list(Level)).value,
+            "min_engagement_rate": rng.choice([1, 2, 5]),
+            "sort": rng.choice(["-followers_k", "-engagement_rate", "name"]),
+            "size": 50,
+        })
+
+    async def search(client, rng):
+        return await client.get("/kols/search", params={"q": rng.choice(SEARCH_TERMS), "limit": 20})
+
+    async def detail(client, rng):
+        return await client.get(f"/kols/{_kol_id(rng, rows)}")
+
+    async def batch_create(client, rng):
+        start = rows + next(counter) * batch_size
+        kols = []
+        for row in generate_kols(batch_size, rng.randrange(1 << 30), start):
+            # 使用独立前缀避免与已有数据冲突，clear_kols 仍可清理
+            suffix = f"load_{run_id}_{row['kol_id']}"
+            row.update(kol_id=f"{BENCH_PREFIX}{suffix}", email=f"{suffix}@example.com", slug=suffix, creator_id=suffix)
+            kols.append(row)
+        return await client.post("/kols/batch", content=json.dumps({"kols": kols}, default=_json_default),
+                                 headers={"Content-Type": "application/json"})
+
+    async def update(client, rng):
+        return await client.put(f"/kols/{_kol_id(rng, rows)}", json={
+            "send_status": rng.choice(list(SendStatus)).value,
+            "followers_k": round(rng.uniform(1, 500), 2),
+        })
+
+    async def export(client, rng):
+        # 读取完整流式响应
+        async with client.stream("GET", "/kols/export", params={
+            "platform": Platform.YOUTUBE.value, "level": Level.MID.value, "format": "ndjson"
+        }) as response:
+            async for _ in response.aiter_bytes():
+                pass
+            return response
+
+    return {
+        "list": list_page,
+        "list_filtered": list_filtered,
+        "search": search,
+        "detail": detail,
+        "batch_create": batch_create,
+        "update": update,
+        "export": export,
+    }
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def percentile(ordered: List[float], p: float) -> float:
+    """最近秩法分位数，ordered 需已排序"""
+    if not ordered:
+        return 0.0
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[min(len(ordered) - 1, max(rank - 1, 0))]
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    seed: int
+) -> dict:
+    """以固定并发执行 requests 次请求"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, rng)
+                ok = response.status_code < 400
+                label = str(response.status_code)
+            except httpx.HTTPError as e:
+                ok, label = False, type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[label] = errors.get(label, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args: argparse.Namespace) -> None:
+    scenarios = build_scenarios(args.rows, args.batch_size)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"未知场景: {', '.join(unknown)}，可选: {', '.join(scenarios)}")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        print(f"{'scenario':<16}{'requests':>10}{'errors':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for name in selected:
+            # 导出与批量创建单次耗时长，按比例减少请求数
+            requests = max(1, args.requests // 20) if name in ("export", "batch_create") else args.requests
+            await run_scenario(client, scenarios[name], min(requests, args.warmup), args.concurrency, args.seed)
+            stats = await run_scenario(client, scenarios[name], requests, args.concurrency, args.seed)
+            results[name] = stats
+            print(f"{name:<16}{stats['requests']:>10}{sum(stats['errors'].values()):>8}"
+                  f"{stats['rps']:>10.1f}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['p99']:>10.2f}")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "base_url": args.base_url,
+        "rows": args.rows,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d%H%M%S}_{report['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"结果已保存到 {output}")
+
+def compare(args: argparse.Namespace) -> None:
+    """对比两次结果，p95 变慢或 RPS 下降超过阈值时以非零状态码退出"""
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    regressions = []
+    print(f"{'scenario':<16}{'p95 before':>12}{'p95 after':>12}{'Δp95':>9}{'rps before':>12}{'rps after':>12}{'Δrps':>9}")
+    for name, after in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+        p95_delta = (after["p95"] - before["p95"]) / before["p95"] * 100 if before["p95"] else 0.0
+        rps_delta = (after["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0.0
+        regressed = p95_delta > args.threshold or rps_delta < -args.threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<16}{before['p95']:>12.2f}{after['p95']:>12.2f}{p95_delta:>+8.1f}%"
+              f"{before['rps']:>12.1f}{after['rps']:>12.1f}{rps_delta:>+8.1f}%{'  <-- regression' if regressed else ''}")
+    if regressions:
+        print(f"性能回退（阈值 {args.threshold}%）: {', '.join(regressions)}")
+        sys.exit(1)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="KOL API 负载测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="执行负载测试")
+    run_parser.add_argument("--base-url", default="http://localhost:8000", help="API 地址")
+    run_parser.add_argument("--rows", type=int, default=100_000, help="已写入的合成数据条数（benchmarks.data --size）")
+    run_parser.add_argument("--scenarios", help="逗号分隔的场景，默认全部")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="并发数")
+    run_parser.add_argument("--requests", type=int, default=1000, help="每个场景的请求数")
+    run_parser.add_argument("--warmup", type=int, default=50, help="每个场景的预热请求数")
+    run_parser.add_argument("--batch-size", type=int, default=100, help="批量创建场景每次的条数")
+    run_parser.add_argument("--timeout", type=float, default=60.0, help="请求超时(秒)")
+    run_parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    run_parser.add_argument("--output", help="结果文件路径，默认 benchmarks/results/<时间>_<commit>.json")
+
+    compare_parser = subparsers.add_parser("compare", help="对比两次结果")
+    compare_parser.add_argument("baseline", help="基线结果文件")
+    compare_parser.add_argument("current", help="当前结果文件")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="回退阈值(%%)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run(args))
+    else:
+        compare(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+写请求载荷日志基准：对比原来的“重新解析请求体 + f-string 全量日志”与 request_logging 的单次 CPU 耗时
+
+日志实际写入 os.devnull，以包含格式化与输出的开销。写吞吐的端到端对比使用负载测试，
+分别在改动前后的提交上运行并对比：
+    python -m benchmarks.load run --scenarios batch_create,update --output benchmarks/results/before.json
+    python -m benchmarks.load compare benchmarks/results/before.json benchmarks/results/after.json
+
+用法（在 api 目录下）：
+    python -m benchmarks.payload_logging --batch-size 500 --runs 50
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Callable, List
+
+from app.core import request_logging, serialization
+from app.core.config import settings
+from app.schemas.kol import KOLBatchCreate
+from benchmarks.data import generate_kols
+from benchmarks.search import summarize
+
+def measure_cpu(fn: Callable[[], None], runs: int) -> List[float]:
+    """执行 runs 次并记录每次的进程 CPU 耗时（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return samples
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="写请求载荷日志的 CPU 耗时对比")
+    parser.add_argument("--batch-size", type=int, default=500, help="批量创建的条数")
+    parser.add_argument("--runs", type=int, default=50, help="每种方式的执行次数")
+    args = parser.parse_args()
+
+    raw = serialization.dumps({"kols": list(generate_kols(args.batch_size))})
+    kols = KOLBatchCreate.model_validate_json(raw)
+
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    legacy_logger = logging.getLogger("benchmarks.payload_logging.legacy")
+    for log in (legacy_logger, request_logging.logger):
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+
+    def legacy() -> None:
+        # 原实现：再次解析请求体并完整写入日志
+        body = json.loads(raw)
+        legacy_logger.info(f"Received batch data: {body}")
+
+    def sampled(rate: float) -> Callable[[], None]:
+        def fn() -> None:
+            settings.REQUEST_LOG_SAMPLE_RATE = rate
+            request_logging.log_payload("kol.batch_create", kols.kols)
+        return fn
+
+    print(f"payload {len(raw)} bytes, {args.batch_size} rows")
+    print(f"{'mode':<14}{'p50 cpu(ms)':>14}{'p95 cpu(ms)':>14}{'max(ms)':>10}")
+    for label, fn in (
+        ("legacy", legacy),
+        ("disabled", sampled(0.0)),
+        ("sampled 1%", sampled(0.01)),
+        ("always", sampled(1.0)),
+    ):
+        fn()  # 预热
+        stats = summarize(measure_cpu(fn, args.runs))
+        print(f"{label:<14}{stats['p50']:>14.3f}{stats['p95']:>14.3f}{stats['max']:>10.3f}")
+
+if __name__ == "__main__":
+    main()
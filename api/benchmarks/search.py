@@ -0,0 +1,73 @@
+"""
+全文检索基准：对比 /kols/search 的检索路径与 name ilike 模糊匹配路径
+
+用法（在 api 目录下）：
+    python -m benchmarks.search --seed-rows 100000 --runs 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from app.db.base import async_session_maker, engine
+from app.schemas.kol import KOLFilter
+from app.crud import kol as kol_crud
+from app.crud import search as search_crud
+from app.crud.count import clear_count_cache
+from benchmarks.data import seed_kols, clear_kols
+
+TERMS = ["anna", "garcia", "fitness", "london", "beauty travel", "mar"]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """汇总耗时（毫秒）"""
+    ordered = sorted(samples)
+    return {
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+async def measure(fn: Callable[[], Awaitable[object]], runs: int) -> List[float]:
+    """执行 runs 次并记录每次耗时"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+async def run(args: argparse.Namespace) -> None:
+    async with async_session_maker() as db:
+        if args.seed_rows:
+            print(f"写入合成数据 {args.seed_rows} 条...")
+            await seed_kols(db, args.seed_rows)
+        
+        print(f"{'term':<16}{'path':<10}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+        for term in TERMS:
+            async def ilike_path():
+                # 当前列表接口的模糊匹配路径（含计数），每次清空计数缓存
+                clear_count_cache()
+                await kol_crud.get_kols(db, KOLFilter(name=term), 1, 20)
+            
+            async def search_path():
+                await search_crud.search_kols(db, term, KOLFilter(), 20)
+            
+            for label, fn in (("ilike", ilike_path), ("search", search_path)):
+                await fn()  # 预热
+                stats = summarize(await measure(fn, args.runs))
+                print(f"{term:<16}{label:<10}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['max']:>10.2f}")
+        
+        if args.cleanup:
+            await clear_kols(db)
+    await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="全文检索与 ilike 模糊匹配对比")
+    parser.add_argument("--seed-rows", type=int, default=0, help="运行前写入的合成数据条数")
+    parser.add_argument("--runs", type=int, default=30, help="每个查询的执行次数")
+    parser.add_argument("--cleanup", action="store_true", help="结束后删除合成数据")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+列表序列化基准：对比 ORM + pydantic 路径与行元组 + orjson 快速路径的单次请求 CPU 耗时
+
+用法（在 api 目录下）：
+    python -m benchmarks.serialization --seed-rows 10000 --size 100 --runs 200
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+from app.core import serialization
+from app.db.base import async_session_maker, engine
+from app.schemas.kol import KOLFilter, PaginatedKOLResponse
+from app.crud import kol as kol_crud
+from benchmarks.data import seed_kols, clear_kols
+from benchmarks.search import summarize
+
+async def measure_cpu(fn: Callable[[], Awaitable[bytes]], runs: int) -> List[float]:
+    """执行 runs 次并记录每次的进程 CPU 耗时（毫秒），不含等待数据库的时间"""
+    samples = []
+    for _ in range(runs):
+        start = time.process_time()
+        await fn()
+        samples.append((time.process_time() - start) * 1000)
+    return samples
+
+async def run(args: argparse.Namespace) -> None:
+    async with async_session_maker() as db:
+        if args.seed_rows:
+            print(f"写入合成数据 {args.seed_rows} 条...")
+            await seed_kols(db, args.seed_rows)
+
+        filters = KOLFilter()
+        sort = kol_crud.parse_sort(None)
+
+        async def orm_path() -> bytes:
+            # 原路径：加载ORM对象，再经 PaginatedKOLResponse(from_attributes) 校验并序列化
+            result = await kol_crud.get_kols(db, filters, 1, args.size, sort)
+            body = PaginatedKOLResponse.model_validate(result).model_dump_json().encode()
+            db.expunge_all()
+            return body
+
+        async def fast_path() -> bytes:
+            result = await kol_crud.get_kols(db, filters, 1, args.size, sort, list(kol_crud.RESPONSE_FIELDS))
+            return serialization.dumps(result)
+
+        print(f"{'path':<10}{'p50 cpu(ms)':>14}{'p95 cpu(ms)':>14}{'max(ms)':>10}{'bytes':>10}")
+        for label, fn in (("orm", orm_path), ("fast", fast_path)):
+            body = await fn()  # 预热
+            stats = summarize(await measure_cpu(fn, args.runs))
+            print(f"{label:<10}{stats['p50']:>14.3f}{stats['p95']:>14.3f}{stats['max']:>10.3f}{len(body):>10}")
+
+        if args.cleanup:
+            await clear_kols(db)
+    await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="列表序列化路径的 CPU 耗时对比")
+    parser.add_argument("--seed-rows", type=int, default=0, help="运行前写入的合成数据条数")
+    parser.add_argument("--size", type=int, default=100, help="每页数量")
+    parser.add_argument("--runs", type=int, default=200, help="每个路径的执行次数")
+    parser.add_argument("--cleanup", action="store_true", help="结束后删除合成数据")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,18 @@
-from app import app
+import os
+
+from app.core.config import settings
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+
+    # 多进程时 uvicorn 需要以导入路径加载应用；安装了 uvloop/httptools 时 auto 会优先使用
+    workers = settings.API_WORKERS or os.cpu_count() or 1
+    uvicorn.run(
+        "app:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        timeout_graceful_shutdown=settings.API_GRACEFUL_TIMEOUT,
+    )
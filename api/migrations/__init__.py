@@ -0,0 +1,78 @@
+"""
+数据库迁移：为已有数据库补齐新增的列、表、函数、触发器与索引，并回填数据
+
+新库由 create_all（scripts/init_db.py）直接建好，已有的库按顺序执行本包中 mNNNN_*.py 迁移脚本。
+每个脚本提供 async def upgrade(engine)，均可重复执行：
+ADD COLUMN IF NOT EXISTS、CREATE OR REPLACE FUNCTION/TRIGGER、CREATE INDEX CONCURRENTLY IF NOT EXISTS，
+回填只处理尚未回填的行。
+
+用法（在 api 目录下）：
+    python -m migrations                    # 执行全部迁移，连接 ASYNC_DATABASE_URL
+    python -m migrations --only m0003_search_vector
+"""
+import importlib
+import logging
+import pkgutil
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+def discover() -> List[str]:
+    """按编号排序的迁移模块名"""
+    return sorted(
+        module.name for module in pkgutil.iter_modules(__path__)
+        if module.name.startswith("m") and module.name[1:5].isdigit()
+    )
+
+async def execute(engine: AsyncEngine, statements: Sequence[str]) -> None:
+    """在同一事务中执行 statements，函数与触发器同时生效"""
+    async with engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement))
+
+async def create_indexes(engine: AsyncEngine, statements: Sequence[str]) -> None:
+    """逐条以自动提交执行 CREATE INDEX CONCURRENTLY，不阻塞写入"""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in statements:
+            await conn.execute(text(statement))
+
+async def backfill(engine: AsyncEngine, statement: str, batch_size: int = 5000) -> int:
+    """
+    分批执行回填 UPDATE，每批单独提交，直到没有需要回填的行
+
+    Args:
+        statement: 带 :batch_size 参数的 UPDATE，只选取尚未回填的行
+
+    Returns:
+        int: 回填的总行数
+    """
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(text(statement), {"batch_size": batch_size})
+        if result.rowcount <= 0:
+            return total
+        total += result.rowcount
+        logger.info(f"Backfilled {total} rows")
+
+async def run_migrations(engine: AsyncEngine, names: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    按顺序执行迁移
+
+    Args:
+        names: 只执行指定的迁移，默认全部
+
+    Returns:
+        List[str]: 已执行的迁移
+    """
+    executed = []
+    for name in names or discover():
+        module = importlib.import_module(f"{__name__}.{name}")
+        logger.info(f"Running migration {name}")
+        await module.upgrade(engine)
+        executed.append(name)
+    return executed
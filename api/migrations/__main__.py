@@ -0,0 +1,29 @@
+import argparse
+import asyncio
+import logging
+import os
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from migrations import discover, run_migrations
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+async def main(url: str, names) -> None:
+    engine = create_async_engine(url)
+    try:
+        await run_migrations(engine, names)
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="执行数据库迁移（可重复执行）")
+    parser.add_argument("--url", default=os.getenv("ASYNC_DATABASE_URL"), help="数据库地址，默认读取 ASYNC_DATABASE_URL")
+    parser.add_argument("--only", nargs="+", choices=discover(), help="只执行指定的迁移")
+    args = parser.parse_args()
+    if not args.url:
+        parser.error("未设置数据库地址：请传入 --url 或设置 ASYNC_DATABASE_URL")
+    asyncio.run(main(args.url, args.only))
@@ -0,0 +1,24 @@
+"""
+全文检索：search_vector 列、pg_trgm 扩展、维护触发器、GIN 索引，并回填已有行
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.ddl import SEARCH_VECTOR_DDL, search_vector_sql
+from migrations import backfill, create_indexes, execute
+
+async def upgrade(engine: AsyncEngine) -> None:
+    await execute(engine, [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "ALTER TABLE kols ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        *SEARCH_VECTOR_DDL,
+    ])
+    # 触发器生效前写入的行 search_vector 为空，空文本计算结果为空 tsvector 而非 NULL，回填可终止
+    await backfill(engine, f"""
+        UPDATE kols SET search_vector = {search_vector_sql()}
+        WHERE id IN (SELECT id FROM kols WHERE search_vector IS NULL LIMIT :batch_size)
+    """)
+    await create_indexes(engine, [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_search_vector ON kols USING gin (search_vector)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_name_trgm ON kols USING gin (name gin_trgm_ops)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_location_trgm ON kols USING gin (location gin_trgm_ops)",
+    ])
@@ -0,0 +1,25 @@
+"""
+飞书增量同步：kols.sync_hash 列与 feishu_sync_states 断点表
+
+sync_hash 无需回填：为空的行在下一次同步时写入一次并记录哈希，之后内容未变化即跳过。
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from migrations import execute
+
+async def upgrade(engine: AsyncEngine) -> None:
+    await execute(engine, [
+        "ALTER TABLE kols ADD COLUMN IF NOT EXISTS sync_hash varchar",
+        """
+CREATE TABLE IF NOT EXISTS feishu_sync_states (
+    app_id varchar NOT NULL,
+    table_id varchar NOT NULL,
+    page_token varchar,
+    last_modified_time bigint,
+    pending_modified_time bigint,
+    updated_at timestamp without time zone NOT NULL,
+    PRIMARY KEY (app_id, table_id)
+)
+""",
+        "ALTER TABLE feishu_sync_states ADD COLUMN IF NOT EXISTS pending_modified_time bigint",
+    ])
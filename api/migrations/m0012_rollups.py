@@ -0,0 +1,38 @@
+"""
+KOL汇总表：kol_rollups 表、增量维护函数与语句级触发器，并从 kols 全量重建
+
+整个迁移在一个事务中以 SHARE 模式锁定 kols，阻塞写入直到触发器生效且重建完成，
+汇总表不会漏掉迁移期间的写入。早期版本的汇总表带有 followers_*/engagement_* 聚合列，一并删除。
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.ddl import ROLLUP_DDL, ROLLUP_DIMENSIONS, ROLLUP_DIMENSION_SQL
+from migrations import execute
+
+async def upgrade(engine: AsyncEngine) -> None:
+    dims = ", ".join(ROLLUP_DIMENSIONS)
+    # 维度别名与 kols 的列同名，GROUP BY 按位置引用，避免按原始列分组
+    positions = ", ".join(str(index + 1) for index in range(len(ROLLUP_DIMENSIONS)))
+    await execute(engine, [
+        "LOCK TABLE kols IN SHARE MODE",
+        f"""
+CREATE TABLE IF NOT EXISTS kol_rollups (
+    {", ".join(f"{dim} varchar NOT NULL" for dim in ROLLUP_DIMENSIONS)},
+    kol_count bigint NOT NULL,
+    PRIMARY KEY ({dims})
+)
+""",
+        """
+ALTER TABLE kol_rollups
+    DROP COLUMN IF EXISTS followers_count,
+    DROP COLUMN IF EXISTS followers_sum,
+    DROP COLUMN IF EXISTS engagement_count,
+    DROP COLUMN IF EXISTS engagement_sum
+""",
+        *ROLLUP_DDL,
+        "DELETE FROM kol_rollups",
+        f"""
+INSERT INTO kol_rollups ({dims}, kol_count)
+SELECT {ROLLUP_DIMENSION_SQL}, count(*) FROM kols GROUP BY {positions}
+""",
+    ])
@@ -0,0 +1,39 @@
+"""
+KOL指标历史快照：按月分区的 kol_metric_snapshots 表、默认分区、近期月分区与写入触发器，
+并为已有指标但还没有快照的KOL写入一条当前值作为起点
+
+月分区须在回填之前创建：默认分区中一旦有某月的数据，该月分区就无法再创建。
+之后的月分区由 API 进程的后台任务定期创建（SNAPSHOT_PARTITION_CHECK_INTERVAL）。
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.ddl import SNAPSHOT_DDL, SNAPSHOT_DEFAULT_PARTITION_DDL, SNAPSHOT_METRICS, snapshot_partitions_sql
+from migrations import backfill, execute
+
+async def upgrade(engine: AsyncEngine) -> None:
+    metrics = ", ".join(SNAPSHOT_METRICS)
+    await execute(engine, [
+        f"""
+CREATE TABLE IF NOT EXISTS kol_metric_snapshots (
+    kol_id integer NOT NULL REFERENCES kols (id) ON DELETE CASCADE,
+    captured_at timestamp with time zone NOT NULL,
+    {", ".join(f"{metric} real" for metric in SNAPSHOT_METRICS)},
+    PRIMARY KEY (kol_id, captured_at)
+) PARTITION BY RANGE (captured_at)
+""",
+        SNAPSHOT_DEFAULT_PARTITION_DDL,
+        *[statement for _, statement in snapshot_partitions_sql(3)],
+        *SNAPSHOT_DDL,
+    ])
+    await backfill(engine, f"""
+        INSERT INTO kol_metric_snapshots (kol_id, captured_at, {metrics})
+        SELECT id, now(), {", ".join(f"{metric}::real" for metric in SNAPSHOT_METRICS)}
+        FROM kols AS k
+        WHERE k.id IN (
+            SELECT id FROM kols
+            WHERE ({" OR ".join(f"{metric} IS NOT NULL" for metric in SNAPSHOT_METRICS)})
+                AND NOT EXISTS (SELECT 1 FROM kol_metric_snapshots AS s WHERE s.kol_id = kols.id)
+            LIMIT :batch_size
+        )
+        ON CONFLICT (kol_id, captured_at) DO NOTHING
+    """)
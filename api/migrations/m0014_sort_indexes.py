@@ -0,0 +1,10 @@
+"""
+列表排序与游标分页的复合索引：(updated_at, id)、(字段, id) 以及降序 NULLS LAST 的 (字段 DESC NULLS LAST, id DESC)
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.ddl import sort_indexes_sql
+from migrations import create_indexes
+
+async def upgrade(engine: AsyncEngine) -> None:
+    await create_indexes(engine, sort_indexes_sql())
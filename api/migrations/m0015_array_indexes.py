@@ -0,0 +1,14 @@
+"""
+标签/关键词/话题过滤与分面统计的 GIN 索引，tag 按拆分后的小写数组建表达式索引
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.ddl import TAGS_EXPRESSION
+from migrations import create_indexes
+
+async def upgrade(engine: AsyncEngine) -> None:
+    await create_indexes(engine, [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_keywords_ai_gin ON kols USING gin (keywords_ai)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_most_used_hashtags_gin ON kols USING gin (most_used_hashtags)",
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kols_tags_gin ON kols USING gin (({TAGS_EXPRESSION}))",
+    ])
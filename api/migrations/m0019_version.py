@@ -0,0 +1,15 @@
+"""
+乐观并发：kols.version 列与每次更新递增版本号的触发器
+
+ADD COLUMN 带常量默认值不重写表（PostgreSQL 11+），已有行的版本号即为 1，无需回填。
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.ddl import VERSION_DDL
+from migrations import execute
+
+async def upgrade(engine: AsyncEngine) -> None:
+    await execute(engine, [
+        "ALTER TABLE kols ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1",
+        *VERSION_DDL,
+    ])
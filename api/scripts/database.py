@@ -1,4 +1,5 @@
 import os
+from uuid import uuid4
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
@@ -12,14 +13,39 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "kol_password")
 # 构建数据库URL
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# 连接池配置，与 API 的 Settings（app/core/config.py）使用相同的环境变量和默认值
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes", "on")
+
+connect_args = {
+    "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+}
+if DB_PGBOUNCER:
+    # PgBouncer 事务模式下不使用命名预编译语句
+    connect_args.update(
+        statement_cache_size=0,
+        prepared_statement_cache_size=0,
+        prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+    )
+elif DB_STATEMENT_TIMEOUT_MS:
+    connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
 # 创建异步数据库引擎
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_pre_ping=True
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args=connect_args
 )
 
 # 创建异步会话工厂
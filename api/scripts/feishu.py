@@ -1,14 +1,71 @@
-import requests
+"""
+飞书多维表格 -> kols 表同步
+
+流水线分三个阶段并发执行，阶段之间通过有界队列衔接（队列满时上游等待，形成背压）：
+    1. 拉取：aiohttp 分页调用 search 接口，带重试与限流
+    2. 转换：convert_feishu_record 转为 kols 表的列值
+    3. 写入：按页批量 upsert，并在同一事务中保存下一页的 page_token 断点
+
+进程中断后再次运行会从断点继续，使用 --restart 可强制从头同步。
+
+增量模式（--incremental）只拉取修改时间晚于高水位的记录；无论哪种模式，
+转换结果的内容哈希未变化的记录都不会写库，避免无谓地刷新 updated_at。
+
+写入的记录通过 REDIS_URL（Redis 缓存）或 KOL_API_URL（API 进程内缓存）失效 API 缓存。
+
+用法（在 scripts 目录下）：
+    FEISHU_ACCESS_TOKEN=t-xxx python feishu.py --app-id <app_id> --table-id <table_id>
+    FEISHU_ACCESS_TOKEN=t-xxx python feishu.py --incremental
+"""
+import argparse
+import asyncio
+import hashlib
 import json
-from typing import Dict, List, Optional, Any
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, UTC
-from models import KOL, Gender, Level, SendStatus, Platform, Source
-from database import SessionLocal
-from sqlalchemy.exc import IntegrityError
 
-def convert_feishu_record(record: Dict) -> KOL:
+import aiohttp
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+from models import KOL, FeishuSyncState, Gender, Level, SendStatus, Platform, Source
+from database import async_session_maker, engine
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 飞书开放平台地址，可指向本地模拟服务
+FEISHU_BASE_URL = os.getenv("FEISHU_BASE_URL", "https://open.feishu.cn")
+# 需要重试的 HTTP 状态码
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# 飞书频率限制错误码
+RATE_LIMIT_CODES = {99991400}
+# 表格中"修改时间"字段的名称，增量同步按该字段过滤
+FEISHU_MODIFIED_FIELD = os.getenv("FEISHU_MODIFIED_FIELD", "Last Modified Time")
+# API 响应缓存（Redis），与 app/core/cache.py 中的键保持一致
+REDIS_URL = os.getenv("REDIS_URL")
+# API 使用进程内缓存（默认）时，通过 API 的缓存失效接口通知，如 http://127.0.0.1:8000
+KOL_API_URL = os.getenv("KOL_API_URL")
+CACHE_DETAIL_KEY_PREFIX = "kol:detail:"
+CACHE_LIST_GENERATION_KEY = "kol:list:generation"
+# 阶段结束标记
+END = object()
+
+class FeishuAPIError(Exception):
+    """飞书接口返回错误"""
+
+def convert_feishu_record(record: Dict) -> Dict[str, Any]:
     """
-    将飞书记录转换为数据库模型
+    将飞书记录转换为 kols 表的列值
     """
     fields = record["fields"]
     
@@ -68,181 +125,494 @@ def convert_feishu_record(record: Dict) -> KOL:
         return level_map.get(level)
 
     try:
-        # 创建KOL实例
-        kol = KOL(
-            kol_id=get_text("KOL ID"),
-            email=get_text("Email"),
-            name=get_text("KOL Name"),
-            bio=get_text("Bio"),
-            account_link=get_link("Account link"),
-            platform=Platform.INSTAGRAM,  # 根据链接判断是 TikTok
-            source=Source(fields.get("Source")) if fields.get("Source") else None,
-            filter=get_text("Filter"),
-            gender=Gender[fields.get("Gender")] if fields.get("Gender") else None,
-            language=get_text("Language"),
-            location=get_text("Location"),
-            creator_id=get_text("Creator ID"),
+        # 转换为 kols 表的列值
+        return {
+            "kol_id": get_text("KOL ID"),
+            "email": get_text("Email"),
+            "name": get_text("KOL Name"),
+            "bio": get_text("Bio"),
+            "account_link": get_link("Account link"),
+            "platform": Platform.INSTAGRAM,  # 根据链接判断是 TikTok
+            "source": Source(fields.get("Source")) if fields.get("Source") else None,
+            "filter": get_text("Filter"),
+            "gender": Gender[fields.get("Gender")] if fields.get("Gender") else None,
+            "language": get_text("Language"),
+            "location": get_text("Location"),
+            "creator_id": get_text("Creator ID"),
             
             # 数值字段
-            followers_k=fields.get("Followers(K)"),
-            likes_k=fields.get("Likes(K)"),
-            mean_views_k=fields.get("Mean Views(K)"),
-            median_views_k=fields.get("Median Views(K)"),
-            engagement_rate=fields.get("Engagement Rate(%)"),
-            average_views_k=fields.get("Average Views(K)"),
-            average_likes_k=fields.get("Average Likes(K)"),
-            average_comments_k=fields.get("Average Comments(K)"),
+            "followers_k": fields.get("Followers(K)"),
+            "likes_k": fields.get("Likes(K)"),
+            "mean_views_k": fields.get("Mean Views(K)"),
+            "median_views_k": fields.get("Median Views(K)"),
+            "engagement_rate": fields.get("Engagement Rate(%)"),
+            "average_views_k": fields.get("Average Views(K)"),
+            "average_likes_k": fields.get("Average Likes(K)"),
+            "average_comments_k": fields.get("Average Comments(K)"),
             
             # 状态和分类
-            send_status=map_send_status(fields.get("Send Status")),
-            export_date=datetime.fromtimestamp(fields.get("Export Date", 0)/1000, UTC) if fields.get("Export Date") else None,
-            level=map_level(fields.get("Level")),
+            "send_status": map_send_status(fields.get("Send Status")),
+            "export_date": datetime.fromtimestamp(fields.get("Export Date", 0)/1000, UTC) if fields.get("Export Date") else None,
+            "level": map_level(fields.get("Level")),
             
             # 数组字段
-            keywords_ai=get_array("Keywords-AI"),
-            most_used_hashtags=get_array("Most used hashtags")
-        )
-        
-        return kol
+            "keywords_ai": get_array("Keywords-AI"),
+            "most_used_hashtags": get_array("Most used hashtags")
+        }
     except Exception as e:
-        print(f"Error converting record with fields: {json.dumps(fields, ensure_ascii=False)}")
+        logger.error(f"Error converting record with fields: {json.dumps(fields, ensure_ascii=False)}")
         raise e
 
-def save_kols_to_db(kols: List[KOL]) -> tuple[int, int]:
-    """
-    将KOL记录保存到数据库
+def content_hash(row: Dict[str, Any]) -> str:
+    """计算转换结果的内容哈希"""
+    payload = json.dumps(row, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def incremental_search_body(modified_field: str, since_ms: int) -> Dict[str, Any]:
+    """构建增量查询条件：修改时间晚于 since_ms 的记录，按修改时间升序"""
+    return {
+        "automatic_fields": True,
+        "sort": [{"field_name": modified_field, "desc": False}],
+        "filter": {
+            "conjunction": "and",
+            "conditions": [{
+                "field_name": modified_field,
+                "operator": "isGreater",
+                "value": ["ExactDate", str(since_ms)]
+            }]
+        }
+    }
+
+class FeishuClient:
+    """飞书多维表格接口客户端，支持失败重试与客户端限流"""
     
-    Args:
-        kols: KOL记录列表
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        access_token: str,
+        max_retries: int = 5,
+        requests_per_second: float = 10.0,
+        base_url: str = FEISHU_BASE_URL
+    ):
+        self.session = session
+        self.access_token = access_token
+        self.max_retries = max_retries
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.base_url = base_url.rstrip("/")
+        self._last_request = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def _throttle(self) -> None:
+        """保证请求间隔不小于 min_interval"""
+        async with self._lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request = time.monotonic()
+    
+    async def search_records(
+        self,
+        app_id: str,
+        table_id: str,
+        page_size: int,
+        page_token: Optional[str] = None,
+        body: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """调用 search 接口获取一页记录，返回响应中的 data"""
+        url = f"{self.base_url}/open-apis/bitable/v1/apps/{app_id}/tables/{table_id}/records/search"
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.access_token}"
+        }
+        params = {"page_size": page_size}
+        if page_token:
+            params["page_token"] = page_token
         
+        for attempt in range(self.max_retries + 1):
+            await self._throttle()
+            retry_after = None
+            try:
+                async with self.session.post(url, headers=headers, params=params, json=body or {}) as response:
+                    if response.status in RETRY_STATUS:
+                        retry_after = response.headers.get("Retry-After")
+                        error = f"HTTP {response.status}"
+                    else:
+                        response.raise_for_status()
+                        payload = await response.json()
+                        code = payload.get("code", 0)
+                        if code == 0:
+                            return payload.get("data") or {}
+                        if code not in RATE_LIMIT_CODES:
+                            raise FeishuAPIError(f"Feishu API error {code}: {payload.get('msg')}")
+                        error = f"rate limited ({code})"
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            
+            if attempt == self.max_retries:
+                raise FeishuAPIError(f"Feishu request failed after {self.max_retries} retries: {error}")
+            # 指数退避加随机抖动，优先遵循 Retry-After
+            delay = float(retry_after) if retry_after else min(30.0, 2 ** attempt) + random.random()
+            logger.warning(f"Feishu request failed ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+class CacheInvalidator:
+    """
+    写入后失效 API 的缓存
+    
+    - 配置 REDIS_URL（API 使用 Redis 缓存）时直接删除 Redis 中的详情缓存并递增列表代数
+    - 否则配置 KOL_API_URL 时调用 API 的 POST /kols/cache/invalidate，失效 API 进程内的缓存
+    - 两者都未配置时 API 在 CACHE_TTL 内可能返回同步前的数据，启动时输出警告
+    """
+    
+    def __init__(self, redis_url: Optional[str] = REDIS_URL, api_url: Optional[str] = KOL_API_URL):
+        self._client = None
+        self._api_url = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        if redis_url:
+            from redis import asyncio as redis
+            self._client = redis.from_url(redis_url)
+        elif api_url:
+            self._api_url = api_url.rstrip("/") + "/kols/cache/invalidate"
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        else:
+            logger.warning(
+                "未配置 REDIS_URL 或 KOL_API_URL，同步后不会失效 API 缓存，"
+                "列表与详情在缓存过期前可能返回旧数据"
+            )
+    
+    async def invalidate(self, kol_ids: List[str]) -> None:
+        if not kol_ids:
+            return
+        try:
+            for start in range(0, len(kol_ids), 1000):
+                batch = kol_ids[start:start + 1000]
+                if self._client:
+                    await self._client.delete(*[CACHE_DETAIL_KEY_PREFIX + kol_id for kol_id in batch])
+                elif self._session:
+                    async with self._session.post(self._api_url, json={"kol_ids": batch}) as response:
+                        response.raise_for_status()
+            if self._client:
+                await self._client.incr(CACHE_LIST_GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed: {str(e)}")
+    
+    async def close(self) -> None:
+        if self._client:
+            await self._client.aclose()
+        if self._session:
+            await self._session.close()
+
+async def load_state(app_id: str, table_id: str) -> Optional[FeishuSyncState]:
+    """读取同步状态（断点与高水位）"""
+    async with async_session_maker() as db:
+        return await db.get(FeishuSyncState, (app_id, table_id))
+
+async def save_checkpoint(
+    db,
+    app_id: str,
+    table_id: str,
+    page_token: Optional[str],
+    modified_time: Optional[int],
+    save_page_token: bool = True
+) -> None:
+    """保存断点与本页最大修改时间，与数据写入在同一事务中提交"""
+    stmt = pg_insert(FeishuSyncState).values(
+        app_id=app_id,
+        table_id=table_id,
+        page_token=page_token if save_page_token else None,
+        pending_modified_time=modified_time
+    )
+    set_ = {
+        "pending_modified_time": func.greatest(
+            FeishuSyncState.pending_modified_time, stmt.excluded.pending_modified_time
+        ),
+        "updated_at": func.now()
+    }
+    if save_page_token:
+        set_["page_token"] = stmt.excluded.page_token
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FeishuSyncState.app_id, FeishuSyncState.table_id],
+        set_=set_
+    )
+    await db.execute(stmt)
+
+async def finish_sync(app_id: str, table_id: str) -> None:
+    """同步完成：清除断点，将本次同步的最大修改时间并入高水位"""
+    async with async_session_maker() as db:
+        await db.execute(
+            update(FeishuSyncState)
+            .where(FeishuSyncState.app_id == app_id, FeishuSyncState.table_id == table_id)
+            .values(
+                page_token=None,
+                last_modified_time=func.greatest(
+                    FeishuSyncState.last_modified_time, FeishuSyncState.pending_modified_time
+                ),
+                pending_modified_time=None,
+                updated_at=func.now()
+            )
+        )
+        await db.commit()
+
+async def reset_pending(app_id: str, table_id: str) -> None:
+    """重新开始全量同步前清除断点与未完成的修改时间"""
+    async with async_session_maker() as db:
+        await db.execute(
+            update(FeishuSyncState)
+            .where(FeishuSyncState.app_id == app_id, FeishuSyncState.table_id == table_id)
+            .values(page_token=None, pending_modified_time=None, updated_at=func.now())
+        )
+        await db.commit()
+
+def _upsert_statement(rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT (kol_id) DO UPDATE，内容哈希未变化的记录不更新"""
+    stmt = pg_insert(KOL).values(rows)
+    update_cols = {key: stmt.excluded[key] for key in rows[0] if key != "kol_id"}
+    update_cols["updated_at"] = func.now()
+    return (
+        stmt.on_conflict_do_update(
+            index_elements=[KOL.kol_id],
+            set_=update_cols,
+            where=KOL.sync_hash.is_distinct_from(stmt.excluded.sync_hash)
+        )
+        .returning(KOL.kol_id)
+    )
+
+async def save_kols_to_db(db, rows: List[Dict[str, Any]]) -> Tuple[List[str], int, int]:
+    """
+    批量 upsert KOL记录（不提交事务）
+    
+    整批写入失败时（如 email 唯一约束冲突）逐条重试，定位失败记录
+    
     Returns:
-        tuple[int, int]: (成功保存的记录数, 失败的记录数)
+        tuple[list[str], int, int]: (写入的 kol_id 列表, 内容未变化跳过的记录数, 失败的记录数)
     """
-    success_count = 0
+    # 同一批内 kol_id 重复时保留最后一条
+    deduped = {}
     error_count = 0
+    for row in rows:
+        if not row.get("kol_id"):
+            error_count += 1
+            continue
+        deduped[row["kol_id"]] = row
+    rows = list(deduped.values())
+    if not rows:
+        return [], 0, error_count
     
-    # 创建数据库会话
-    db = SessionLocal()
     try:
-        for kol in kols:
+        async with db.begin_nested():
+            result = await db.execute(_upsert_statement(rows))
+            written = list(result.scalars().all())
+        return written, len(rows) - len(written), error_count
+    except SQLAlchemyError:
+        written = []
+        unchanged = 0
+        for row in rows:
             try:
-                # 检查记录是否已存在
-                existing_kol = db.query(KOL).filter(KOL.kol_id == kol.kol_id).first()
-                if existing_kol:
-                    # 更新现有记录
-                    for key, value in kol.__dict__.items():
-                        if not key.startswith('_'):  # 跳过SQLAlchemy内部属性
-                            setattr(existing_kol, key, value)
-                else:
-                    # 添加新记录
-                    db.add(kol)
-                
-                db.commit()
-                success_count += 1
-                print(f"Successfully saved KOL: {kol.kol_id}")
-                
-            except IntegrityError as e:
-                db.rollback()
+                async with db.begin_nested():
+                    result = await db.execute(_upsert_statement([row]))
+                    if result.first():
+                        written.append(row["kol_id"])
+                    else:
+                        unchanged += 1
+            except SQLAlchemyError as e:
                 error_count += 1
-                print(f"Error saving KOL {kol.kol_id}: {str(e)}")
-                
+                logger.error(f"Error saving KOL {row['kol_id']}: {str(getattr(e, 'orig', None) or e)}")
+        return written, unchanged, error_count
+
+async def fetch_stage(
+    client: FeishuClient,
+    app_id: str,
+    table_id: str,
+    page_size: int,
+    page_token: Optional[str],
+    out_queue: asyncio.Queue,
+    stats: Dict[str, int],
+    max_records: Optional[int] = None,
+    body: Optional[Dict[str, Any]] = None
+) -> None:
+    """拉取阶段：逐页获取记录，连同下一页的 page_token 放入队列"""
+    while True:
+        data = await client.search_records(app_id, table_id, page_size, page_token, body)
+        items = data.get("items") or []
+        next_token = data.get("page_token") if data.get("has_more", True) else None
+        
+        if max_records is not None and stats["fetched"] + len(items) >= max_records:
+            items = items[:max_records - stats["fetched"]]
+            next_token = None
+        stats["fetched"] += len(items)
+        logger.info(f"已获取记录数: {stats['fetched']}")
+        
+        await out_queue.put((items, next_token))
+        if not next_token:
+            break
+        page_token = next_token
+    await out_queue.put(END)
+
+async def convert_stage(in_queue: asyncio.Queue, out_queue: asyncio.Queue, stats: Dict[str, int]) -> None:
+    """转换阶段：将每页飞书记录转换为列值并计算内容哈希"""
+    while (item := await in_queue.get()) is not END:
+        items, next_token = item
+        rows = []
+        modified_time = None
+        for record in items:
+            if record.get("last_modified_time"):
+                modified_time = max(modified_time or 0, int(record["last_modified_time"]))
+            try:
+                row = convert_feishu_record(record)
+                row["sync_hash"] = content_hash(row)
+                rows.append(row)
             except Exception as e:
-                db.rollback()
-                error_count += 1
-                print(f"Unexpected error saving KOL {kol.kol_id}: {str(e)}")
-    
-    finally:
-        db.close()
-    
-    return success_count, error_count
+                stats["failed"] += 1
+                logger.error(f"Error converting record: {e}")
+        await out_queue.put((rows, next_token, modified_time))
+    await out_queue.put(END)
+
+async def write_stage(
+    in_queue: asyncio.Queue,
+    app_id: str,
+    table_id: str,
+    stats: Dict[str, int],
+    save_page_token: bool = True,
+    cache: Optional[CacheInvalidator] = None,
+    max_retries: int = 3
+) -> None:
+    """写入阶段：逐页 upsert，并在同一事务中推进断点，提交后失效 API 缓存"""
+    while (item := await in_queue.get()) is not END:
+        rows, next_token, modified_time = item
+        for attempt in range(max_retries + 1):
+            try:
+                async with async_session_maker() as db:
+                    written_ids, unchanged_count, error_count = await save_kols_to_db(db, rows)
+                    await save_checkpoint(db, app_id, table_id, next_token, modified_time, save_page_token)
+                    await db.commit()
+                break
+            except DBAPIError as e:
+                # 连接中断等数据库错误，重试整页
+                if attempt == max_retries or not e.connection_invalidated:
+                    raise
+                logger.warning(f"Database error, retrying page: {str(e)}")
+                await asyncio.sleep(2 ** attempt)
+        if cache:
+            await cache.invalidate(written_ids)
+        stats["saved"] += len(written_ids)
+        stats["unchanged"] += unchanged_count
+        stats["failed"] += error_count
 
-def search_bitable_records(
+async def sync_bitable(
     app_id: str,
     table_id: str,
-    page_size: int = 10,
-    access_token: str = None,
-    max_records: Optional[int] = None
-) -> List[Dict[str, Any]]:
+    access_token: str,
+    page_size: int = 500,
+    max_records: Optional[int] = None,
+    restart: bool = False,
+    incremental: bool = False,
+    modified_field: str = FEISHU_MODIFIED_FIELD,
+    lookback_hours: float = 24.0,
+    queue_size: int = 4,
+    requests_per_second: float = 10.0,
+    base_url: str = FEISHU_BASE_URL,
+    cache: Optional[CacheInvalidator] = None
+) -> Dict[str, int]:
     """
-    搜索飞书多维表格记录，支持分页获取所有结果
+    同步飞书多维表格到数据库
     
     Args:
         app_id: 多维表格的应用 ID
         table_id: 表格 ID
-        page_size: 每页记录数，默认 10
-        access_token: 访问令牌，如果不提供则需要在环境变量中设置
-        max_records: 最大获取记录数，默认为 None 表示获取所有记录
+        access_token: 访问令牌
+        page_size: 每页记录数，最大 500
+        max_records: 最大同步记录数，默认为 None 表示同步所有记录
+        restart: 忽略断点，从第一页开始
+        incremental: 只同步修改时间晚于高水位的记录，没有高水位时执行全量同步
+        modified_field: 表格中"修改时间"字段的名称
+        lookback_hours: 增量查询向前回溯的时长，覆盖按日期过滤的精度误差，重复记录由内容哈希跳过
+        queue_size: 阶段之间缓冲的页数
+        requests_per_second: 请求飞书接口的频率上限
+        base_url: 飞书开放平台地址，测试时指向本地模拟服务
+        cache: 写入后失效 API 缓存，默认按 REDIS_URL / KOL_API_URL 创建，同步结束后关闭
         
     Returns:
-        所有记录的列表
+        同步统计：fetched / saved / unchanged / failed
     """
-    base_url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{app_id}/tables/{table_id}/records/search"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}"
-    }
-    
-    all_records = []
+    state = await load_state(app_id, table_id)
     page_token = None
+    # 全量同步始终请求系统字段，以获得记录的 last_modified_time
+    body = {"automatic_fields": True}
+    save_page_token = True
     
-    while True:
-        # 如果达到最大记录数限制，则停止获取
-        if max_records and len(all_records) >= max_records:
-            all_records = all_records[:max_records]  # 确保exactly返回max_records条
-            break
-            
-        # 构建查询参数
-        params = {"page_size": page_size}
-        if page_token:
-            params["page_token"] = page_token
-            
-        # 发送请求
-        response = requests.post(base_url, headers=headers, params=params, json={})
-        response.raise_for_status()  # 如果请求失败则抛出异常
-        
-        data = response.json()
-        
-        # 获取记录
-        if "data" in data and "items" in data["data"]:
-            records = data["data"]["items"]
-            all_records.extend(records)
-            print(f"已获取记录数: {len(all_records)}")
-            
-            # 检查是否有更多数据
-            page_token = data["data"].get("page_token")
-            if not page_token:
-                break
-        else:
-            break
+    if incremental and state and state.last_modified_time:
+        since_ms = state.last_modified_time - int(lookback_hours * 3600 * 1000)
+        body = incremental_search_body(modified_field, since_ms)
+        # 增量查询条件与全量不同，不使用也不保存 page_token 断点；中断后从高水位重新查询即可
+        save_page_token = False
+        logger.info(f"增量同步：修改时间晚于 {datetime.fromtimestamp(since_ms / 1000, UTC).isoformat()}")
+    elif restart:
+        await reset_pending(app_id, table_id)
+    elif state and state.page_token:
+        page_token = state.page_token
+        logger.info(f"从断点继续同步: {page_token}")
+    
+    stats = {"fetched": 0, "saved": 0, "unchanged": 0, "failed": 0}
+    fetched_pages: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    converted_pages: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
     
-    return all_records
+    cache = cache or CacheInvalidator()
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        client = FeishuClient(session, access_token, requests_per_second=requests_per_second, base_url=base_url)
+        # 任一阶段失败时取消其余阶段，已提交的页保留在断点中
+        async with asyncio.TaskGroup() as group:
+            group.create_task(fetch_stage(
+                client, app_id, table_id, page_size, page_token, fetched_pages, stats, max_records, body
+            ))
+            group.create_task(convert_stage(fetched_pages, converted_pages, stats))
+            group.create_task(write_stage(converted_pages, app_id, table_id, stats, save_page_token, cache))
+    await cache.close()
+    
+    # 截断的同步（max_records）未覆盖全部记录，不推进高水位
+    if max_records is None:
+        await finish_sync(app_id, table_id)
+    return stats
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="同步飞书多维表格中的KOL数据")
+    parser.add_argument("--app-id", default=os.getenv("FEISHU_APP_ID", "JLNXbjpRLaXZcdsigkIcqddSnIh"))
+    parser.add_argument("--table-id", default=os.getenv("FEISHU_TABLE_ID", "tblXSAtZm1wSUyyK"))
+    parser.add_argument("--access-token", default=os.getenv("FEISHU_ACCESS_TOKEN"))
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--max-records", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="忽略断点，从第一页开始同步")
+    parser.add_argument("--rps", type=float, default=10.0, help="每秒请求数上限")
+    parser.add_argument("--incremental", action="store_true", help="只同步上次同步后修改过的记录")
+    parser.add_argument("--modified-field", default=FEISHU_MODIFIED_FIELD, help="表格中修改时间字段的名称")
+    parser.add_argument("--lookback-hours", type=float, default=24.0, help="增量查询向前回溯的小时数")
+    args = parser.parse_args()
+    
+    if not args.access_token:
+        parser.error("缺少访问令牌：请设置 FEISHU_ACCESS_TOKEN 或使用 --access-token")
+    
+    try:
+        stats = await sync_bitable(
+            app_id=args.app_id,
+            table_id=args.table_id,
+            access_token=args.access_token,
+            page_size=args.page_size,
+            max_records=args.max_records,
+            restart=args.restart,
+            incremental=args.incremental,
+            modified_field=args.modified_field,
+            lookback_hours=args.lookback_hours,
+            requests_per_second=args.rps
+        )
+    finally:
+        await engine.dispose()
+    
+    logger.info("处理结果统计:")
+    logger.info(f"获取记录数: {stats['fetched']}")
+    logger.info(f"成功保存: {stats['saved']} 条")
+    logger.info(f"内容未变化: {stats['unchanged']} 条")
+    logger.info(f"保存失败: {stats['failed']} 条")
 
 
 if __name__ == "__main__":
-    # 获取飞书数据
-    records = search_bitable_records(
-        app_id="JLNXbjpRLaXZcdsigkIcqddSnIh", 
-        table_id="tblXSAtZm1wSUyyK",
-        page_size=500,  # 每页获取10条
-        max_records=None,  # 最多获取50条记录
-        access_token="t-g1041lezD5NE7JDFR74MAZPE6MVLB6RHTLMF4XOX",
-    )
-    
-    print(f"\n开始转换数据...")
-    # 转换数据
-    kols = []
-    for record in records:
-        try:
-            kol = convert_feishu_record(record)
-            kols.append(kol)
-        except Exception as e:
-            print(f"Error converting record: {e}")
-    
-    print(f"\n开始保存到数据库...")
-    # 保存到数据库
-    if kols:
-        success_count, error_count = save_kols_to_db(kols)
-        print(f"\n处理结果统计:")
-        print(f"获取记录数: {len(records)}")
-        print(f"成功保存: {success_count} 条")
-        print(f"保存失败: {error_count} 条")
+    asyncio.run(main())
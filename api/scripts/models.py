@@ -1,8 +1,28 @@
 from datetime import datetime, UTC
 from typing import List, Optional
-from sqlalchemy import ForeignKey, String, Float, DateTime, Enum, ARRAY
+from sqlalchemy import ForeignKey, PrimaryKeyConstraint, String, Float, REAL, BigInteger, DateTime, Enum, ARRAY, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped
 import enum
+import importlib.util
+from pathlib import Path
+
+def _load_ddl():
+    """
+    加载 app/db/ddl.py 中与 app/db/models.py 共用的触发器与分区 DDL
+
+    ddl.py 只依赖 sqlalchemy，按文件路径加载，不执行 app 包的初始化（创建 FastAPI 应用与数据库引擎）
+    """
+    path = Path(__file__).resolve().parents[1] / "app" / "db" / "ddl.py"
+    spec = importlib.util.spec_from_file_location("kol_ddl", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+_ddl = _load_ddl()
+NULLABLE_SORT_FIELDS = _ddl.NULLABLE_SORT_FIELDS
+SORT_INDEX_FIELDS = _ddl.SORT_INDEX_FIELDS
+TAGS_EXPRESSION = _ddl.TAGS_EXPRESSION
 
 class Base(DeclarativeBase):
     pass
@@ -95,6 +115,87 @@ class KOL(Base):
     keywords_ai: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String))
     most_used_hashtags: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String))
 
+    # 全文检索向量，由触发器维护
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR)
+    # 飞书同步写入内容的哈希，内容未变化时跳过写入
+    sync_hash: Mapped[Optional[str]] = mapped_column(String)
+    # 版本号，每次更新由触发器递增，用于 ETag / If-Match
+    version: Mapped[int] = mapped_column(server_default="1")
+
     # 时间信息
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(), onupdate=lambda: datetime.now()) 
\ No newline at end of file
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(), onupdate=lambda: datetime.now())
+
+    __table_args__ = (
+        # 游标分页使用 (updated_at, id) 复合索引
+        Index("ix_kols_updated_at_id", "updated_at", "id"),
+        # 排序与区间过滤使用 (字段, id) 复合索引，正反向扫描分别对应升序/降序
+        *[Index(f"ix_kols_{field}_id", field, "id") for field in SORT_INDEX_FIELDS],
+        # 降序排序为 NULLS LAST，与正向索引的反向扫描（NULLS FIRST）不一致，单独建降序索引
+        *[
+            Index(f"ix_kols_{field}_desc_id", text(f"{field} DESC NULLS LAST"), text("id DESC"))
+            for field in NULLABLE_SORT_FIELDS
+        ],
+        # 全文检索与模糊匹配
+        Index("ix_kols_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_kols_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_kols_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+        # 标签/关键词/话题过滤（&& 与 @>），tag 为逗号分隔文本，按拆分后的小写数组建表达式索引
+        Index("ix_kols_keywords_ai_gin", "keywords_ai", postgresql_using="gin"),
+        Index("ix_kols_most_used_hashtags_gin", "most_used_hashtags", postgresql_using="gin"),
+        Index("ix_kols_tags_gin", text(TAGS_EXPRESSION), postgresql_using="gin"),
+    )
+
+# 飞书同步状态表
+class FeishuSyncState(Base):
+    """飞书多维表格同步断点，每个 (app_id, table_id) 一行"""
+    __tablename__ = "feishu_sync_states"
+
+    app_id: Mapped[str] = mapped_column(String, primary_key=True)
+    table_id: Mapped[str] = mapped_column(String, primary_key=True)
+    # 未完成的全量同步下一页的 page_token，为空表示上次同步已完成
+    page_token: Mapped[Optional[str]] = mapped_column(String)
+    # 已完成同步的记录最大修改时间(毫秒)，增量同步的高水位
+    last_modified_time: Mapped[Optional[int]] = mapped_column(BigInteger)
+    # 进行中的全量同步已写入记录的最大修改时间(毫秒)，同步完成后并入高水位
+    pending_modified_time: Mapped[Optional[int]] = mapped_column(BigInteger)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(), onupdate=lambda: datetime.now())
+
+# KOL汇总表
+class KOLRollup(Base):
+    """KOL汇总表，按维度组合预聚合，由 kols 上的语句级触发器增量维护"""
+    __tablename__ = "kol_rollups"
+
+    # 维度：未设置时为空字符串，枚举维度存储枚举名称
+    platform: Mapped[str] = mapped_column(String, primary_key=True)
+    level: Mapped[str] = mapped_column(String, primary_key=True)
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    gender: Mapped[str] = mapped_column(String, primary_key=True)
+    location: Mapped[str] = mapped_column(String, primary_key=True)
+    send_status: Mapped[str] = mapped_column(String, primary_key=True)
+
+    # 聚合值：只维护数量，指标的分位数、均值与直方图实时计算
+    kol_count: Mapped[int] = mapped_column(BigInteger, default=0)
+
+# KOL指标历史快照
+class KOLMetricSnapshot(Base):
+    """KOL指标历史快照，只追加，按月分区，仅在指标变化时由 kols 上的触发器写入"""
+    __tablename__ = "kol_metric_snapshots"
+    __table_args__ = (
+        PrimaryKeyConstraint("kol_id", "captured_at"),
+        {"postgresql_partition_by": "RANGE (captured_at)"},
+    )
+
+    kol_id: Mapped[int] = mapped_column(ForeignKey("kols.id", ondelete="CASCADE"))  # 对应 kols.id
+    captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # 指标使用 REAL 存储以压缩体积
+    followers_k: Mapped[Optional[float]] = mapped_column(REAL)
+    likes_k: Mapped[Optional[float]] = mapped_column(REAL)
+    mean_views_k: Mapped[Optional[float]] = mapped_column(REAL)
+    median_views_k: Mapped[Optional[float]] = mapped_column(REAL)
+    engagement_rate: Mapped[Optional[float]] = mapped_column(REAL)
+    average_views_k: Mapped[Optional[float]] = mapped_column(REAL)
+    average_likes_k: Mapped[Optional[float]] = mapped_column(REAL)
+    average_comments_k: Mapped[Optional[float]] = mapped_column(REAL)
+
+_ddl.register_kol_ddl(KOL.__table__, KOLMetricSnapshot.__table__)
@@ -0,0 +1,41 @@
+"""
+响应缓存：写入后列表等查询缓存失效
+"""
+from app.core import cache
+
+async def test_memory_cache_generation_moves_on_invalidate():
+    cache.set_backend(cache.MemoryCache())
+    params = {"page": 1, "size": 10}
+
+    key = await cache.list_key(params)
+    await cache.set_cached(key, b'{"total":0}')
+    assert await cache.get_cached("list", key) is not None
+
+    await cache.invalidate_kols(["kol_1"])
+    new_key = await cache.list_key(params)
+    assert new_key != key
+    assert await cache.get_cached("list", new_key) is None
+
+async def test_memory_cache_generation_survives_eviction():
+    cache.set_backend(cache.MemoryCache(max_entries=2))
+    await cache.invalidate_kols()
+    for index in range(5):
+        await cache.set_cached(f"key{index}", b"{}")
+    assert (await cache.list_key({})).startswith("kol:list:1:")
+
+async def test_list_reflects_write(client):
+    first = await client.get("/kols/")
+    assert first.status_code == 200
+    assert first.json()["total"] == 0
+
+    # 写入前的重复请求命中缓存
+    cached = await client.get("/kols/", headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+
+    created = await client.post("/kols/", json={"kol_id": "cache_test_1", "name": "Cache Test"})
+    assert created.status_code == 201
+
+    second = await client.get("/kols/", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.json()["total"] == 1
+    assert second.headers["ETag"] != first.headers["ETag"]
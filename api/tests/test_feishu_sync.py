@@ -0,0 +1,209 @@
+"""
+飞书同步：使用本地 aiohttp 模拟服务测试分页、失败重试与断点续传
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy import func, select, text
+
+# scripts 以脚本目录为工作目录运行，模块之间直接导入
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import feishu  # noqa: E402
+
+APP_ID = "app_test"
+TABLE_ID = "tbl_test"
+
+def make_record(index: int) -> dict:
+    return {
+        "record_id": f"rec{index}",
+        "last_modified_time": 1_700_000_000_000 + index,
+        "fields": {
+            "KOL ID": [{"text": f"feishu_test_{index}"}],
+            "Email": [{"text": f"feishu{index}@example.com"}],
+            "KOL Name": [{"text": f"Feishu KOL {index}"}],
+            "Followers(K)": float(index),
+        },
+    }
+
+class FeishuStub:
+    """模拟多维表格 search 接口，page_token 为下一条记录的下标"""
+
+    def __init__(self, records: list):
+        self.records = records
+        self.page_tokens = []
+        # 依次返回的失败响应：HTTP 状态码，或飞书错误码（以 "code:" 开头）
+        self.failures = []
+        # 请求该 page_token 时返回 400，用于模拟同步中断
+        self.fail_on_token = None
+
+    async def search(self, request: web.Request) -> web.Response:
+        token = request.query.get("page_token")
+        self.page_tokens.append(token)
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, str) and failure.startswith("code:"):
+                return web.json_response({"code": int(failure[5:]), "msg": "rate limited"})
+            return web.Response(status=failure, headers={"Retry-After": "0"})
+        if token is not None and token == self.fail_on_token:
+            # 延迟返回，让前面的页先写入并提交断点
+            await asyncio.sleep(1)
+            return web.Response(status=400)
+
+        start = int(token or 0)
+        end = start + int(request.query["page_size"])
+        has_more = end < len(self.records)
+        return web.json_response({
+            "code": 0,
+            "data": {
+                "items": self.records[start:end],
+                "has_more": has_more,
+                "page_token": str(end) if has_more else None,
+                "total": len(self.records),
+            },
+        })
+
+@pytest.fixture
+async def stub():
+    stub = FeishuStub([make_record(i) for i in range(25)])
+    app = web.Application()
+    app.router.add_post(f"/open-apis/bitable/v1/apps/{APP_ID}/tables/{TABLE_ID}/records/search", stub.search)
+    server = TestServer(app)
+    await server.start_server()
+    stub.base_url = str(server.make_url(""))
+    yield stub
+    await server.close()
+
+@pytest.fixture
+async def client(stub):
+    async with aiohttp.ClientSession() as session:
+        yield feishu.FeishuClient(session, "t-test", max_retries=3, requests_per_second=0, base_url=stub.base_url)
+
+async def fetch_all(client, page_token=None, max_records=None) -> list:
+    """执行拉取阶段，返回每页的 (记录数, 下一页 page_token)"""
+    queue = asyncio.Queue()
+    stats = {"fetched": 0}
+    await feishu.fetch_stage(client, APP_ID, TABLE_ID, 10, page_token, queue, stats, max_records)
+    pages = []
+    while (item := queue.get_nowait()) is not feishu.END:
+        items, next_token = item
+        pages.append((len(items), next_token))
+    return pages
+
+async def test_fetch_follows_pagination(stub, client):
+    pages = await fetch_all(client)
+    assert pages == [(10, "10"), (10, "20"), (5, None)]
+    assert stub.page_tokens == [None, "10", "20"]
+
+async def test_fetch_stops_at_max_records(stub, client):
+    pages = await fetch_all(client, max_records=15)
+    assert pages == [(10, "10"), (5, None)]
+
+async def test_fetch_resumes_from_page_token(stub, client):
+    pages = await fetch_all(client, page_token="20")
+    assert pages == [(5, None)]
+    assert stub.page_tokens == ["20"]
+
+async def test_retries_server_errors(stub, client):
+    stub.failures = [503, 429]
+    data = await client.search_records(APP_ID, TABLE_ID, 10)
+    assert len(data["items"]) == 10
+    assert stub.page_tokens == [None, None, None]
+
+async def test_retries_rate_limit_code(stub, client, monkeypatch):
+    async def no_sleep(delay):
+        pass
+
+    # 频率限制错误码没有 Retry-After，跳过退避等待
+    monkeypatch.setattr(feishu.asyncio, "sleep", no_sleep)
+    stub.failures = ["code:99991400"]
+    data = await client.search_records(APP_ID, TABLE_ID, 10)
+    assert len(data["items"]) == 10
+
+async def test_gives_up_after_max_retries(stub, client):
+    stub.failures = [500] * 4
+    with pytest.raises(feishu.FeishuAPIError):
+        await client.search_records(APP_ID, TABLE_ID, 10)
+
+async def test_other_error_codes_are_not_retried(stub, client):
+    stub.failures = ["code:1254040"]
+    with pytest.raises(feishu.FeishuAPIError):
+        await client.search_records(APP_ID, TABLE_ID, 10)
+    assert len(stub.page_tokens) == 1
+
+@pytest.fixture
+async def sync_tables(database_url):
+    """在测试库中创建同步涉及的表，并清空数据"""
+    async with feishu.engine.begin() as conn:
+        await conn.run_sync(feishu.KOL.metadata.create_all)
+        await conn.execute(text("TRUNCATE kols, feishu_sync_states RESTART IDENTITY CASCADE"))
+    yield
+    async with feishu.engine.begin() as conn:
+        await conn.execute(text("TRUNCATE kols, feishu_sync_states RESTART IDENTITY CASCADE"))
+    await feishu.engine.dispose()
+
+async def test_sync_resumes_from_checkpoint(stub, sync_tables):
+    async def sync():
+        return await feishu.sync_bitable(APP_ID, TABLE_ID, "t-test", page_size=10, base_url=stub.base_url)
+
+    # 第三页请求失败，前两页已提交并保存断点
+    stub.fail_on_token = "20"
+    with pytest.raises(ExceptionGroup):
+        await sync()
+    state = await feishu.load_state(APP_ID, TABLE_ID)
+    assert state.page_token == "20"
+
+    stub.fail_on_token = None
+    stub.page_tokens.clear()
+    stats = await sync()
+    assert stub.page_tokens == ["20"]
+    assert stats["saved"] == 5
+
+    async with feishu.async_session_maker() as db:
+        assert await db.scalar(select(func.count()).select_from(feishu.KOL)) == 25
+    state = await feishu.load_state(APP_ID, TABLE_ID)
+    assert state.page_token is None
+    assert state.last_modified_time == 1_700_000_000_024
+
+    # 再次全量同步时内容未变化，不写库
+    stats = await sync()
+    assert stats["saved"] == 0 and stats["unchanged"] == 25
+
+@pytest.fixture
+async def api_url(db_engine):
+    """在本地端口上运行 API，供同步脚本调用缓存失效接口"""
+    import uvicorn
+    from app import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, lifespan="off", log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    await task
+
+async def test_sync_invalidates_api_cache(stub, api_url, sync_tables):
+    import httpx
+    from app.core import cache
+
+    async with httpx.AsyncClient(base_url=api_url) as api:
+        # 同步前的空列表已缓存
+        assert (await api.get("/kols/")).json()["total"] == 0
+        generation = await cache.backend.get_counter(cache.LIST_GENERATION_KEY)
+
+        stats = await feishu.sync_bitable(
+            APP_ID, TABLE_ID, "t-test", page_size=10, base_url=stub.base_url,
+            cache=feishu.CacheInvalidator(redis_url=None, api_url=api_url)
+        )
+        assert stats["saved"] == 25
+
+        # 每页写入后调用一次失效接口，列表代数递增，列表重新查询
+        assert await cache.backend.get_counter(cache.LIST_GENERATION_KEY) == generation + 3
+        assert (await api.get("/kols/")).json()["total"] == 25
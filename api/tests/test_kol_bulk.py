@@ -0,0 +1,65 @@
+"""
+批量更新与批量删除：受影响行数、目标校验与缓存失效
+"""
+import pytest
+
+MID, MICRO = "Mid 50k-500k", "Micro 10k-50k"
+
+@pytest.fixture
+async def kols(client):
+    for index, platform in enumerate(["TikTok", "TikTok", "Instagram"]):
+        response = await client.post("/kols/", json={"kol_id": f"bulk_{index}", "platform": platform, "level": MID})
+        assert response.status_code == 201
+
+async def bulk_delete(client, body: dict):
+    return await client.request("DELETE", "/kols/bulk", json=body)
+
+async def test_bulk_update_by_filter(client, kols):
+    response = await client.patch("/kols/bulk", json={"filter": {"platform": ["TikTok"]}, "patch": {"level": MICRO}})
+    assert response.status_code == 200
+    assert response.json() == {"count": 2}
+
+    levels = {kol["kol_id"]: kol["level"] for kol in (await client.get("/kols/")).json()["items"]}
+    assert levels == {"bulk_0": MICRO, "bulk_1": MICRO, "bulk_2": MID}
+
+async def test_bulk_update_by_kol_ids(client, kols):
+    response = await client.patch("/kols/bulk", json={"kol_ids": ["bulk_2", "missing"], "patch": {"name": "Renamed"}})
+    assert response.json() == {"count": 1}
+
+async def test_bulk_update_rejects_unique_fields(client, kols):
+    response = await client.patch("/kols/bulk", json={"kol_ids": ["bulk_0"], "patch": {"slug": "same"}})
+    assert response.status_code == 400
+
+async def test_bulk_delete(client, kols):
+    response = await bulk_delete(client, {"filter": {"platform": "Instagram"}})
+    assert response.status_code == 200
+    assert response.json() == {"count": 1}
+
+    response = await bulk_delete(client, {"kol_ids": ["bulk_0", "bulk_2"]})
+    assert response.json() == {"count": 1}
+    assert [kol["kol_id"] for kol in (await client.get("/kols/")).json()["items"]] == ["bulk_1"]
+
+@pytest.mark.parametrize("body", [
+    {"filter": {}},
+    {"filter": {"platform": [], "name": ""}},
+    {},
+    {"kol_ids": ["bulk_0"], "filter": {"platform": ["TikTok"]}},
+])
+async def test_bulk_rejects_empty_or_ambiguous_target(client, kols, body):
+    response = await client.patch("/kols/bulk", json={**body, "patch": {"level": MICRO}})
+    assert response.status_code == 422
+    assert (await bulk_delete(client, body)).status_code == 422
+    assert (await client.get("/kols/")).json()["total"] == 3
+
+async def test_bulk_writes_invalidate_cache(client, kols):
+    # 列表、详情与计数均已缓存
+    assert (await client.get("/kols/bulk_0")).json()["level"] == MID
+    assert (await client.get("/kols/", params={"level": MICRO})).json()["total"] == 0
+
+    await client.patch("/kols/bulk", json={"filter": {"platform": ["TikTok"]}, "patch": {"level": MICRO}})
+    assert (await client.get("/kols/bulk_0")).json()["level"] == MICRO
+    assert (await client.get("/kols/", params={"level": MICRO})).json()["total"] == 2
+
+    await bulk_delete(client, {"kol_ids": ["bulk_0"]})
+    assert (await client.get("/kols/bulk_0")).status_code == 404
+    assert (await client.get("/kols/", params={"level": MICRO})).json()["total"] == 1
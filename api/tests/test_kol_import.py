@@ -0,0 +1,89 @@
+"""
+导出与导入：导出文件重新导入后数据一致，错误行计入任务明细
+"""
+import json
+
+import pytest
+from sqlalchemy import text
+
+FIELDS = (
+    "kol_id,name,email,platform,level,gender,source,send_status,followers_k,engagement_rate,"
+    "send_date,tag,location,keywords_ai,most_used_hashtags"
+)
+
+async def import_file(client, filename: str, content: bytes) -> dict:
+    """上传文件并返回任务最终状态（测试客户端在后台任务结束后才返回响应）"""
+    response = await client.post("/kols/import", files={"file": (filename, content)})
+    assert response.status_code == 202
+    job = (await client.get(f"/kols/import/{response.json()['job_id']}")).json()
+    assert job["status"] == "completed", job
+    return job
+
+async def export_rows(client, export_format: str) -> tuple:
+    response = await client.get("/kols/export", params={"format": export_format, "fields": FIELDS})
+    assert response.status_code == 200
+    return response.content, (await client.get("/kols/export", params={"format": "ndjson", "fields": FIELDS})).text
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+async def test_export_import_round_trip(client, db_engine, export_format):
+    for kol in [
+        {
+            "kol_id": "round_0", "name": "Round, \"Zero\"", "email": "round0@example.com",
+            "platform": "TikTok", "level": "Mid 50k-500k", "gender": "FEMALE", "source": "Manual",
+            "send_status": "Round No.1", "followers_k": 12.5, "engagement_rate": 3.25,
+            "send_date": "2024-05-01T08:30:00", "tag": "beauty, travel", "location": "巴黎",
+            "keywords_ai": ["makeup", "skincare"], "most_used_hashtags": ["#ootd"],
+        },
+        {"kol_id": "round_1", "name": "Sparse"},
+    ]:
+        assert (await client.post("/kols/", json=kol)).status_code == 201
+    content, expected = await export_rows(client, export_format)
+
+    async with db_engine.begin() as conn:
+        await conn.execute(text("TRUNCATE kols, kol_rollups RESTART IDENTITY CASCADE"))
+    job = await import_file(client, f"kols.{export_format}", content)
+    assert (job["processed"], job["created"], job["errors"]) == (2, 2, 0)
+
+    _, exported = await export_rows(client, export_format)
+    assert [json.loads(line) for line in exported.splitlines()] == [json.loads(line) for line in expected.splitlines()]
+
+    # 再次导入同一文件时全部为更新
+    job = await import_file(client, f"kols.{export_format}", content)
+    assert (job["created"], job["updated"]) == (0, 2)
+
+async def test_import_reports_bad_rows(client):
+    assert (await client.post("/kols/", json={"kol_id": "owner", "email": "taken@example.com"})).status_code == 201
+    content = "\n".join([
+        "KOL ID,KOL Name,email,platform,Followers(K)",
+        "good_0,Good,good@example.com,TikTok,1.5",
+        "bad_email,Bad,not-an-email,TikTok,1",
+        ",Missing id,,,",
+        "bad_platform,Bad,,Myspace,1",
+        "bad_number,Bad,,TikTok,many",
+        "taken,Taken,taken@example.com,,",
+        "good_1,Good,,Instagram,",
+    ]).encode()
+
+    job = await import_file(client, "kols.csv", content)
+    assert job["processed"] == 7
+    assert (job["created"], job["updated"], job["conflicts"], job["errors"]) == (2, 0, 1, 4)
+    # 行号包含表头
+    assert [(error["row"], error["kol_id"]) for error in job["error_details"]] == [
+        (3, "bad_email"), (4, None), (5, "bad_platform"), (6, "bad_number"), (7, "taken"),
+    ]
+    assert "email" in job["error_details"][0]["detail"]
+
+    listed = (await client.get("/kols/")).json()
+    assert sorted(kol["kol_id"] for kol in listed["items"]) == ["good_0", "good_1", "owner"]
+
+async def test_import_reports_invalid_json_lines(client):
+    content = b'{"kol_id": "json_0"}\nnot json\n\n{"kol_id": "json_1", "followers_k": "x"}\n{"kol_id": "json_2"}\n'
+
+    job = await import_file(client, "kols.ndjson", content)
+    assert (job["processed"], job["created"], job["errors"]) == (4, 2, 2)
+    assert [error["row"] for error in job["error_details"]] == [2, 4]
+    assert job["error_details"][0]["detail"].startswith("Invalid JSON")
+
+async def test_import_rejects_unknown_format(client):
+    response = await client.post("/kols/import", files={"file": ("kols.txt", b"kol_id\n")})
+    assert response.status_code == 400
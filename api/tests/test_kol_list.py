@@ -0,0 +1,99 @@
+"""
+KOL列表：数组过滤条件与游标分页
+"""
+from sqlalchemy import text
+
+async def create_kols(client, rows):
+    for row in rows:
+        response = await client.post("/kols/", json=row)
+        assert response.status_code == 201
+
+async def test_list_with_array_filters(client):
+    await create_kols(client, [
+        {"kol_id": "array_0", "most_used_hashtags": ["#yoga", "#diy"], "keywords_ai": ["travel", "photography"]},
+        {"kol_id": "array_1", "most_used_hashtags": ["#diy"], "keywords_ai": ["travel"]},
+        {"kol_id": "array_2", "most_used_hashtags": ["#food"], "keywords_ai": ["photography", "travel", "food"]},
+    ])
+
+    # 数组过滤不在汇总表维度内，计数先经过 EXPLAIN 预估，数组参数需以带类型的绑定参数传入
+    response = await client.get("/kols/", params={"hashtags_any": "#yoga,#diy"})
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(kol["kol_id"] for kol in body["items"]) == ["array_0", "array_1"]
+    assert body["total"] == 2
+
+    response = await client.get("/kols/", params=[("keywords_all", "travel"), ("keywords_all", "photography")])
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(kol["kol_id"] for kol in body["items"]) == ["array_0", "array_2"]
+    assert body["total"] == 2
+
+async def test_count_estimate_with_array_filters(client, monkeypatch):
+    from app.core.config import settings
+
+    # 阈值为 0 时直接返回 EXPLAIN 的预估行数
+    monkeypatch.setattr(settings, "COUNT_EXACT_THRESHOLD", 0)
+    await create_kols(client, [{"kol_id": "array_0", "most_used_hashtags": ["#yoga"]}])
+
+    response = await client.get("/kols/", params={"hashtags_any": "#yoga", "keywords_all": "travel"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["items"] == []
+    assert body["total_exact"] is False
+
+async def scan(client, size: int, on_page=None) -> list:
+    """按游标翻完全部页，返回依次读到的 kol_id"""
+    kol_ids, cursor = [], ""
+    while cursor is not None:
+        response = await client.get("/kols/", params={"cursor": cursor, "size": size})
+        assert response.status_code == 200
+        body = response.json()
+        kol_ids += [kol["kol_id"] for kol in body["items"]]
+        cursor = body["next_cursor"]
+        if on_page:
+            await on_page()
+    return kol_ids
+
+async def test_cursor_is_stable_when_updated_at_ties(client, db_engine):
+    await create_kols(client, [{"kol_id": f"tie_{index}"} for index in range(5)])
+    async with db_engine.begin() as conn:
+        await conn.execute(text("UPDATE kols SET updated_at = '2024-01-01 00:00:00'"))
+
+    # updated_at 相同时按 id 降序，翻页不重复不遗漏
+    assert await scan(client, size=2) == [f"tie_{index}" for index in reversed(range(5))]
+
+async def test_cursor_last_page(client):
+    await create_kols(client, [{"kol_id": f"page_{index}"} for index in range(4)])
+
+    first = (await client.get("/kols/", params={"cursor": "", "size": 2})).json()
+    assert len(first["items"]) == 2 and first["next_cursor"]
+    last = (await client.get("/kols/", params={"cursor": first["next_cursor"], "size": 2})).json()
+    assert len(last["items"]) == 2
+    # 恰好读完时没有下一页
+    assert last["next_cursor"] is None
+
+    exact = (await client.get("/kols/", params={"cursor": "", "size": 4})).json()
+    assert exact["next_cursor"] is None
+
+async def test_cursor_ignores_rows_written_mid_scan(client):
+    await create_kols(client, [{"kol_id": f"scan_{index}"} for index in range(6)])
+    inserted = []
+
+    async def insert_row():
+        kol_id = f"new_{len(inserted)}"
+        await create_kols(client, [{"kol_id": kol_id}])
+        inserted.append(kol_id)
+
+    # 新写入的行 updated_at 更大，位于已读过的位置之前，不影响后续页
+    kol_ids = await scan(client, size=2, on_page=insert_row)
+    assert kol_ids == [f"scan_{index}" for index in reversed(range(6))]
+
+async def test_malformed_cursor(client):
+    for cursor in ("not-a-cursor", "W1tdXQ"):
+        response = await client.get("/kols/", params={"cursor": cursor})
+        assert response.status_code == 400
+        assert "Invalid cursor" in response.json()["detail"]
+
+async def test_cursor_requires_default_sort(client):
+    response = await client.get("/kols/", params={"cursor": "", "sort": "name"})
+    assert response.status_code == 400
@@ -0,0 +1,54 @@
+"""
+KOL更新：If-Match 乐观并发控制与触发器递增版本号
+"""
+import pytest
+
+@pytest.fixture
+async def kol(client):
+    response = await client.post("/kols/", json={"kol_id": "versioned", "name": "Before"})
+    assert response.status_code == 201
+    assert response.json()["version"] == 1
+    return response.json()
+
+async def test_matching_version_updates_and_bumps(client, kol):
+    response = await client.put("/kols/versioned", json={"name": "After"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.json()["name"] == "After"
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == '"2"'
+
+    detail = await client.get("/kols/versioned")
+    assert detail.headers["ETag"] == '"2"'
+    assert detail.json()["name"] == "After"
+
+async def test_stale_version_conflicts(client, kol):
+    assert (await client.put("/kols/versioned", json={"name": "First"})).status_code == 200
+
+    response = await client.put("/kols/versioned", json={"name": "Second"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 409
+    assert response.headers["ETag"] == '"2"'
+    assert "2" in response.json()["detail"]
+
+    # 冲突的更新未写入
+    detail = await client.get("/kols/versioned")
+    assert detail.json()["name"] == "First"
+    assert detail.json()["version"] == 2
+
+async def test_stale_version_conflicts_with_empty_body(client, kol):
+    response = await client.put("/kols/versioned", json={}, headers={"If-Match": '"5"'})
+    assert response.status_code == 409
+    assert response.headers["ETag"] == '"1"'
+
+async def test_missing_if_match_updates_unconditionally(client, kol):
+    for version, name in ((2, "One"), (3, "Two")):
+        response = await client.put("/kols/versioned", json={"name": name})
+        assert response.status_code == 200
+        assert response.json()["version"] == version
+
+async def test_invalid_if_match_is_rejected(client, kol):
+    response = await client.put("/kols/versioned", json={"name": "After"}, headers={"If-Match": "v1"})
+    assert response.status_code == 400
+
+async def test_if_match_on_missing_kol(client):
+    response = await client.put("/kols/missing", json={"name": "After"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 404
@@ -0,0 +1,69 @@
+"""
+批量 upsert：逐行结果（created / updated / conflict / error）
+"""
+
+async def upsert(client, kols: list) -> dict:
+    response = await client.put("/kols/batch", json={"kols": kols})
+    assert response.status_code == 200
+    return response.json()
+
+def statuses(body: dict) -> list:
+    return [(result["kol_id"], result["status"]) for result in body["results"]]
+
+async def test_created_and_updated(client):
+    body = await upsert(client, [{"kol_id": "upsert_0", "name": "Zero"}])
+    assert statuses(body) == [("upsert_0", "created")]
+
+    # xmax = 0 的行为新插入，其余为冲突更新
+    body = await upsert(client, [
+        {"kol_id": "upsert_0", "name": "Zero v2"},
+        {"kol_id": "upsert_1", "name": "One"},
+    ])
+    assert statuses(body) == [("upsert_0", "updated"), ("upsert_1", "created")]
+    assert (body["created"], body["updated"]) == (1, 1)
+
+    detail = await client.get("/kols/upsert_0")
+    assert detail.json()["name"] == "Zero v2"
+    assert detail.json()["version"] == 2
+
+async def test_unique_field_conflicts(client):
+    await upsert(client, [{"kol_id": "owner", "email": "owner@example.com", "slug": "owner-slug"}])
+
+    body = await upsert(client, [
+        # 其他已存在的KOL占用了 email / slug
+        {"kol_id": "taker_0", "email": "owner@example.com"},
+        {"kol_id": "taker_1", "slug": "owner-slug"},
+        # 自身已占用的值不算冲突
+        {"kol_id": "owner", "email": "owner@example.com", "slug": "owner-slug"},
+        # 批内先出现的行占用该值
+        {"kol_id": "batch_0", "creator_id": "creator"},
+        {"kol_id": "batch_1", "creator_id": "creator"},
+        {"kol_id": "batch_0", "creator_id": "creator"},
+    ])
+    assert statuses(body) == [
+        ("taker_0", "conflict"),
+        ("taker_1", "conflict"),
+        ("owner", "updated"),
+        ("batch_0", "created"),
+        ("batch_1", "conflict"),
+        ("batch_0", "error"),
+    ]
+    assert "owner" in body["results"][0]["detail"]
+    assert (body["created"], body["updated"], body["conflicts"], body["errors"]) == (1, 1, 3, 1)
+    assert (await client.get("/kols/taker_0")).status_code == 404
+
+async def test_failed_chunk_retries_row_by_row(client):
+    await upsert(client, [{"kol_id": "retry_1", "source": "Manual", "name": "Before"}])
+
+    # 未知的数据来源通过请求校验，写库时被枚举类型拒绝，整个分块失败后逐行重试
+    body = await upsert(client, [
+        {"kol_id": "retry_0", "source": "Manual", "name": "Zero"},
+        {"kol_id": "retry_bad", "source": "Unknown", "name": "Bad"},
+        {"kol_id": "retry_1", "source": "Heepsy", "name": "After"},
+    ])
+    assert statuses(body) == [("retry_0", "created"), ("retry_bad", "error"), ("retry_1", "updated")]
+    assert body["results"][1]["detail"]
+
+    assert (await client.get("/kols/retry_0")).status_code == 200
+    assert (await client.get("/kols/retry_bad")).status_code == 404
+    assert (await client.get("/kols/retry_1")).json()["source"] == "Heepsy"
@@ -0,0 +1,26 @@
+"""
+SQL 指标：失败的语句不影响之后语句的耗时记录
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+
+def test_failed_query_does_not_skew_timings(monkeypatch):
+    monkeypatch.setattr(metrics.registry, "add_collector", lambda collector: None)
+    sync_engine = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.instrument_engine(SimpleNamespace(sync_engine=sync_engine), "test")
+
+    with sync_engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.execute(text("SELECT 42")).scalar() == 42
+
+    assert metrics.db_query_errors._values[("SELECT * FROM missing_table",)] == 3
+    count = metrics.db_query_duration._values[("SELECT ?",)][-1]
+    assert count == 1
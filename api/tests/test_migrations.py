@@ -0,0 +1,51 @@
+"""
+迁移脚本：在缺少新增列、表与触发器的旧表结构上执行，并验证可重复执行
+"""
+from sqlalchemy import text
+
+from migrations import discover, run_migrations
+
+# 还原到新增这些对象之前的表结构
+LEGACY_SCHEMA = [
+    "DROP TRIGGER IF EXISTS kols_search_vector_trigger ON kols",
+    "DROP TRIGGER IF EXISTS kols_version_trigger ON kols",
+    "DROP TRIGGER IF EXISTS kol_rollups_insert ON kols",
+    "DROP TRIGGER IF EXISTS kol_rollups_update ON kols",
+    "DROP TRIGGER IF EXISTS kol_rollups_delete ON kols",
+    "DROP TRIGGER IF EXISTS kol_metric_snapshots_insert ON kols",
+    "DROP TRIGGER IF EXISTS kol_metric_snapshots_update ON kols",
+    "DROP TABLE IF EXISTS kol_rollups, kol_metric_snapshots, feishu_sync_states",
+    "ALTER TABLE kols DROP COLUMN search_vector, DROP COLUMN sync_hash, DROP COLUMN version",
+    "DROP INDEX IF EXISTS ix_kols_followers_k_desc_id",
+    "DROP INDEX IF EXISTS ix_kols_tags_gin",
+]
+
+async def test_migrations_upgrade_legacy_schema(db_engine):
+    async with db_engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            await conn.execute(text(statement))
+        await conn.execute(text(
+            "INSERT INTO kols (kol_id, name, platform, followers_k) VALUES "
+            "('legacy_1', 'Legacy One', 'TIKTOK', 12.5), ('legacy_2', 'Legacy Two', 'TIKTOK', NULL)"
+        ))
+
+    # 第二次执行应为无操作
+    assert await run_migrations(db_engine) == discover()
+    await run_migrations(db_engine)
+
+    async with db_engine.begin() as conn:
+        missing = await conn.scalar(text("SELECT count(*) FROM kols WHERE search_vector IS NULL"))
+        assert missing == 0
+        rollup = await conn.execute(text("SELECT platform, kol_count FROM kol_rollups"))
+        assert rollup.all() == [("TIKTOK", 2)]
+        snapshots = await conn.scalar(text("SELECT count(*) FROM kol_metric_snapshots"))
+        assert snapshots == 1
+
+        await conn.execute(text("UPDATE kols SET name = 'Renamed' WHERE kol_id = 'legacy_1'"))
+        row = (await conn.execute(text(
+            "SELECT version, search_vector @@ to_tsquery('simple', 'renamed') FROM kols WHERE kol_id = 'legacy_1'"
+        ))).one()
+        assert tuple(row) == (2, True)
+
+        indexes = set(await conn.scalars(text("SELECT indexname FROM pg_indexes WHERE tablename = 'kols'")))
+        assert {"ix_kols_followers_k_desc_id", "ix_kols_tags_gin", "ix_kols_search_vector"} <= indexes
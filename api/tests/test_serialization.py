@@ -0,0 +1,68 @@
+"""
+快速序列化：与 pydantic model_dump(mode="json") 输出一致
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import cache, serialization
+from app.core.config import settings
+from app.db.models import Gender, Level, Platform, SendStatus, Source
+from app.schemas.kol import KOLResponse
+
+ROWS = [
+    {
+        "id": 1, "kol_id": "full", "version": 3,
+        "email": "full@example.com", "name": "Full 名称", "bio": "line\n\"quoted\"", "account_link": None,
+        "platform": Platform.TIKTOK, "source": Source.MANUAL, "filter": None, "gender": Gender.FEMALE,
+        "tag": "beauty, travel", "language": "en", "location": "Paris", "slug": "full", "creator_id": "c1",
+        "followers_k": 123.5, "likes_k": 0.0, "mean_views_k": 1e-05, "median_views_k": 1234567.25,
+        "engagement_rate": 3.14, "average_views_k": None, "average_likes_k": None, "average_comments_k": 2.0,
+        "send_status": SendStatus.ROUND_1, "level": Level.MID,
+        "send_date": datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc),
+        "export_date": datetime(2024, 5, 2, 8, 30, 15, 123456, tzinfo=timezone(timedelta(hours=8))),
+        "created_at": datetime(2024, 1, 1, 0, 0, 0, 1),
+        "updated_at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "keywords_ai": ["makeup", "护肤"], "most_used_hashtags": [],
+    },
+    {
+        "id": 2, "kol_id": "sparse", "version": 1,
+        **{field: None for field in KOLResponse.model_fields if field not in ("id", "kol_id", "version", "created_at", "updated_at")},
+        # 数据库中不在枚举内的旧值按字符串返回
+        "source": "Legacy", "level": "Unknown",
+        "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1),
+    },
+]
+
+def pydantic_json(rows: list) -> list:
+    return [KOLResponse.model_validate(row).model_dump(mode="json") for row in rows]
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_matches_pydantic(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    assert json.loads(serialization.dumps(ROWS)) == pydantic_json(ROWS)
+
+async def test_list_fast_path_matches_pydantic(client, monkeypatch):
+    for kol in [
+        {
+            "kol_id": "fast_0", "email": "fast@example.com", "platform": "YouTube", "gender": "MALE",
+            "send_status": "Round No.2", "level": "Micro 10k-50k", "followers_k": 12.5,
+            "send_date": "2024-05-01T08:30:00Z", "keywords_ai": ["a", "b"], "most_used_hashtags": ["#c"],
+        },
+        {"kol_id": "fast_1"},
+    ]:
+        assert (await client.post("/kols/", json=kol)).status_code == 201
+
+    bodies = {}
+    for fast in (True, False):
+        monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+        cache.set_backend(cache.MemoryCache())
+        list_response = await client.get("/kols/")
+        detail_response = await client.get("/kols/fast_0")
+        assert list_response.status_code == detail_response.status_code == 200
+        bodies[fast] = (list_response.json(), detail_response.json())
+    assert bodies[True] == bodies[False]
@@ -0,0 +1,29 @@
+"""
+统计接口：分面统计
+"""
+
+async def test_facets_without_filters(client):
+    for index, (tag, keywords) in enumerate([
+        ("Beauty, Travel", ["makeup"]),
+        ("beauty", ["makeup", "skincare"]),
+        (None, []),
+    ]):
+        response = await client.post("/kols/", json={
+            "kol_id": f"facet_{index}", "tag": tag, "keywords_ai": keywords,
+        })
+        assert response.status_code == 201
+
+    response = await client.get("/kols/facets")
+    assert response.status_code == 200
+    facets = response.json()["facets"]
+    assert facets["tags"] == [{"value": "beauty", "count": 2}, {"value": "travel", "count": 1}]
+    assert facets["keywords"] == [{"value": "makeup", "count": 2}, {"value": "skincare", "count": 1}]
+    assert facets["hashtags"] == []
+
+async def test_facets_with_filter(client):
+    for index, tag in enumerate(["beauty", "beauty, travel"]):
+        await client.post("/kols/", json={"kol_id": f"facet_{index}", "name": f"KOL {index}", "tag": tag})
+
+    response = await client.get("/kols/facets", params={"facets": "tags", "tags_any": "travel"})
+    assert response.status_code == 200
+    assert response.json()["facets"]["tags"] == [{"value": "beauty", "count": 1}, {"value": "travel", "count": 1}]
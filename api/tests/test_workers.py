@@ -0,0 +1,29 @@
+"""
+多进程部署：进程内状态需通过共享的缓存后端在进程之间可见
+"""
+import pytest
+
+from app.core import cache
+from app.core.config import Settings
+from app.crud import kol_import
+
+def test_multiple_workers_require_redis():
+    with pytest.raises(ValueError, match="CACHE_BACKEND=redis"):
+        Settings(API_WORKERS=4, CACHE_BACKEND="memory")
+    with pytest.raises(ValueError):
+        Settings(API_WORKERS=0, CACHE_BACKEND="none")
+    assert Settings(API_WORKERS=4, CACHE_BACKEND="redis", REDIS_URL="redis://localhost").API_WORKERS == 4
+
+async def test_import_job_visible_to_other_workers(monkeypatch):
+    shared = cache.MemoryCache()
+    cache.set_backend(shared)
+    job = await kol_import.create_job("kols.csv", "csv")
+    job["processed"] = 10
+    await kol_import._save_job(job)
+
+    # 其他进程没有该任务的本地状态，从共享后端读取
+    monkeypatch.setattr(kol_import, "_jobs", {})
+    loaded = await kol_import.get_job(job["job_id"])
+    assert loaded["status"] == "pending"
+    assert loaded["processed"] == 10
+    assert await kol_import.get_job("missing") is None